@@ -0,0 +1,165 @@
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PySide6.QtCore import QCoreApplication
+from pdfp.utils.log_levels import addLoggingLevel
+from pdfp.utils.job_result import JobResult
+from pdfp.utils.operation_map import operation_map
+from pdfp.utils.pipeline import Pipeline, parse_operation
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.path_allocator import PathAllocator
+from pdfp.operations.ocr import ocr
+
+logger = logging.getLogger("pdfp")
+
+# QCoreApplication of a worker process, kept alive for the life of the process
+worker_app = None
+
+def process_file(file_path, pipeline, settings):
+    """
+    Run the pipeline on one file in a worker process.
+    Clean copy always writes to a file, since there is no clipboard in batch mode.
+    Output names are claimed on disk by PathAllocator, so workers never write to the same path.
+    Args:
+        file_path (str): The file to process.
+        pipeline (Pipeline): The operations to run.
+        settings (OperationSettings): Settings to run with.
+    Returns:
+        dict: JSON-serializable summary of the file.
+    """
+    start = time.perf_counter()
+    allocator = PathAllocator.instance()
+    try:
+        with allocator.owner(file_path):
+            result = pipeline.run(file_path, settings)
+    except Exception as e:
+        logger.error(traceback.format_exc())
+        logger.error(f"Error processing {file_path}: {e}")
+        result = JobResult.failed(file_path, str(e))
+    allocator.release(file_path)
+    result.elapsed = time.perf_counter() - start
+    return result.to_dict()
+
+def configure_logging(level):
+    """Log to stderr so stdout is left for the JSON summary."""
+    try:
+        addLoggingLevel("SUCCESS", 60, "success")
+    except AttributeError:
+        pass
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("[%(asctime)s] [%(levelname)s] [%(processName)s] %(message)s", "%H:%M:%S"))
+    logger.handlers = [handler]
+    logger.setLevel(getattr(logging, level, logging.INFO))
+    logger.propagate = False
+
+def init_worker(level):
+    """
+    Prepare a worker process. QProcess and QSettings need a QCoreApplication, but no QApplication or widgets are created.
+    Args:
+        level (str): Logging level name.
+    """
+    global worker_app
+    configure_logging(level)
+    if QCoreApplication.instance() is None:
+        worker_app = QCoreApplication([])
+
+def expand_files(patterns):
+    """
+    Expand files and glob patterns into absolute paths, keeping order and dropping duplicates.
+    Args:
+        patterns (list of str): Files or glob patterns.
+    Returns:
+        tuple: (list of existing file paths, list of patterns that matched nothing)
+    """
+    files = []
+    missing = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        matches = [os.path.abspath(match) for match in matches if os.path.isfile(match)]
+        if not matches:
+            missing.append(pattern)
+        for match in matches:
+            if match not in files:
+                files.append(match)
+    return files, missing
+
+def main(argv):
+    """
+    Entry point for `pdfp batch`. Runs operations on files in parallel worker processes without a GUI.
+    Prints a JSON summary to stdout.
+    Args:
+        argv (list of str): Command line arguments after "batch".
+    Returns:
+        int: Exit code. 0 if every file succeeded, 1 if any failed, 2 for invalid arguments.
+    """
+    parser = argparse.ArgumentParser(prog="pdfp batch", description="Run pdfp operations on files without the GUI.")
+    parser.add_argument("files", nargs="+", help="files or glob patterns to process")
+    parser.add_argument("-o", "--operation", action="append", required=True, metavar="NAME[:ARG]",
+                        help=f"operation to run, in order. Each operation runs on the output of the previous one, in memory where possible. "
+                             f"Names: {', '.join(operation_map)}. trim and pdf2png take pages as ARG, e.g. trim:\"1-5 10-end\", and split takes a page count, toc, or pages")
+    parser.add_argument("-k", "--keep-intermediates", action="store_true", help="write the output of every operation, not only the last one")
+    parser.add_argument("-s", "--settings", metavar="INI", help="settings file saved with Save Preset. Defaults are used if omitted")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="files to process in parallel. Default: one per core, or the OCR budget when OCRing")
+    parser.add_argument("--log-level", default=None, choices=["DEBUG", "INFO", "WARNING", "ERROR", "SUCCESS"], help="stderr logging level. Default: logging_level from settings")
+    args = parser.parse_args(argv)
+
+    if args.settings:
+        if not os.path.isfile(args.settings):
+            parser.error(f"settings file not found: {args.settings}")
+        settings = OperationSettings.from_ini(os.path.abspath(args.settings))
+    else:
+        settings = OperationSettings()
+    log_level = args.log_level or settings.logging_level
+    configure_logging(log_level)
+
+    pipeline = Pipeline([parse_operation(text) for text in args.operation], keep_intermediates=args.keep_intermediates, cc_to_file=True)
+    if error := pipeline.validate(settings):
+        parser.error(error)
+
+    files, missing = expand_files(args.files)
+    for pattern in missing:
+        logger.warning(f"No files match: {pattern}")
+
+    start = time.perf_counter()
+    results = []
+    if files:
+        cores = os.cpu_count() or 1
+        if args.jobs > 0:
+            workers = args.jobs
+        elif any(name == "ocr" for name, _ in pipeline.steps):
+            workers, _ = ocr.cpu_budget(len(files), settings, processes=True)
+        else:
+            workers = cores
+        workers = max(1, min(workers, len(files)))
+        pipeline.ocr_jobs = settings.ocr_jobs_per_doc or max(1, cores // workers)
+        logger.info(f"Processing {len(files)} file(s) with {workers} worker(s)")
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker, initargs=(log_level,)) as executor:
+            futures = [executor.submit(process_file, file_path, pipeline, settings) for file_path in files]
+            for file_path, future in zip(files, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Worker failed on {file_path}: {e}")
+                    results.append(JobResult.failed(file_path, str(e)).to_dict())
+
+    failed = sum(1 for result in results if result["status"] == "failed") + len(missing)
+    summary = {
+        "operations": [name for name, _ in pipeline.steps],
+        "succeeded": len(results) - sum(1 for result in results if result["status"] == "failed"),
+        "failed": failed,
+        "missing": missing,
+        "elapsed": round(time.perf_counter() - start, 3),
+        "files": results,
+    }
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if failed else 0
@@ -8,8 +8,12 @@ from pdfp.operations.png import pdf2png
 from pdfp.operations.ocr import ocr
 from pdfp.operations.crop import crop
 from pdfp.operations.trim import trim
+from pdfp.operations.split import split
+from pdfp.operations.merge import merge
 from pdfp.operations.clean_copy import clean_copy
 from pdfp.operations.tts import tts
+from pdfp.utils.job_engine import JobEngine
+from pdfp.utils.pipeline import Pipeline
 import logging
 
 logger = logging.getLogger("pdfp")
@@ -18,7 +22,7 @@ class ButtonWidget(QWidget):
     """
     A custom widget containing buttons for various PDF operations.
 
-    This widget provides buttons for converting, extracting, OCR, cropping, trimming, cleaning, and text-to-speech operations.
+    This widget provides buttons for converting, extracting, OCR, cropping, trimming, splitting, merging, cleaning, and text-to-speech operations.
     It connects each button to its corresponding function and emits messages when buttons are clicked.
 
     Attributes:
@@ -29,7 +33,9 @@ class ButtonWidget(QWidget):
         file_tree_widget (FileTreeWidget): The file tree widget for selecting files.
         png_page (QLineEdit): Input field for specifying the page number to convert to PNG.
         keep_pgs (QLineEdit): Input field for specifying the pages to keep for trimming.
+        split_by (QLineEdit): Input field for specifying how to split PDFs.
         cc_file (QRadioButton): Radio button for selecting file option in clean copy.
+        chain (QLineEdit): Input field for the operations to chain, e.g. "file2pdf > trim:1-5 > ocr".
     """
 
     _instance = None
@@ -61,6 +67,8 @@ class ButtonWidget(QWidget):
         # print("QApplication instance created:", QApplication.instance())
         self.settings = SettingsWindow.instance()
         self.file_tree_widget = FileTreeWidget.instance()
+        self.job_engine = JobEngine.instance()
+        self.job_engine.queue_empty.connect(lambda: self.button_toggle.emit(True))
 
         f2pdf_button = QPushButton("Convert to PDF")
         f2pdf_button.clicked.connect(self.f2pdf_clicked)
@@ -71,10 +79,10 @@ class ButtonWidget(QWidget):
         f2pdf_box.setLayout(f2pdf_box_layout)
         f2pdf_box.setMaximumHeight(70)
         
-        png_page_label = QLabel("Page to convert to PNG:")
+        png_page_label = QLabel("Pages to convert to PNG:")
         png_page_label.setMaximumHeight(15)
         self.png_page = QLineEdit()
-        self.png_page.setPlaceholderText("Default: 1")
+        self.png_page.setPlaceholderText("Default: 1. e.g. 1 3-5 10-end")
         png_button = QPushButton("Extract PNG")
         png_button.clicked.connect(self.png_clicked)
         png_box = QGroupBox()
@@ -108,6 +116,7 @@ class ButtonWidget(QWidget):
         trim_label.setMaximumHeight(15)
         self.keep_pgs = QLineEdit()
         self.keep_pgs.setPlaceholderText("Ex: \"12-16 32-end\"")
+        self.keep_pgs.setToolTip("Pages or ranges separated by spaces. \"end\" is the last page, negative pages count from the end (\"-3-end\" keeps the last 3), and \":N\" keeps every Nth page (\"1-end:2\" keeps odd pages).")
         trim_button = QPushButton("Trim")
         trim_button.clicked.connect(self.trim_clicked)
         trim_box = QGroupBox()
@@ -119,6 +128,26 @@ class ButtonWidget(QWidget):
         trim_box.setLayout(trim_box_layout)
         trim_box.setMaximumHeight(100)
 
+        split_label = QLabel("Split into:")
+        split_label.setMaximumHeight(15)
+        self.split_by = QLineEdit()
+        self.split_by.setPlaceholderText("Ex: \"50\", \"toc\" or \"1-10 11-end\"")
+        self.split_by.setToolTip("A page count writes a piece every that many pages, \"toc\" writes a piece per top-level bookmark, and page ranges write a piece per range.")
+        split_button = QPushButton("Split")
+        split_button.clicked.connect(self.split_clicked)
+        split_box = QGroupBox()
+        split_box_layout = QVBoxLayout()
+        split_box_layout.setSpacing(5)
+        split_box_layout.addWidget(split_label)
+        split_box_layout.addWidget(self.split_by)
+        split_box_layout.addWidget(split_button)
+        split_box.setLayout(split_box_layout)
+        split_box.setMaximumHeight(100)
+
+        merge_button = QPushButton("Merge Selected")
+        merge_button.setToolTip("Merges the selected PDFs in the order shown, keeping the bookmarks of each under a bookmark named after the file.")
+        merge_button.clicked.connect(self.merge_clicked)
+
         cc_clipboard = QRadioButton("Clipboard")
         self.cc_file = QRadioButton("File")
         cc_file_radio_checked = self.settings.cc_file_radio.isChecked()
@@ -149,6 +178,22 @@ class ButtonWidget(QWidget):
         tts_box.setLayout(tts_box_layout)
         tts_box.setMaximumHeight(70)
 
+        chain_label = QLabel("Operations to chain:")
+        chain_label.setMaximumHeight(15)
+        self.chain = QLineEdit()
+        self.chain.setPlaceholderText("Ex: \"file2pdf > trim:2-end > ocr > cc\"")
+        self.chain.setToolTip("Operations: file2pdf, pdf2png, ocr, crop, trim, split, cc, tts. Pages for trim and pdf2png, and how to split, follow a colon.")
+        self.chain.setText(self.settings.settings.value("chain_operations", "", type=str))
+        chain_button = QPushButton("Run Chain")
+        chain_button.clicked.connect(self.chain_clicked)
+        chain_box = QGroupBox()
+        chain_box_layout = QVBoxLayout()
+        chain_box_layout.setSpacing(5)
+        chain_box_layout.addWidget(chain_label)
+        chain_box_layout.addWidget(self.chain)
+        chain_box_layout.addWidget(chain_button)
+        chain_box.setLayout(chain_box_layout)
+        chain_box.setMaximumHeight(100)
 
         scrollable_content = QWidget()
         scrollable_content.setMinimumHeight(400)
@@ -158,8 +203,11 @@ class ButtonWidget(QWidget):
         scrollable_layout.addWidget(ocr_button)
         scrollable_layout.addWidget(crop_button)
         scrollable_layout.addWidget(trim_box)
+        scrollable_layout.addWidget(split_box)
+        scrollable_layout.addWidget(merge_button)
         scrollable_layout.addWidget(cc_box)
         scrollable_layout.addWidget(tts_button)
+        scrollable_layout.addWidget(chain_box)
         scrollable_layout.setSpacing(3)
 
         scroll_area = QScrollArea()
@@ -175,117 +223,159 @@ class ButtonWidget(QWidget):
     def f2pdf_clicked(self):
         """
         Handle the Convert to PDF button click event.
-        Emits a message and calls the file2pdf conversion function.
+        Emits a message and queues the file2pdf conversion function.
         """
         logger.info(f"Attempting to convert file to PDF...")
-        QApplication.processEvents()
-        self.button_toggle.emit(False)
-        self.call_selected_function(file2pdf.convert)
-        self.button_toggle.emit(True)
+        self.call_selected_function("F2PDF", file2pdf.convert)
 
     def png_clicked(self):
         """
         Handle the Extract PNG button click event.
-        Emits a message and calls the pdf2png conversion function with the specified page number.
+        Emits a message and queues the pdf2png conversion function with the specified pages.
         """
         page = self.png_page.text()
         logger.info(f"Attempting to convert PDF to PNG...")
-        QApplication.processEvents()
-        self.button_toggle.emit(False)
-        self.call_selected_function(pdf2png.convert, page)
-        self.button_toggle.emit(True)
+        self.call_selected_function("PNG", pdf2png.convert, page)
 
     def ocr_clicked(self):
         """
         Handle the OCR button click event.
-        Emits a message and calls the OCR conversion function.
+        Emits a message and queues the OCR conversion function, splitting the CPU between concurrent documents.
+        Native OCR runs as an asynchronous batch, so up to docs ocrmypdf processes run at once without occupying pool threads.
         """
         logger.info(f"Attempting to OCR PDF...")
-        QApplication.processEvents()
-        self.button_toggle.emit(False)
-        self.call_selected_function(ocr.convert)
-        self.button_toggle.emit(True)
+        file_paths = self.selected_file_paths()
+        if not file_paths:
+            return
+        settings = self.settings.snapshot()
+        docs, jobs = ocr.cpu_budget(len(file_paths), settings)
+        logger.info(f"OCRing {docs} document(s) at a time with {jobs} core(s) each")
+        if settings.native_ocr:
+            self.submit_batch("OCR", ocr.start, file_paths, concurrency=docs, asynchronous=True, jobs=jobs, settings=settings)
+        else:
+            self.submit_batch("OCR", ocr.convert, file_paths, concurrency=docs, jobs=jobs, settings=settings)
 
     def crop_clicked(self):
         """
         Handle the Crop button click event.
-        Emits a message and calls the crop conversion function.
+        Emits a message and queues the crop conversion function.
         """
         logger.info(f"Attempting to crop PDF...")
-        QApplication.processEvents()
-        self.button_toggle.emit(False)
-        self.call_selected_function(crop.convert)
-        self.button_toggle.emit(True)
+        self.call_selected_function("Crop", crop.convert)
 
     def trim_clicked(self):
         """
         Handle the Trim Pages button click event.
-        Emits a message and calls the trim conversion function with the specified pages to keep.
+        Emits a message and queues the trim conversion function with the specified pages to keep.
         """
         keep_pgs_input = self.keep_pgs.text()
         logger.info(f"Attempting to trim PDF...")
-        QApplication.processEvents()
-        self.button_toggle.emit(False)
-        self.call_selected_function(trim.convert, keep_pgs_input)
-        self.button_toggle.emit(True)
+        self.call_selected_function("Trim", trim.convert, keep_pgs_input)
+
+    def split_clicked(self):
+        """
+        Handle the Split button click event.
+        Emits a message and queues the split conversion function with the specified split.
+        """
+        split_by = self.split_by.text()
+        logger.info(f"Attempting to split PDF...")
+        self.call_selected_function("Split", split.convert, split_by)
+
+    def merge_clicked(self):
+        """
+        Handle the Merge Selected button click event.
+        Emits a message and queues one merge of every selected file, in the order shown in file_tree_widget.
+        """
+        logger.info(f"Attempting to merge PDFs...")
+        file_paths = self.selected_file_paths()
+        if not file_paths:
+            return
+        if len(file_paths) < 2:
+            logger.warning(f"Select at least 2 PDFs to merge")
+            return
+        self.submit_batch("Merge", merge.convert, file_paths[:1], file_paths)
 
     def clean_copy_clicked(self):
         """
         Handle the Clean Copy button click event.
-        Emits a message and calls the clean copy conversion function with the selected option.
+        Emits a message and queues the clean copy conversion function with the selected option.
         """
         cc_file_checked = self.cc_file.isChecked()
         logger.info(f"Attempting to clean copy PDF...")
-        QApplication.processEvents()
-        self.button_toggle.emit(False)
-        self.call_selected_function(clean_copy.convert, cc_file_checked)
-        self.button_toggle.emit(True)
+        self.call_selected_function("Copy", clean_copy.convert, cc_file_checked)
 
     def tts_clicked(self):
         """
         Handle the Text to Speech button click event.
-        Emits a message and calls the TTS conversion function.
+        Emits a message and queues the TTS conversion function.
         """
         logger.info(f"Attempting to TTS PDF...")
-        QApplication.processEvents()
-        self.button_toggle.emit(False)
-        self.call_selected_function(tts.convert)
-        self.button_toggle.emit(True)
+        self.call_selected_function("TTS", tts.convert)
 
-    def call_selected_function(self, function, *args, **kwargs):
+    def chain_clicked(self):
         """
-        Call the selected function for each selected file.
-        Emits a message if no items are selected or if selection is invalid.
+        Handle the Run Chain button click event.
+        Validates the chain, remembers it for next time, and queues it for each selected file.
+        PDFs are passed between operations in memory; only the final output is written unless intermediates are kept in settings.
+        """
+        chain_text = self.chain.text()
+        logger.info(f"Attempting to run chain...")
+        pipeline = Pipeline.from_text(chain_text)
+        settings = self.settings.snapshot()
+        if error := pipeline.validate(settings):
+            logger.error(error)
+            return
+        self.settings.settings.setValue("chain_operations", chain_text)
+        file_paths = self.selected_file_paths()
+        if not file_paths:
+            return
+        docs = 0
+        if any(name == "ocr" for name, _ in pipeline.steps):
+            docs, pipeline.ocr_jobs = ocr.cpu_budget(len(file_paths), settings)
+            logger.info(f"OCRing {docs} document(s) at a time with {pipeline.ocr_jobs} core(s) each")
+        self.submit_batch("Chain", pipeline.run, file_paths, concurrency=docs, settings=settings)
+
+    def call_selected_function(self, name, function, *args, **kwargs):
+        """
+        Queue the selected function on the job engine for each selected file.
         Args:
+            name (str): Name of the operation, shown in the progress widget.
             function (callable): The function to call for each selected file.
             *args: Additional arguments to pass to the function.
             **kwargs: Additional keyword arguments to pass to the function.
         """
-        indexes = self.file_tree_widget.selectedIndexes()
-        if not indexes:
+        file_paths = self.selected_file_paths()
+        if file_paths:
+            self.submit_batch(name, function, file_paths, *args, **kwargs)
+
+    def selected_file_paths(self):
+        """
+        Return the paths of the files selected in file_tree_widget.
+        Emits a message if no items are selected or if selection is invalid.
+        Returns:
+            list of str: The selected file paths.
+        """
+        file_paths = self.file_tree_widget.selected_file_paths()
+        if not file_paths:
             logger.warning(f"No items selected")
-            return
-        for index in indexes:
-            if not index.isValid():
-                logger.warning
-                continue
-            item = self.file_tree_widget.model.itemFromIndex(index)
-            if not item:
-                logger.warning(f"No item in index: {index}")
-                continue
-            file_path = item.text()
-            self.call_generic_function(file_path, function, *args, **kwargs)
-
-    def call_generic_function(self, file_path, function, *args, **kwargs):
-        """
-        Call the provided function with the given file path and additional arguments.
+        return file_paths
+
+    def submit_batch(self, name, function, file_paths, *args, concurrency=0, asynchronous=False, **kwargs):
+        """
+        Disable ButtonWidget and queue a batch on the job engine.
+        ButtonWidget is enabled again when the job engine queue is empty.
         Args:
-            file_path (str): The path of the file to process.
-            function (callable): The function to call.
-            *args: Additional arguments to pass to the function.
-            **kwargs: Additional keyword arguments to pass to the function.
+            name (str): Name of the operation, shown in the progress widget.
+            function (callable): The function to call for each file.
+            file_paths (list of str): The files to process.
+            concurrency (int): Optional. Maximum jobs of this batch to run at once. 0 uses the settings value.
+            asynchronous (bool): Optional. Start each job on the GUI thread and let it report back through a finished callback.
+            settings (OperationSettings): Optional, as a keyword argument. Settings passed to every job of the batch.
+                Defaults to a snapshot of the saved settings taken now, so every job of the batch sees the same settings.
         """
-        return function(self.file_tree_widget, file_path, *args, **kwargs)
+        settings = kwargs.setdefault("settings", self.settings.snapshot())
+        self.button_toggle.emit(False)
+        self.job_engine.submit_batch(name, function, file_paths, *args, concurrency=concurrency or settings.max_jobs, asynchronous=asynchronous, **kwargs)
 
     def toggle_cc_file_line_edit(self, checked):
         """
@@ -295,25 +385,3 @@ class ButtonWidget(QWidget):
         """
         self.cc_file_line_edit.setEnabled(checked)
         self.cc_file_label.setEnabled(checked)
-
-    #potentially standardize so that prefix/suffix, chain operations, and button_clicked can all use the same mapping
-    #could also simplify button_clicked methods by this
-    # operation_map = {
-    #     "file2pdf": file2pdf.convert,
-    #     "pdf2png": pdf2png.convert,
-    #     "ocr": ocr.convert,
-    #     "crop": crop.convert,
-    #     "trim": trim.convert,
-    #     "cc": clean_copy.convert,
-    #     "tts": tts.convert
-    # }
-
-    # def chain_operations(operation_list):
-    #     self.button_toggle.emit(False)
-    #     input_file = filename_constructor(operation_list[0] + "_ps")
-    #     for operation in operation_list:
-    #         input_file = self.call_generic_function(input_file, operation_map.get(operation))
-            #call generic function has to return the output file from previous operation
-            #certain settings would be incompatible with chaining. 
-            #       multiple files as output
-            #       briss gui launching
\ No newline at end of file
@@ -6,7 +6,13 @@ from PySide6.QtWidgets import *
 from PySide6.QtGui import *
 from PySide6.QtCore import *
 from send2trash import send2trash
+from pdfp.settings_window import SettingsWindow
+from pdfp.utils.job_engine import JobEngine
+from pdfp.utils.file_list_model import FileListModel
+from pdfp.utils.folder_scanner import FolderImport, parse_patterns
+from pdfp.utils.file_types import ALLOWED_EXTENSIONS
 import shutil
+import traceback
 
 logger = logging.getLogger("pdfp")
 
@@ -19,9 +25,8 @@ class FileTreeWidget(QTreeView):
 
     Attributes:
         button_toggle (Signal): A signal emitted when selections have been made or are cleared. Connects to main_window.
-        model (QStandardItemModel): The data model used to store the file items.
+        model (FileListModel): The data model used to store the file paths.
         allowed_extensions (list of str): List of file extensions allowed to be added.
-        file_paths (set of str): Set of file paths currently added to the widget.
     """
 
     _instance = None
@@ -53,9 +58,13 @@ class FileTreeWidget(QTreeView):
     def __init__(self):
         super().__init__()
         
-        self.model = QStandardItemModel()
+        self.model = FileListModel()
         self.setModel(self.model)
-        self.header().hide()
+        self.header().setStretchLastSection(False)
+        self.header().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.setUniformRowHeights(True)
+        self.setRootIsDecorated(False)
 
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
@@ -68,17 +77,22 @@ class FileTreeWidget(QTreeView):
         layout = QVBoxLayout()
         self.setLayout(layout)
 
-        self.allowed_extensions = ['.pdf', '.epub', '.txt', '.cbz', '.mobi', '.xps', '.svg', '.fb2']
-        self.file_paths = set()
+        self.allowed_extensions = ALLOWED_EXTENSIONS
+        self.settings = SettingsWindow.instance()
+        JobEngine.instance().job_finished.connect(self.add_result_files)
+        self.folder_imports = {}
+        QApplication.instance().aboutToQuit.connect(self.cancel_folder_imports)
+        QApplication.instance().aboutToQuit.connect(self.model.prober.shutdown)
+        self.settings.file_details_checkbox.toggled.connect(self.show_details)
+        self.show_details(self.settings.file_details_checkbox.isChecked())
 
         self.doubleClicked.connect(self.open_file)
         # self.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.setEditTriggers(QAbstractItemView.SelectedClicked | QAbstractItemView.EditKeyPressed)
         self.selectionModel().selectionChanged.connect(self.on_selection_changed)
 
-        self.model.dataChanged.connect(self.on_data_changed)
+        self.model.rename_requested.connect(self.rename_file)
         self.last_action = ""
-        self.renamed_items = {}
         self.trashed_files = []
         self.removed_files = []
         self.restore_name = {}
@@ -107,13 +121,15 @@ class FileTreeWidget(QTreeView):
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
             logger.debug(f"urls: {urls}")
+            file_paths = []
             for url in urls:
                 if url.isLocalFile():
                     file_path = url.toLocalFile()
                     if os.path.isdir(file_path):
                         self.add_folder(file_path)
                     else:
-                        self.add_file(file_path)
+                        file_paths.append(file_path)
+            self.add_files(file_paths)
             event.acceptProposedAction()
 
     def contextMenuEvent(self, event):
@@ -165,11 +181,11 @@ class FileTreeWidget(QTreeView):
         restore_trash_action.triggered.connect(self.undo_last_action)
         restore_trash_action.setShortcut(QKeySequence("Ctrl+Z"))
 
-        has_files = bool(len(self.file_paths))
+        has_files = bool(len(self.model))
         # has_trashed = bool(len(self.trashed_files))
         valid_undo = self.last_action not in ("", "add_file", "undo") # != "" and self.last_action != "add_file" and self.last_action != "undo"
 
-        selected_count = len(self.selectedIndexes())
+        selected_count = len(self.selectionModel().selectedRows())
         if selected_count == 0:
             menu.addMenu(import_files_menu)
             menu.addAction(select_all_action)
@@ -234,49 +250,48 @@ class FileTreeWidget(QTreeView):
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             index = self.indexAt(event.pos())
-            if index.isValid() and self.selectionModel().isSelected(index):
+            if index.isValid() and index.column() == 0 and self.selectionModel().isSelected(index):
                 self.rename_item()
         super().mousePressEvent(event)
 
     def move_item(self, direction):
-        if not (indexes := self.selectedIndexes()):
+        if not self.selectionModel().hasSelection():
             return
         index = self.currentIndex()
         self.selectionModel().select(index, QItemSelectionModel.Select | QItemSelectionModel.Rows)
         self.scrollTo(index)
         row = index.row()
-        num_rows = self.model.rowCount()
         new_row = row + direction
-        if new_row < 0 or new_row >= num_rows:
+        if not self.model.move_row(row, new_row):
             return
-        text = self.model.itemFromIndex(index).text()
-        self.model.removeRow(row)
-        if new_row >= num_rows:
-            self.model.insertRow(num_rows)
-            new_row = num_rows - 1
-        else:
-            self.model.insertRow(new_row)
-        self.model.setData(self.model.index(new_row, 0), text, Qt.DisplayRole)
         new_index = self.model.index(new_row, 0)
         self.setCurrentIndex(new_index)
-        self.selectionModel().select(new_index, QItemSelectionModel.Select)
+        self.selectionModel().select(new_index, QItemSelectionModel.Select | QItemSelectionModel.Rows)
+
+    def show_details(self, checked):
+        """
+        Show or hide the document detail columns. Hidden columns are never drawn, so documents are not probed.
+        Args:
+            checked (bool): Whether to show the columns.
+        """
+        for column in range(1, self.model.columnCount()):
+            self.setColumnHidden(column, not checked)
+        self.header().setVisible(checked)
 
     def rename_item(self):
-        indexes = self.selectedIndexes()
-        index = indexes[0]
-        item = self.model.itemFromIndex(index)
-        file_path = item.text()
-        self.renamed_items[index] = file_path
-        self.edit(index)
+        if not (rows := self.selected_rows()):
+            return
+        self.edit(self.model.index(rows[0], 0))
         self.last_action = "rename"
 
-    def on_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles):
-        if top_left != bottom_right:  # Only one item changed
-            return
-        input_value = self.model.data(top_left)
-        old_value = self.renamed_items.pop(top_left, None)
-        if old_value is None: # this prevents recursion when we set the file path text below
-            return
+    def rename_file(self, row, input_value):
+        """
+        Rename the file at row to the name entered in the editor.
+        Args:
+            row (int): Row of the edited item.
+            input_value (str): New file name, without directory or extension.
+        """
+        old_value = self.model.path(row)
         old_dir = os.path.dirname(old_value)
         old_file = os.path.basename(old_value)
         old_fn, old_ext = os.path.splitext(old_file)
@@ -293,10 +308,10 @@ class FileTreeWidget(QTreeView):
             new_fn = old_file
         new_value = os.path.join(old_dir, new_fn)
         logger.debug(f"New name: {new_value}")
+        if new_value == old_value:
+            return
         os.rename(old_value, new_value)
-        self.model.itemFromIndex(bottom_right).setText(new_value)
-        self.file_paths.remove(old_value)
-        self.file_paths.add(new_value)
+        self.model.replace_path(row, new_value)
         self.restore_name[new_value] = old_value
         logger.info(f"Renamed {old_value} to {new_value}")
 
@@ -311,28 +326,16 @@ class FileTreeWidget(QTreeView):
         Trash the selected items and remove them from the model.
         """
         self.trashed_files = []
-        if not (indexes := self.selectedIndexes()):
+        if not (rows := self.selected_rows()):
             logger.debug("No selected indexes.")
             return
-        items_to_remove = []
-        for index in sorted(indexes, reverse=True):
-            if not index.isValid():
-                continue
-            item = self.model.itemFromIndex(index)
-            if not item:
-                continue
-            file_path = item.text()
-            if not file_path:
-                continue
+        for row in rows:
+            file_path = self.model.path(row)
             if os.path.isfile(file_path):
                 self.trashed_files.append(file_path)
                 send2trash(file_path)
-            items_to_remove.append((index, file_path))
-        
-        for index, file_path in items_to_remove:
-            if file_path in self.file_paths:
-                self.model.removeRow(index.row())
-                self.file_paths.remove(file_path)
+        self.model.remove_rows(rows)
+        logger.info(f"Trashed {len(self.trashed_files)} files.")
         self.last_action = "trash"
 
     def delete_all_items(self):
@@ -340,21 +343,19 @@ class FileTreeWidget(QTreeView):
         Trash and remove all items from the widget.
         """
         self.trashed_files = []
-        for file_path in self.file_paths:
+        for file_path in self.model.paths:
             logger.debug(f"deleting file: {file_path}")
             if os.path.isfile(file_path):
                 self.trashed_files.append(file_path)
                 send2trash(file_path)
         self.model.clear()
-        self.file_paths.clear()
+        logger.info(f"Trashed {len(self.trashed_files)} files.")
         self.last_action = "trash"
 
     def restore_removed_items(self):
         logger.debug(f"Removed files list: {self.removed_files}")
-        for file in self.removed_files:
-            self.add_file(file)
-        removed_file_list = ', '.join(self.removed_files)
-        logger.info(f"Restored removed items: {removed_file_list}")
+        self.add_files(self.removed_files)
+        logger.info(f"Restored {len(self.removed_files)} removed items.")
         self.removed_files = []
 
     def restore_renamed_item(self):
@@ -362,12 +363,11 @@ class FileTreeWidget(QTreeView):
             logger.warning(f"No name to restore")
         rename, original = self.restore_name.popitem()
         os.rename(rename, original)
-        index = self.find_index_by_text(rename)
-        if not index:
+        row = self.model.row_of(rename)
+        if row is None:
             logger.error(f"No model index for: {rename}")
-        self.model.itemFromIndex(index).setText(original)
-        self.file_paths.remove(rename)
-        self.file_paths.add(original)
+            return
+        self.model.replace_path(row, original)
         logger.info(f"UNDO: Name restored to {original} from {rename}")
 
     def restore_trashed_items(self):
@@ -425,11 +425,9 @@ class FileTreeWidget(QTreeView):
         """
         Remove all items from the widget.
         """
-        self.removed_files = []
-        for file_path in file_paths:
-            self.removed_files.append(file_path)
+        self.removed_files = list(self.model.paths)
         self.model.clear()
-        self.file_paths.clear()
+        logger.info(f"Removed {len(self.removed_files)} files.")
         self.last_action = "remove"
     
     def remove_selected_items(self):
@@ -437,26 +435,10 @@ class FileTreeWidget(QTreeView):
         Remove the selected items from the model.
         """
         self.removed_files = []
-        if not (indexes := self.selectedIndexes()):
+        if not (rows := self.selected_rows()):
             return
-        # Collect items to remove in reverse order to avoid index shifting issues
-        items_to_remove = []
-        for index in sorted(indexes, reverse=True):
-            if not index.isValid():
-                continue
-            item = self.model.itemFromIndex(index)
-            if not item:
-                continue
-            file_path = item.text()
-            if not file_path:
-                continue
-            items_to_remove.append((index, file_path))
-
-        for index, file_path in items_to_remove:
-            if file_path in self.file_paths:
-                self.removed_files.append(file_path)
-                self.model.removeRow(index.row())
-                self.file_paths.remove(file_path)
+        self.removed_files = self.model.remove_rows(rows)
+        logger.info(f"Removed {len(self.removed_files)} files.")
         self.last_action = "remove"
 
     def undo_last_action(self):
@@ -479,30 +461,117 @@ class FileTreeWidget(QTreeView):
         if not os.path.exists(file_path):
             logger.warning(f"Filepath does not exist: {file_path}")
             raise ValueError(f"Path not valid: {file_path}")
-            return
-        if any(file_path.lower().endswith(ext) for ext in self.allowed_extensions):
-            if file_path not in self.file_paths:
-                file_item = QStandardItem(file_path)
-                self.model.appendRow(file_item)
-                self.file_paths.add(file_path)
-                logger.info(f"Added file: {file_path}")
+        self.add_files([file_path])
+
+    def add_files(self, file_paths, check_exists=True):
+        """
+        Add files to the widget in one model insertion, logging a single summary line.
+        Files that do not exist, have an unsupported extension, or are already present are skipped.
+        Args:
+            file_paths (iterable of str): The paths of the files to be added.
+            check_exists (bool): Optional. Skip the existence check, for paths just read from the filesystem.
+        Returns:
+            list of str: The paths added.
+        """
+        file_paths = list(file_paths)
+        extensions = tuple(self.allowed_extensions)
+        supported = []
+        unsupported = missing = 0
+        for file_path in file_paths:
+            if not file_path.lower().endswith(extensions):
+                unsupported += 1
+                logger.debug(f"{file_path} is not a supported filetype: {self.allowed_extensions}")
+            elif check_exists and not os.path.exists(file_path):
+                missing += 1
+                logger.debug(f"Filepath does not exist: {file_path}")
             else:
-                logger.warning(f"{file_path} is already present.")
-        else:
-            logger.warning(f"{file_path} is not a supported filetype: {self.allowed_extensions}")
+                supported.append(file_path)
+        added = self.model.insert_paths(supported)
+        present = len(supported) - len(added)
+        if len(file_paths) == 1:
+            if added:
+                logger.info(f"Added file: {added[0]}")
+            elif present:
+                logger.warning(f"{file_paths[0]} is already present.")
+            elif unsupported:
+                logger.warning(f"{file_paths[0]} is not a supported filetype: {self.allowed_extensions}")
+            else:
+                logger.warning(f"Filepath does not exist: {file_paths[0]}")
+        elif file_paths:
+            skipped = [f"{count} {reason}" for count, reason in ((present, "already present"), (unsupported, "unsupported"), (missing, "missing")) if count]
+            logger.info(f"Added {len(added)} files." + (f" Skipped {', '.join(skipped)}." if skipped else ""))
         self.last_action = "add_file"
+        return added
+
+    def add_result_files(self, result):
+        """
+        Add the output files of a finished job to the widget if enabled in settings.
+        Outputs that cannot be opened in the tree, like MP3 and PNG files, are skipped.
+        Args:
+            result (JobResult): The result of a finished job.
+        """
+        if not self.settings.add_file_checkbox.isChecked():
+            return
+        extensions = tuple(self.allowed_extensions)
+        output_files = [output_file for output_file in result.output_files if output_file.lower().endswith(extensions)]
+        for output_file in output_files:
+            # an output that overwrote a listed file has new details
+            self.model.refresh_details(output_file)
+        self.add_files(output_files)
 
     def add_folder(self, folder):
         """
-        Add the contents of a folder to the widget.
+        Add the contents of a folder and its subfolders to the widget.
+        The folder is walked on a background thread and files are added in batches as they are found,
+        using the depth and include/exclude patterns in settings.
         Args:
             folder (str): The path of the folder to be added.
         """
         logger.debug(f"add_folder folder: {folder}")
-        for file_name in os.listdir(folder):
-            file_path = os.path.join(folder, file_name)
-            if os.path.isfile(file_path):
-                self.add_file(file_path)
+        if folder in self.folder_imports:
+            logger.warning(f"{folder} is already being imported.")
+            return
+        max_depth = self.settings.import_depth_spinbox.value()
+        folder_import = FolderImport(
+            folder,
+            self.allowed_extensions,
+            include=parse_patterns(self.settings.import_include_input.text()),
+            exclude=parse_patterns(self.settings.import_exclude_input.text()),
+            max_depth=None if max_depth < 0 else max_depth,
+        )
+        folder_import.signals.batch_found.connect(lambda batch: self.add_folder_batch(folder_import, batch), Qt.QueuedConnection)
+        folder_import.signals.finished.connect(self.folder_import_finished, Qt.QueuedConnection)
+        self.folder_imports[folder] = folder_import
+        logger.info(f"Importing {folder}...")
+        QThreadPool.globalInstance().start(folder_import)
+
+    def add_folder_batch(self, folder_import, batch):
+        """
+        Add a batch of files found by a folder import.
+        Args:
+            folder_import (FolderImport): The import that found the files.
+            batch (list of str): Paths of existing files with allowed extensions.
+        """
+        folder_import.added += len(self.model.insert_paths(batch))
+        self.last_action = "add_file"
+
+    def folder_import_finished(self, folder_import):
+        """
+        Log the summary of a finished folder import.
+        Args:
+            folder_import (FolderImport): The import that finished.
+        """
+        self.folder_imports.pop(folder_import.folder, None)
+        if folder_import.cancelled.is_set():
+            logger.info(f"Import of {folder_import.folder} cancelled after {folder_import.added} files.")
+            return
+        present = folder_import.found - folder_import.added
+        logger.info(f"Added {folder_import.added} files from {folder_import.folder} in {folder_import.elapsed:.1f}s." + (f" Skipped {present} already present." if present else ""))
+
+    def cancel_folder_imports(self):
+        """Stop every running folder import."""
+        for folder_import in self.folder_imports.values():
+            folder_import.cancel()
 
     def select_folder(self):
         """Open a file dialog to select a folder and add the contents to file_tree_widget."""
@@ -526,19 +595,18 @@ class FileTreeWidget(QTreeView):
         
         if file_dialog.exec():
             file_paths = file_dialog.selectedFiles()
-            for file_path in file_paths:
-                logger.debug(f"Selected file: {file_path}")
-                self.add_file(file_path)
+            logger.debug(f"Selected files: {file_paths}")
+            self.add_files(file_paths)
 
     def open_files(self):
         """
         Open one or more selected files in the default application.
         """
-        if not (indexes := self.selectedIndexes()):
+        if not (rows := self.selected_rows()):
             logger.debug("No selected indexes.")
             return
-        for index in sorted(indexes, reverse=True):
-            self.open_file(index)
+        for row in rows:
+            self.open_file(self.model.index(row, 0))
 
     def open_file(self, index):
         """
@@ -548,12 +616,7 @@ class FileTreeWidget(QTreeView):
         """
         if not index.isValid():
             return
-        item = self.model.itemFromIndex(index)
-        if not item:
-            return
-        file_path = item.text()
-        if not file_path:
-            return
+        file_path = self.model.path(index.row())
         logger.debug(f"open_file file: {file_path}")
         if os.path.exists(file_path):
             QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
@@ -563,20 +626,13 @@ class FileTreeWidget(QTreeView):
         """
         Open the parent directory of one or more selected files in the default application.
         """
-        if not (indexes := self.selectedIndexes()):
+        if not (rows := self.selected_rows()):
             logger.debug("No selected indexes.")
             return
         system_platform = platform.system()
         logger.debug(f"Operating System: {system_platform}")
-        for index in sorted(indexes, reverse=True):
-            if not index.isValid():
-                continue
-            item = self.model.itemFromIndex(index)
-            if not item:
-                continue
-            file_path = item.text()
-            if not file_path:
-                continue
+        for row in rows:
+            file_path = self.model.path(row)
             logger.debug(f"file_path: {file_path}")
 
             parent_dir = os.path.dirname(file_path)
@@ -598,25 +654,27 @@ class FileTreeWidget(QTreeView):
             selected (QItemSelection): Newly selected items.
             deselected (QItemSelection): Newly deselected items.
         """
-        current_selection_count = len(self.selectionModel().selectedIndexes())
-        if not hasattr(self, '_previous_selection_count'):
-            self._previous_selection_count = 0
-        if self._previous_selection_count == 0 and current_selection_count > 0:
+        has_selection = self.selectionModel().hasSelection()
+        if not hasattr(self, '_previous_has_selection'):
+            self._previous_has_selection = False
+        if not self._previous_has_selection and has_selection:
             self.button_toggle.emit(True)
-        elif self._previous_selection_count > 0 and current_selection_count == 0:
+        elif self._previous_has_selection and not has_selection:
             self.button_toggle.emit(False)
-        self._previous_selection_count = current_selection_count
+        self._previous_has_selection = has_selection
+
+    def selected_rows(self):
+        """Return the selected rows in display order."""
+        return sorted(index.row() for index in self.selectionModel().selectedRows())
+
+    def selected_file_paths(self):
+        """Return the selected file paths in display order."""
+        return [self.model.path(row) for row in self.selected_rows()]
 
     def find_index_by_text(self, text):
-        """ 
-        Iterate through all rows and columns in the model to find the item with the given text. 
+        """
+        Return the index of the item with the given path, or None.
         Args:
             text: the filename of an item of an index to search for
         """
-        for row in range(self.model.rowCount()):
-            for column in range(self.model.columnCount()):
-                index = self.model.index(row, column)
-                item = self.model.itemFromIndex(index)
-                if item.text() == text:
-                    return index
-        return None
\ No newline at end of file
+        return self.model.index_of(text)
\ No newline at end of file
@@ -2,38 +2,25 @@ from PySide6.QtWidgets import *
 from PySide6.QtCore import *
 from PySide6.QtGui import *
 from pdfp.settings_window import SettingsWindow
+from pdfp.utils.latency_monitor import LatencyMonitor
 import logging
+import logging.handlers
 import sys
+import gzip
+import queue
+import shutil
 import traceback
 import os
 import json
 import platform
+import threading
 import subprocess
+from collections import deque
 
-def addLoggingLevel(levelName, levelNum, methodName=None):
-    """
-    https://stackoverflow.com/a/35804945
-    http://stackoverflow.com/q/2183233/2988730
-    http://stackoverflow.com/a/13638084/2988730
-    https://github.com/7x11x13/songs-to-youtube/blob/0f862da73cddb0e2209f3b96c6515cee168bd10c/songs_to_youtube/log.py
-    """
-    if not methodName:
-        methodName = levelName.lower()
-    if hasattr(logging, levelName):
-        raise AttributeError("{} already defined in logging module".format(levelName))
-    if hasattr(logging, methodName):
-        raise AttributeError("{} already defined in logging module".format(methodName))
-    if hasattr(logging.getLoggerClass(), methodName):
-        raise AttributeError("{} already defined in logger class".format(methodName))
-    def logForLevel(self, message, *args, **kwargs):
-        if self.isEnabledFor(levelNum):
-            self._log(levelNum, message, args, **kwargs)
-    def logToRoot(message, *args, **kwargs):
-        logging.log(levelNum, message, *args, **kwargs)
-    logging.addLevelName(levelNum, levelName)
-    setattr(logging, levelName, levelNum)
-    setattr(logging.getLoggerClass(), methodName, logForLevel)
-    setattr(logging, methodName, logToRoot)
+# Milliseconds between flushes of queued records to the log view
+LOG_FLUSH_MS = 100
+# Records kept in the log view when none is configured
+DEFAULT_LOG_MAX_LINES = 10000
 
 class LogWidgetFormatter(logging.Formatter):
     """A custom formatter for logging that trims leading and trailing whitespace from log messages."""
@@ -44,7 +31,10 @@ class LogWidgetFormatter(logging.Formatter):
         return super().format(record).strip()
 
 class LogWidgetLogger(logging.Handler):
-    """Log displayed in the log widget."""
+    """
+    Log displayed in the log widget.
+    Records are queued on the widget and flushed in batches on the GUI thread, so they can be logged from job engine threads.
+    """
     COLORS = {
         "DEBUG": QColor("blue"),
         "INFO": QColor("black"),
@@ -53,18 +43,25 @@ class LogWidgetLogger(logging.Handler):
         "CRITICAL": QColor("red"),
         "SUCCESS": QColor("green"),
     }
-    def __init__(self, parent: QTextEdit):
+    def __init__(self, parent: QPlainTextEdit):
         super().__init__()
         self.widget = parent
 
     def emit(self, record):
-        color = self.COLORS[record.levelname]
-        self.widget.setTextColor(color)
-        self.widget.append(self.format(record))
-        self.widget.verticalScrollBar().setValue(self.widget.verticalScrollBar().maximum())
+        self.widget.post_record(record.levelname, self.format(record))
+
+def gzip_rotator(source, dest):
+    """Compress a rotated log file. Used as the rotator of rotating file handlers."""
+    with open(source, 'rb') as source_file, gzip.open(dest, 'wb') as dest_file:
+        shutil.copyfileobj(source_file, dest_file)
+    os.remove(source)
+
+def gzip_namer(name):
+    """Name compressed rotated log files. Used as the namer of rotating file handlers."""
+    return name + ".gz"
 
 class JsonFormatter(logging.Formatter):
-    """Format log messages in JSON."""
+    """Format log messages in JSON. Structured data passed as extra={"details": {...}} is kept as a JSON object."""
     def format(self, record):
         log_record = {
             'time': self.formatTime(record, "%Y-%m-%d %H:%M:%S"),
@@ -73,26 +70,48 @@ class JsonFormatter(logging.Formatter):
             'function': record.funcName,
             'message': record.getMessage()
         }
+        if (details := getattr(record, "details", None)) is not None:
+            log_record['details'] = details
         return json.dumps(log_record)
 
-class LogWidget(QTextEdit):
+class LogWidget(QPlainTextEdit):
     """
-    Display logs and progress bars for pdfp operations.
-    This widget connects to various signals from different operations and displays log messages and progress.
+    Display logs for pdfp operations.
+    Records are queued from any thread and appended in batches every LOG_FLUSH_MS.
+    Only the newest max_lines records are kept, both in a ring buffer and in the view, so long sessions stay fast.
     Attributes:
-        pb_label (QLabel): A label for the progress bar.
-        progress_bar (QProgressBar): A progress bar to show operation progress.
-        pb_scroll_area (QScrollArea): A scroll area containing the progress bar and label.
+        records (deque): Ring buffer of (levelname, text) of the records shown.
+        pending (list): Records queued since the last flush.
+        flush_timer (QTimer): Single-shot timer that appends pending records to the view.
+        records_posted (Signal): Emitted by the first record queued after a flush, to start flush_timer on the GUI thread.
     """
+    records_posted = Signal()
     def __init__(self):
         super().__init__()
         self.settings = SettingsWindow.instance()
         self.settings.log_signal.connect(self.logging_signal_manager)
+        self.records = deque(maxlen=DEFAULT_LOG_MAX_LINES)
+        self.pending = []
+        self.pending_lock = threading.Lock()
+        self.flush_scheduled = False
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(LOG_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush_records)
+        self.records_posted.connect(self.schedule_flush, Qt.QueuedConnection)
+        self.formats = {}
+        for levelname, color in LogWidgetLogger.COLORS.items():
+            self.formats[levelname] = QTextCharFormat()
+            self.formats[levelname].setForeground(color)
+        self.update_max_lines()
 
         self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
         self.start_logger()
+        self.update_latency_monitor()
+        QApplication.instance().aboutToQuit.connect(self.stop_log_file)
 
     def start_logger(self):
         """Initialize the logger and its handlers."""
@@ -105,9 +124,57 @@ class LogWidget(QTextEdit):
         self.start_log_file()
         sys.excepthook = self.exception_handler
 
+    def post_record(self, levelname, text):
+        """
+        Queue a formatted log record for the next flush. Safe to call from any thread.
+        Args:
+            levelname (str): The level name of the record.
+            text (str): The formatted record.
+        """
+        with self.pending_lock:
+            self.pending.append((levelname, text))
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        self.records_posted.emit()
+
+    @Slot()
+    def schedule_flush(self):
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    @Slot()
+    def flush_records(self):
+        """Append the queued records in their levels' colors in one edit, then scroll to the bottom."""
+        with self.pending_lock:
+            pending = self.pending
+            self.pending = []
+            self.flush_scheduled = False
+        # records that would be dropped by the cap in this same flush are never drawn
+        pending = pending[-self.records.maxlen:]
+        self.records.extend(pending)
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for levelname, text in pending:
+            if not self.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertText(text, self.formats.get(levelname, self.formats["INFO"]))
+        cursor.endEditBlock()
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def update_max_lines(self):
+        """Resize the ring buffer and the view to the line cap specified in settings."""
+        max_lines = self.settings.log_max_lines_spinbox.value() or DEFAULT_LOG_MAX_LINES
+        if max_lines != self.records.maxlen:
+            self.records = deque(self.records, maxlen=max_lines)
+        #multi-line records take several blocks, so the view keeps at least max_lines lines
+        self.setMaximumBlockCount(max_lines)
+
     def restart_logger(self):
         """Restart the logger. Disable, remove all handlers, and re-initialize."""
         self.logger.disabled = True
+        self.stop_log_file()
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
             handler.close()
@@ -130,7 +197,7 @@ class LogWidget(QTextEdit):
     
     def update_log_file(self):
         """Remove the file handler and re-initialize."""
-        self.logger.removeHandler(self.file_handler)
+        self.stop_log_file()
         self.start_log_file()
         
     def logging_signal_manager(self, func):
@@ -145,18 +212,58 @@ class LogWidget(QTextEdit):
             self.update_log_level()
         elif func == "update_log_file":
             self.update_log_file()
+        elif func == "update_latency_monitor":
+            self.update_latency_monitor()
+        elif func == "update_max_lines":
+            self.update_max_lines()
+
+    def update_latency_monitor(self):
+        """Start or stop the event loop latency monitor as specified in settings."""
+        LatencyMonitor.instance().configure(self.settings.latency_monitor_checkbox.isChecked(), self.settings.latency_threshold_spinbox.value())
 
     def start_log_file(self):
-        """Initialize the log file with specified settings."""
-        if self.settings.log_file_checkbox.isChecked():
-            log_file = self.get_log_dir(True)
-            self.file_handler = logging.FileHandler(log_file)
-            self.file_handler.setLevel(logging.DEBUG)
-            if self.settings.log_file_radio.isChecked():
-                self.file_handler.setFormatter(LogWidgetFormatter("[%(asctime)s] [%(levelname)s] [%(filename)s] [%(funcName)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
-            else:
-                self.file_handler.setFormatter(JsonFormatter())
-            self.logger.addHandler(self.file_handler)
+        """
+        Initialize the log file with specified settings.
+        Records are put on a queue by the logging thread and written by a QueueListener on a background thread,
+        so writing and rotating the file never blocks an operation.
+        """
+        if not self.settings.log_file_checkbox.isChecked():
+            return
+        log_file = self.get_log_dir(True)
+        rotation = self.settings.log_rotation_combobox.currentText()
+        backup_count = self.settings.log_backup_count_spinbox.value()
+        if rotation == "By size":
+            max_bytes = self.settings.log_rotation_size_spinbox.value() * 1024 * 1024
+            target = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        elif rotation == "Daily":
+            target = logging.handlers.TimedRotatingFileHandler(log_file, when="midnight", backupCount=backup_count, encoding='utf-8')
+        else:
+            target = logging.FileHandler(log_file, encoding='utf-8')
+        if rotation != "Never" and self.settings.log_compress_checkbox.isChecked():
+            target.namer = gzip_namer
+            target.rotator = gzip_rotator
+        target.setLevel(logging.DEBUG)
+        if self.settings.log_file_radio.isChecked():
+            target.setFormatter(LogWidgetFormatter("[%(asctime)s] [%(levelname)s] [%(filename)s] [%(funcName)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+        else:
+            target.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        self.file_handler = logging.handlers.QueueHandler(log_queue)
+        self.file_handler.setLevel(logging.DEBUG)
+        self.file_listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+        self.file_listener.start()
+        self.logger.addHandler(self.file_handler)
+
+    def stop_log_file(self):
+        """Remove the file handler, write the records still queued and close the log file."""
+        if getattr(self, "file_handler", None) is not None:
+            self.logger.removeHandler(self.file_handler)
+            self.file_handler = None
+        if getattr(self, "file_listener", None) is not None:
+            self.file_listener.stop()
+            for handler in self.file_listener.handlers:
+                handler.close()
+            self.file_listener = None
 
     def exception_handler(self, type, value, trace):
         """Log exceptions to the logger."""
@@ -214,9 +321,8 @@ class LogWidget(QTextEdit):
         if file_path:
             if not file_path.endswith(".log"):
                 file_path += ".log"
-            text = self.toPlainText()
             with open(file_path, 'w', encoding='utf-8') as output_log_file:
-                output_log_file.write(text)
+                output_log_file.write("\n".join(text for _, text in self.records))
         return
 
     def keyPressEvent(self, event):
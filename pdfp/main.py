@@ -1,19 +1,24 @@
-from PySide6.QtWidgets import QApplication, QMainWindow
-from PySide6.QtGui import QIcon
-from PySide6.QtCore import QDir, QLoggingCategory
 import sys
 import os
-from pdfp.main_window import MainWindow
-from pdfp.log_widget import addLoggingLevel
+from pdfp.utils.log_levels import addLoggingLevel
 
 def main():
     """
     Main entry point for pdfp.
+    - Runs headless batch mode instead of the GUI if the first argument is "batch".
     - Changes the current working directory to the script's directory.
     - Sets up the QApplication and application-wide icon.
     - Initializes and shows the main window.
     - Starts the application's event loop.
     """
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from pdfp.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    #imported here so batch mode never loads QtGui, which needs display libraries headless servers lack
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QIcon
+    from PySide6.QtCore import QDir, QLoggingCategory
+    from pdfp.main_window import MainWindow
     os.chdir(os.path.dirname(__file__))
     addLoggingLevel("SUCCESS", 60, "success")
     QLoggingCategory.setFilterRules("qt.accessibility.atspi=false")
@@ -1,14 +1,15 @@
 import os
-from PySide6.QtWidgets import QWidget, QPushButton, QMainWindow, QHBoxLayout, QVBoxLayout, QToolBar, QStatusBar, QMessageBox, QSplitter, QLabel, QFileDialog, QApplication
-from PySide6.QtCore import QSize, Qt, QDir, QObject
+from PySide6.QtWidgets import QWidget, QPushButton, QMainWindow, QHBoxLayout, QVBoxLayout, QToolBar, QStatusBar, QMessageBox, QSplitter, QLabel, QFileDialog
+from PySide6.QtCore import QSize, Qt, QDir
 from PySide6.QtGui import QAction, QIcon, QPixmap
 from pdfp.settings_window import SettingsWindow
 from pdfp.file_tree_widget import FileTreeWidget
+from pdfp.preview_widget import PreviewWidget
 from pdfp.button_widget import ButtonWidget
 from pdfp.log_widget import LogWidget
 from pdfp.progress_widget import ProgressWidget
+from pdfp.utils.job_engine import JobEngine
 import logging
-from ocrmypdf import hookimpl
 
 logger = logging.getLogger("pdfp")
 
@@ -16,7 +17,7 @@ class MainWindow(QMainWindow):
     """
     Main window for the pdfp application. Holds file_tree_widget, button_widget, log_widget, and menu_bar.
     The menu_bar contains the File menu with actions: Import File, Import Folder, Settings, About, and Quit.
-    file_tree_widget and button_widget are housed in a horizontal splitter within a vertical splitter with log_widget.
+    file_tree_widget, preview_widget and button_widget are housed in a horizontal splitter within a vertical splitter with log_widget.
     """
 
     def __init__(self, app):
@@ -47,6 +48,7 @@ class MainWindow(QMainWindow):
         
         self.file_tree_widget = FileTreeWidget()
         self.file_tree_widget.button_toggle.connect(self.toggle_button_widget)
+        self.preview_widget = PreviewWidget(self.file_tree_widget)
         self.log_widget = LogWidget()
         self.log_widget.setMinimumWidth(450)
         self.button_widget = ButtonWidget.instance()
@@ -57,8 +59,9 @@ class MainWindow(QMainWindow):
 
         hsplitter = QSplitter(Qt.Horizontal)
         hsplitter.addWidget(self.file_tree_widget)
+        hsplitter.addWidget(self.preview_widget)
         hsplitter.addWidget(self.button_widget)
-        hsplitter.setSizes([600, 200])
+        hsplitter.setSizes([420, 200, 200])
         hsplitter.setHandleWidth(8)
         hsplitter.setContentsMargins(10,10,10,2)
 
@@ -89,9 +92,8 @@ class MainWindow(QMainWindow):
         
         if file_dialog.exec():
             file_paths = file_dialog.selectedFiles()
-            for file_path in file_paths:
-                logger.debug(f"Selected file: {file_path}")
-                self.file_tree_widget.add_file(file_path)
+            logger.debug(f"Selected files: {file_paths}")
+            self.file_tree_widget.add_files(file_paths)
 
     def select_folder(self):
         """Open a file dialog to select a folder and add the contents to file_tree_widget."""
@@ -150,60 +152,7 @@ class MainWindow(QMainWindow):
             self.resize(size)
 
     def toggle_button_widget(self, toggle):
-        """Enable or disable ButtonWidget."""
-        self.button_widget.setEnabled(toggle)
-
-
-class MyProgressBar(QObject):
-    wn = ""
-    def __init__(
-        self,
-        *,
-        total: int | float | None,
-        desc: str | None,
-        unit: str | None,
-        disable: bool = False,
-        **kwargs,
-    ):
-        super().__init__()
-        logger.debug(f"OCR job total units: {total}")
-        logger.debug(f"OCR job description: {desc}")
-        self.total = total
-        self.desc = desc
-        self.pw = ProgressWidget.instance()
-
-    def __enter__(self):
-        """Enter a progress bar context."""
-        if self.wn == "":
-            return self
-        self.pw.revise_worker_label(self.wn, self.desc)
-        logger.debug(f"Revising worker label: {self.desc}")
-        self.progress = 0
-        self.total_parts = self.total
-        self.progress_percentage = 0
-        return self
-
-    def __exit__(self, *args):
-        """Exit a progress bar context."""
-        if self.desc == "Linearizing":
-            self.pw.worker_done(self.wn)
-        return False
-
-    def update(self, n=1, *, completed=None):
-        """Update the progress bar by an increment."""
-        if self.wn == "":
+        """Enable or disable ButtonWidget. ButtonWidget stays disabled while the job engine is busy."""
+        if toggle and JobEngine.instance().is_busy():
             return
-        self.progress += n
-        self.progress_percentage = (self.progress / self.total_parts) * 100
-        self.pw.worker_progress(self.wn, self.progress_percentage)
-        # logger.debug(f"Worker progress: {self.wn}, {self.progress_percentage}") #very chatty
-        QApplication.processEvents()
-
-@hookimpl
-def get_progressbar_class():
-    return MyProgressBar
-
-@hookimpl
-def validate(pdfinfo, options):
-    MyProgressBar.wn = f"OCR_{options.input_file}"
-    logger.debug(f"Validate worker name: {MyProgressBar.wn}")
\ No newline at end of file
+        self.button_widget.setEnabled(toggle)
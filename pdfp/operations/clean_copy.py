@@ -2,11 +2,11 @@ import os
 import subprocess
 import math
 from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QApplication
-from pdfp.settings_window import SettingsWindow
+from pdfp.utils.operation_settings import OperationSettings
 from pdfp.utils.filename_constructor import construct_filename
-from pdfp.utils.clean_text import clean_text
+from pdfp.utils.clean_text import clean_text, iter_clean_text
 from pdfp.utils.tts_limit import tts_word_count
+from pdfp.utils.job_result import JobResult
 import pymupdf
 import logging
 
@@ -20,45 +20,45 @@ class Converter(QObject):
     def __init__(self):
         super().__init__()
 
-    def copy_pdf(self, file_tree, pdf, cc_file_checked):
+    def copy_pdf(self, pdf, cc_file_checked, settings):
         """
         Extracts text from a PDF, handles text splitting if enabled, and either writes it to multiple
         files or copies it to the clipboard.
         Args:
-            file_tree (QObject): Tree widget to add output files.
             pdf (str): Path to the PDF file to extract text from.
             cc_file_checked (bool): Indicates whether to split text into multiple files or copy to clipboard.
+            settings (OperationSettings): Settings to use.
+        Returns:
+            JobResult: The result of the copy. Clipboard text is set by the job engine on the GUI thread.
         """
-        full_text = clean_text(pdf)
         if cc_file_checked:
-            output_txt_path = construct_filename(pdf, "cc_ps")
-            if self.settings.cc_split_txt_checkbox.isChecked():
-                output_paths = tts_word_count(full_text, output_txt_path, True)
-                if self.settings.add_file_checkbox.isChecked():
-                    for output_path in output_paths:
-                        file_tree.add_file(output_path)
-            else:
-                output_paths = tts_word_count(full_text, output_txt_path)
-                if self.settings.add_file_checkbox.isChecked():
-                    output_file = output_paths[0]
-                    file_tree.add_file(output_file)
-                return output_file
+            #stream pages straight to the file rather than building the whole text first
+            pieces = iter_clean_text(pdf, settings)
+            if pieces is None:
+                return JobResult.failed(pdf, "Filetype is not PDF or TXT.")
+            output_txt_path = construct_filename(pdf, "cc_ps", settings=settings)
+            output_paths = tts_word_count(pieces, output_txt_path, settings.enable_cc_split_txt, settings)
+            return JobResult.success(pdf, output_paths)
         else:
+            full_text = clean_text(pdf, settings)
+            if full_text is None:
+                return JobResult.failed(pdf, "Filetype is not PDF or TXT.")
             tts_word_count(full_text)
-            QApplication.clipboard().setText(full_text)
             logger.info(f"PDF contents copied to clipboard.")
+            return JobResult.success(pdf, clipboard_text=full_text)
 
-    def convert(self, file_tree, pdf, cc_file_checked):
+    def convert(self, pdf, cc_file_checked, settings=None):
         """
         Initiates the PDF text extraction and transformation process based on user settings.
         Args:
-            file_tree (QObject): Tree widget to add output files.
             pdf (str): Path to the PDF file to extract text from.
             cc_file_checked (bool): Indicates whether to split text into multiple files or copy to clipboard.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        Returns:
+            JobResult: The result of the copy.
         """
-        self.settings = SettingsWindow.instance()
+        settings = settings or OperationSettings.current()
         logger.success(f"Converting {pdf}...")
-        QApplication.processEvents()
-        self.copy_pdf(file_tree, pdf, cc_file_checked)
+        return self.copy_pdf(pdf, cc_file_checked, settings)
         
 clean_copy = Converter()
\ No newline at end of file
@@ -3,9 +3,9 @@ import os
 import sys
 import subprocess
 from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QApplication
-from pdfp.settings_window import SettingsWindow
+from pdfp.utils.operation_settings import OperationSettings
 from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.job_result import JobResult
 import logging
 
 logger = logging.getLogger("pdfp")
@@ -24,42 +24,43 @@ class Converter(QObject):
     worker_done = Signal(str)
     def __init__(self):
         super().__init__()
-    def convert(self, file_tree, pdf):
+    def convert(self, pdf, settings=None, output_file=None):
         """
         Performs PDF cropping operation using Briss based on user settings.
         Args:
-            file_tree (QObject): Tree widget to add cropped PDF file.
             pdf (str): Path to the PDF file to be cropped.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+            output_file (str): Optional. Path to write to when cropping automatically. Defaults to a filename constructed from pdf.
+        Returns:
+            JobResult: The result of the crop. Launching the Briss GUI is reported as skipped.
         Notes:
             - Emits a message if the provided file is not a PDF.
             - Retrieves Briss executable location from settings and verifies its existence.
             - Verifies that Java is installed.
             - If automatic cropping is enabled, crops the PDF using Briss and saves the output.
             - Launches Briss with the PDF file if automatic cropping is disabled.
-            - Adds the cropped file to the file_tree widget if specified in settings.
         """
         if not pdf.endswith('.pdf'):
             logger.error(f"File is not a PDF.")
-            return
+            return JobResult.failed(pdf, "File is not a PDF.")
 
-        self.settings = SettingsWindow.instance()
-        briss_location = self.settings.briss_location_display.text()
+        settings = settings or OperationSettings.current()
+        briss_location = settings.briss_location
         if not os.path.exists(briss_location):
             logger.error(f"Briss location invalid. Configure in settings.")
-            return
+            return JobResult.failed(pdf, "Briss location invalid.")
         try:
             subprocess.run(["java", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, FileNotFoundError):
             logger.error(f"Java is not installed.")
-            return
+            return JobResult.failed(pdf, "Java is not installed.")
 
         worker_name = f"Crop_{pdf}"
-        automation_enabled = self.settings.auto_crop_radio.isChecked()
+        automation_enabled = settings.auto_crop_checked
         if automation_enabled:
             self.worker_progress.emit(worker_name, 0)
             logger.info(f"Cropping {pdf}...")
-            QApplication.processEvents()
-            output_file = construct_filename(pdf, "crop_ps")
+            output_file = output_file or construct_filename(pdf, "crop_ps", settings=settings)
             try:
                 process = subprocess.Popen(["java", "-jar", briss_location, "-s", pdf, "-d", output_file], stdout=subprocess.PIPE)
                 progress = 0
@@ -69,23 +70,22 @@ class Converter(QObject):
                         progress += 1
                         progress_percentage = (progress / 3) * 100
                         self.worker_progress.emit(worker_name, progress_percentage)
-                        QApplication.processEvents()
                     if process.poll() is not None:
                         break
                 logger.success(f"Crop complete. Output: {output_file}")
-                if self.settings.add_file_checkbox.isChecked():
-                    file_tree.add_file(output_file)
-                return output_file
+                return JobResult.success(pdf, [output_file])
             except subprocess.CalledProcessError as e:
                 logger.error(f"Conversion failed with exit code {e.returncode}.")
+                return JobResult.failed(pdf, f"Conversion failed with exit code {e.returncode}.")
             finally:
                 self.worker_done.emit(worker_name)
         else:
             logger.info(f"Launching Briss...")
-            QApplication.processEvents()
             try:
                 subprocess.Popen(["java", "-jar", briss_location, pdf], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             except:
                 logger.error(f"Launching Briss failed")
+                return JobResult.failed(pdf, "Launching Briss failed")
+            return JobResult(pdf, "skipped", message="Briss launched for manual cropping.")
 
 crop = Converter()
\ No newline at end of file
@@ -1,8 +1,11 @@
 import os
 from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QApplication
-from pdfp.settings_window import SettingsWindow
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.file_types import ALLOWED_EXTENSIONS
 from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.job_result import JobResult
+from pdfp.utils.result_cache import ResultCache
+from pdfp.utils.memory_usage import PeakMemory
 import pymupdf
 import logging
 
@@ -11,7 +14,17 @@ logger = logging.getLogger("pdfp")
 class Converter(QObject):
     """
     Converter class for converting various file formats to PDF.
+    Large documents are converted in batches of pages, each appended to the output and dropped,
+    so memory holds the laid out source, the output, and one batch instead of two full copies.
+    Signals:
+        worker_progress: Updates the value of the progress bar while batches convert. Connects to progress_widget.
+        revise_worker_label: Updates the label of the progress bar while batches convert. Connects to progress_widget.
+        worker_done: Signals that every batch is converted. Connects to progress_widget.
     """
+    worker_progress = Signal(str, int)
+    revise_worker_label = Signal(str, str)
+    worker_done = Signal(str)
+
     def __init__(self):
         super().__init__()
 
@@ -26,69 +39,130 @@ class Converter(QObject):
         return None
 
     def set_cover_image(self, cover_image, original_pdf):
-        new_pdf = pymupdf.open()
+        """
+        Insert cover_image as a new first page of original_pdf, in place.
+        Bookmarks and links point at page objects, so they still lead to the same pages.
+        """
         first_page = original_pdf[0]
         width, height = first_page.rect.width, first_page.rect.height
-        new_page = new_pdf.new_page(width=width, height=height)
+        new_page = original_pdf.new_page(0, width=width, height=height)
         new_page.insert_image(new_page.rect, filename=cover_image)
-        for page_num in range(len(original_pdf)):
-            new_pdf.insert_pdf(original_pdf, from_page=page_num, to_page=page_num)
-        return new_pdf
+        return original_pdf
+
+    def convert_document(self, input_file, settings):
+        """
+        Converts the input file to an in-memory PDF, preserving the table of contents (TOC) and links.
+        Pages are converted in batches of settings.f2p_batch_pages, and the TOC and links are rebuilt once every page is in place.
+        Args:
+            input_file (str): Path to the input file to be converted.
+            settings (OperationSettings): Settings to use.
+        Returns:
+            pymupdf.Document: The converted PDF. Nothing is written to disk.
+        Raises:
+            ValueError: If the input file has no pages.
+        """
+        with PeakMemory() as memory:
+            with pymupdf.open(input_file) as doc:
+                page_count = len(doc)
+                if page_count == 0:
+                    raise ValueError(f"{input_file} has no pages.")
+                batch_pages = settings.f2p_batch_pages or page_count
+                batches = -(-page_count // batch_pages)
+                worker_name = f"F2PDF_{input_file}"
+                if batches > 1:
+                    self.worker_progress.emit(worker_name, 0)
+                    self.revise_worker_label.emit(worker_name, f"F2PDF ({page_count} pages)")
 
-    def convert(self, file_tree, input_file):
+                pdf = None if batches == 1 else pymupdf.open()
+                try:
+                    for number, start in enumerate(range(0, page_count, batch_pages), 1):
+                        data = doc.convert_to_pdf(from_page=start, to_page=min(start + batch_pages, page_count) - 1)
+                        if pdf is None:
+                            pdf = pymupdf.open("pdf", data)
+                        else:
+                            with pymupdf.open("pdf", data) as batch:
+                                pdf.insert_pdf(batch)
+                        # the batch is in the output now, so its bytes can go before the next is converted
+                        del data
+                        memory.sample()
+                        if batches > 1:
+                            self.worker_progress.emit(worker_name, number * 100 // batches)
+                finally:
+                    if batches > 1:
+                        self.worker_done.emit(worker_name)
+
+                toc = doc.get_toc()
+                pdf.set_toc(toc)
+
+                # link processing
+                for page in doc:
+                    links = page.get_links()
+                    page_out = pdf[page.number]
+                    for l in links:
+                        if l["kind"] == pymupdf.LINK_NAMED:
+                            continue
+                        page_out.insert_link(l)
+
+            if settings.f2p_cover:
+                cover_image = self.check_for_cover_image(input_file)
+                if cover_image:
+                    pdf = self.set_cover_image(cover_image, pdf)
+        logger.info(f"Converted {page_count} pages in {batches} batch(es). Peak memory: {memory.describe()}")
+        return pdf
+
+    def check_filetype(self, input_file):
+        """
+        Check that input_file can be converted.
+        Args:
+            input_file (str): Path to the input file to be converted.
+        Returns:
+            str: An error message, or "" if the file can be converted.
+        """
+        if input_file.lower().endswith('.pdf'):
+            return "File is already a PDF."
+        elif not any(input_file.lower().endswith(ext) for ext in ALLOWED_EXTENSIONS):
+            return f"{input_file} is not a supported filetype: {ALLOWED_EXTENSIONS}"
+        return ""
+
+    def convert(self, input_file, settings=None):
         """
         Converts the input file to PDF format.
             Args:
-                file_tree (QObject): Tree widget to add converted PDF file.
                 input_file (str): Path to the input file to be converted.
+                settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+            Returns:
+                JobResult: The result of the conversion.
             Notes:
                 - If input_file already ends with '.pdf', emits a message indicating it's already a PDF.
                 - If input_file format is not supported, emits a message with supported file types.
                 - Converts the input file to PDF, preserves table of contents (TOC) and links.
                 - Saves the converted PDF with a constructed filename.
-                - Optionally adds the converted file to the file_tree widget if specified in settings.
         """
-        if input_file.lower().endswith('.pdf'):
-            logger.error(f"File is already a PDF.")
-            return
-        elif not any(input_file.lower().endswith(ext) for ext in file_tree.allowed_extensions):
-            logger.error(f"{input_file} is not a supported filetype: {file_tree.allowed_extensions}")
-            return
+        if error := self.check_filetype(input_file):
+            logger.error(error)
+            return JobResult.failed(input_file, error)
 
         logger.info(f"Converting {input_file} to PDF...")
-        QApplication.processEvents()
-
-        doc = pymupdf.open(input_file)
+        settings = settings or OperationSettings.current()
+        output_file = construct_filename(input_file, "f2pdf_ps", settings=settings)
 
-        temp = doc.convert_to_pdf()
-        pdf = pymupdf.open("pdf", temp)
+        cache = ResultCache.for_settings(settings)
+        if cache:
+            cover_image = self.check_for_cover_image(input_file) if settings.f2p_cover else None
+            cache_key = cache.key(input_file, "file2pdf", {"cover": cover_image is not None}, [cover_image] if cover_image else [])
+            if cache.fetch(cache_key, output_file):
+                return JobResult.success(input_file, [output_file])
 
-        toc = doc.get_toc()
-        pdf.set_toc(toc)
-
-        # link processing
-        for page in doc:
-            links = page.get_links()
-            page_out = pdf[page.number]
-            for l in links:
-                if l["kind"] == pymupdf.LINK_NAMED:
-                    continue
-                page_out.insert_link(l)
-
-        self.settings = SettingsWindow.instance()
-
-        if self.settings.f2p_cover_checkbox.isChecked():
-            cover_image = self.check_for_cover_image(input_file)
-            if cover_image:
-                pdf = self.set_cover_image(cover_image, pdf)
-
-        output_file = construct_filename(input_file, "f2pdf_ps")
+        try:
+            pdf = self.convert_document(input_file, settings)
+        except ValueError as e:
+            logger.error(str(e))
+            return JobResult.failed(input_file, str(e))
+        # garbage=4 also merges the fonts and images every batch embedded separately
         pdf.save(output_file, garbage=4, deflate=True)
+        if cache:
+            cache.store(cache_key, output_file)
         logger.success(f"Conversion complete. Output: {output_file}")
-        QApplication.processEvents()
-
-        if self.settings.add_file_checkbox.isChecked():
-            file_tree.add_file(output_file)
-        return output_file
+        return JobResult.success(input_file, [output_file], pages=len(pdf))
 
 file2pdf = Converter()
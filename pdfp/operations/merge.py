@@ -0,0 +1,104 @@
+from PySide6.QtCore import QObject, Signal
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.job_result import JobResult
+import pymupdf
+import logging
+import os
+
+logger = logging.getLogger("pdfp")
+
+def rebased_toc(toc, title, offset, page_count):
+    """
+    Nest the bookmarks of one input under a top-level bookmark for the input, pointing at its pages in the merged PDF.
+    Args:
+        toc (list): Bookmarks of the input from get_toc(simple=True), as [level, title, page].
+        title (str): Title of the input's top-level bookmark.
+        offset (int): Pages of the merged PDF before the input.
+        page_count (int): Pages of the input.
+    Returns:
+        list: Bookmarks for set_toc. Bookmarks without a page of the input, such as headings that only group
+            other bookmarks, point at the next bookmark that has one, or at the input's first page, so their
+            children keep their level.
+    """
+    entries = [[1, title, offset + 1]]
+    # page of the nearest later bookmark with a valid destination, filled in from the end
+    next_page = 1
+    pages = [0] * len(toc)
+    for index in range(len(toc) - 1, -1, -1):
+        page = toc[index][2]
+        if 1 <= page <= page_count:
+            next_page = page
+        pages[index] = next_page
+    for (level, entry_title, page), target in zip(toc, pages):
+        entries.append([level + 1, entry_title, target + offset])
+    return entries
+
+class Converter(QObject):
+    """
+    Merges PDFs into one, in the order given, keeping the bookmarks of each under a bookmark named after the file.
+    Inputs are opened one at a time and closed once copied, so only the merged PDF and one input are in memory.
+    Signals:
+        worker_progress: Updates the value of the progress bar while inputs are copied. Connects to progress_widget.
+        revise_worker_label: Updates the label of the progress bar while the merged PDF is saved. Connects to progress_widget.
+        worker_done: Signals that the merged PDF is written. Connects to progress_widget.
+    """
+    worker_progress = Signal(str, int)
+    revise_worker_label = Signal(str, str)
+    worker_done = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+
+    def convert(self, pdf, pdfs, settings=None):
+        """
+        Merges PDF files into one written next to the first.
+        Args:
+            pdf (str): Path of the first PDF. The output filename is constructed from it.
+            pdfs (list of str): Paths of every PDF to merge, in order, starting with pdf.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        Returns:
+            JobResult: The result of the merge.
+        """
+        not_pdfs = [path for path in pdfs if not path.lower().endswith('.pdf')]
+        if not_pdfs:
+            logger.error(f"Only PDFs can be merged. Not a PDF: {', '.join(not_pdfs)}")
+            return JobResult.failed(pdf, "Only PDFs can be merged.")
+        if len(pdfs) < 2:
+            logger.error(f"Select at least 2 PDFs to merge.")
+            return JobResult.failed(pdf, "Select at least 2 PDFs to merge.")
+
+        logger.info(f"Merging {len(pdfs)} PDFs...")
+        settings = settings or OperationSettings.current()
+        worker_name = f"Merge_{pdf}"
+        self.worker_progress.emit(worker_name, 0)
+        self.revise_worker_label.emit(worker_name, f"Merge ({len(pdfs)} files)")
+
+        try:
+            with pymupdf.open() as output_pdf:
+                toc = []
+                for number, path in enumerate(pdfs, 1):
+                    with pymupdf.open(path) as input_pdf:
+                        if input_pdf.needs_pass:
+                            raise ValueError(f"{path} is password protected.")
+                        offset = len(output_pdf)
+                        # one call per input, so its shared resources are copied once
+                        output_pdf.insert_pdf(input_pdf, from_page=0, to_page=len(input_pdf) - 1)
+                        toc.extend(rebased_toc(input_pdf.get_toc(simple=True), os.path.splitext(os.path.basename(path))[0], offset, len(input_pdf)))
+                    self.worker_progress.emit(worker_name, number * 100 // (len(pdfs) + 1))
+                output_pdf.set_toc(toc)
+                output_file = construct_filename(pdf, "merge_ps", settings=settings)
+                self.revise_worker_label.emit(worker_name, "Merge (saving)")
+                # garbage=4 also merges identical objects, e.g. a font embedded in several inputs
+                output_pdf.save(output_file, garbage=4, deflate=True)
+                pages = len(output_pdf)
+        except (ValueError, RuntimeError) as e:
+            logger.error(f"Error merging PDFs: {e}")
+            return JobResult.failed(pdf, str(e))
+        finally:
+            self.worker_done.emit(worker_name)
+
+        logger.success(f"Merge complete. {len(pdfs)} files, {pages} pages. Output: {output_file}")
+        return JobResult.success(pdf, [output_file], pages=pages)
+
+merge = Converter()
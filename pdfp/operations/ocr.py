@@ -1,17 +1,22 @@
-from PySide6.QtCore import QObject, Signal, QProcess, QDir
-from PySide6.QtWidgets import QApplication
-from pdfp.settings_window import SettingsWindow
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal, Slot, QProcess, QEventLoop
+from pdfp.utils.operation_settings import OperationSettings
 from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.job_result import JobResult
+from pdfp.utils.result_cache import ResultCache
+from pdfp.utils.path_allocator import PathAllocator
 import ocrmypdf
 import pymupdf
 import logging
 import re
-import subprocess
+import shutil
 import os
 import traceback
 
 logger = logging.getLogger("pdfp")
 
+# Threads preparing native OCRs: opening the PDF, hashing it for the result cache and copying cached outputs
+PREPARE_THREADS = 2
+
 class SharedState:
     """
     Holds shared state information for tracking progress of operations.
@@ -26,6 +31,49 @@ class SharedState:
         self.progress_percentage = 0
         self.postprocessing = False
 
+class Preparation(QObject):
+    """
+    Carries the result of a PrepareRunner back to the thread that started the OCR.
+    Created on that thread, so the queued prepared signal is delivered there.
+    """
+    prepared = Signal(object)
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+        self.prepared.connect(self.deliver, Qt.QueuedConnection)
+
+    @Slot(object)
+    def deliver(self, prepared):
+        self.callback(prepared)
+
+class PrepareRunner(QRunnable):
+    """
+    Prepares a native OCR on a pool thread: reads the page count, allocates the output path, hashes the input
+    for the result cache and places a cached output. These read whole files, so they stay off the GUI thread.
+    Emits a tuple of (worker_name, SharedState, output_file, cache, cache_key, hit), or the exception raised.
+    """
+    def __init__(self, converter, pdf, settings, output_file, owner, preparation):
+        super().__init__()
+        self.converter = converter
+        self.pdf = pdf
+        self.settings = settings
+        self.output_file = output_file
+        # the job the output path is reserved for; allocations are tracked per thread
+        self.owner = owner
+        self.preparation = preparation
+
+    def run(self):
+        try:
+            with PathAllocator.instance().owner(self.owner):
+                worker_name, shared_state, output_file = self.converter.prepare(self.pdf, self.settings, self.output_file)
+            cache, cache_key = self.converter.cache_lookup(self.pdf, self.settings)
+            hit = bool(cache and cache.fetch(cache_key, output_file))
+            self.preparation.prepared.emit((worker_name, shared_state, output_file, cache, cache_key, hit))
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            self.preparation.prepared.emit(e)
+
 class Converter(QObject):
     """
     Handles OCR (Optical Character Recognition) operations on PDF files using ocrmypdf.
@@ -43,129 +91,307 @@ class Converter(QObject):
 
     def __init__(self):
         super().__init__()
-    def convert(self, file_tree, pdf):
+        # native ocrmypdf processes that are still running
+        self.processes = set()
+        # Preparations of native OCRs whose process has not started yet
+        self.preparing = set()
+        self.prepare_pool = QThreadPool()
+        self.prepare_pool.setMaxThreadCount(PREPARE_THREADS)
+
+    def cpu_budget(self, file_count, settings=None, processes=False):
+        """
+        Split the machine's cores between documents OCRed at the same time.
+        Settings left at "Auto" (0) are derived from the core count and the other setting.
+        In full auto, each document gets at least 2 cores, since ocrmypdf parallelizes within a document by page.
+        ocrmypdf's Python API holds a lock for the whole of each call, so within one process only native OCR runs
+        documents concurrently. Otherwise documents are OCRed one at a time, each with every core.
+        Args:
+            file_count (int): Number of documents in the batch.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+            processes (bool): Optional. Each document is OCRed in its own process, as in batch mode,
+                so the Python API does not serialize them.
+        Returns:
+            tuple: (documents to OCR concurrently, ocrmypdf jobs per document)
+        """
+        settings = settings or OperationSettings.current()
+        cores = os.cpu_count() or 1
+        if not settings.native_ocr and not processes:
+            return 1, settings.ocr_jobs_per_doc or cores
+        docs = settings.ocr_parallel_docs
+        jobs = settings.ocr_jobs_per_doc
+        if docs == 0:
+            if jobs == 0:
+                docs = max(1, cores // 2)
+            else:
+                docs = max(1, cores // jobs)
+        docs = max(1, min(docs, file_count))
+        if jobs == 0:
+            jobs = max(1, cores // docs)
+        return docs, jobs
+
+    def convert(self, pdf, jobs=0, settings=None, output_file=None):
         """
-        Performs OCR on the specified PDF file.
+        Performs OCR on the specified PDF file and waits for it to finish.
         Args:
-            file_tree (QWidget): The file tree widget where output files may be added.
             pdf (str): Path of the PDF file to perform OCR on.
+            jobs (int): Optional. Number of cores ocrmypdf may use for this document. 0 lets ocrmypdf use all cores.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+            output_file (str): Optional. Path to write to. Defaults to a filename constructed from pdf.
+        Returns:
+            JobResult: The result of the OCR.
         Notes:
             - Emits a message if the provided file is not a PDF.
             - Initializes shared state and sets up logging for progress tracking.
             - Uses ocrmypdf to perform OCR on the PDF file.
             - Emits progress updates and completion signals during the OCR process.
+            - State is kept local to each call so that several files can be OCRed on job engine threads at once.
+            - Native OCR runs through start() inside a local event loop, so this must not be called on the GUI thread.
+              The GUI calls start() directly as an asynchronous job engine batch.
         """
         if not pdf.endswith('.pdf'):
-            self.util_msgs.emit(f"File is not a PDF.")
+            logger.error(f"File is not a PDF.")
+            return JobResult.failed(pdf, "File is not a PDF.")
+
+        settings = settings or OperationSettings.current()
+        if settings.native_ocr:
+            results = []
+            loop = QEventLoop()
+            def finished(result):
+                results.append(result)
+                loop.quit()
+            self.start(pdf, jobs, settings, output_file, finished)
+            if not results:
+                loop.exec()
+            return results[0]
+
+        worker_name, shared_state, output_file = self.prepare(pdf, settings, output_file)
+        deskew_toggle, ocr_filetype, optimize_level = self.ocr_options(settings)
+        cache, cache_key = self.cache_lookup(pdf, settings)
+        if cache and cache.fetch(cache_key, output_file):
+            self.worker_done.emit(worker_name)
+            return JobResult.success(pdf, [output_file])
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        progress_plugin = os.path.join(package_root, "utils", "ocr_progress_plugin.py")
+        logger.debug(f"Plugin dir: {progress_plugin}")
+        try:
+            ocrmypdf.configure_logging(verbosity=-1) # --quiet equivalent
+            ocrmypdf.ocr(pdf, output_file, deskew=deskew_toggle, output_type=ocr_filetype, optimize=optimize_level, progress_bar=False, force_ocr=True, plugins=progress_plugin, jobs=jobs or None)
+            if cache:
+                cache.store(cache_key, output_file)
+            logger.success(f"OCR complete. Output: {output_file}")
+            return JobResult.success(pdf, [output_file], pages=shared_state.total_parts)
+        except Exception as e:
+            tb_str = traceback.format_exc()
+            logger.error(tb_str)
+            error_msg = f"Error converting {pdf}: {str(e)}"
+            logger.error(error_msg)
+            return JobResult.failed(pdf, str(e))
+        finally:
+            self.worker_done.emit(worker_name)
+
+    def start(self, pdf, jobs=0, settings=None, output_file=None, finished=None):
+        """
+        Starts native OCR of the specified PDF file in a QProcess and returns without waiting.
+        The PDF is opened and hashed on a pool thread first; the process is then started back on the calling thread.
+        Progress is read from stderr by handle_stderr, and process_finished reports the result.
+        Must be called from a thread with a running event loop.
+        Args:
+            pdf (str): Path of the PDF file to perform OCR on.
+            jobs (int): Optional. Number of cores ocrmypdf may use for this document. 0 lets ocrmypdf use all cores.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+            output_file (str): Optional. Path to write to. Defaults to a filename constructed from pdf.
+            finished (callable): Optional. Called with the JobResult once ocrmypdf exits or fails to start.
+        """
+        finished = finished or (lambda result: None)
+        if not pdf.endswith('.pdf'):
+            logger.error(f"File is not a PDF.")
+            finished(JobResult.failed(pdf, "File is not a PDF."))
+            return
+        if not self.check_command_installed("ocrmypdf"):
+            logger.error(f"ocrmypdf is not installed natively. Please install through your operating system's package manager or uncheck the box in settings.")
+            finished(JobResult.failed(pdf, "ocrmypdf is not installed natively."))
             return
 
+        settings = settings or OperationSettings.current()
+        preparation = Preparation(lambda prepared: self.launch(preparation, prepared, pdf, jobs, settings, finished))
+        # keep a reference until the prepared signal is delivered
+        self.preparing.add(preparation)
+        self.prepare_pool.start(PrepareRunner(self, pdf, settings, output_file, PathAllocator.instance().current_owner(), preparation))
+
+    def launch(self, preparation, prepared, pdf, jobs, settings, finished):
+        """
+        Start the ocrmypdf process of a prepared native OCR, or finish it at once on a cache hit or failed preparation.
+        Runs on the thread that called start().
+        Args:
+            preparation (Preparation): The preparation that delivered prepared.
+            prepared (tuple or Exception): From PrepareRunner.
+            pdf (str): Path of the PDF file to perform OCR on.
+            jobs (int): Number of cores ocrmypdf may use. 0 lets ocrmypdf use all cores.
+            settings (OperationSettings): Settings to use.
+            finished (callable): Called with the JobResult once ocrmypdf exits or fails to start.
+        """
+        self.preparing.discard(preparation)
+        preparation.deleteLater()
+        if isinstance(prepared, Exception):
+            self.worker_done.emit(f"OCR_{pdf}")
+            logger.error(f"Error converting {pdf}: {prepared}")
+            finished(JobResult.failed(pdf, str(prepared)))
+            return
+        worker_name, shared_state, output_file, cache, cache_key, hit = prepared
+        if hit:
+            self.worker_done.emit(worker_name)
+            finished(JobResult.success(pdf, [output_file]))
+            return
+        deskew_toggle, ocr_filetype, optimize_level = self.ocr_options(settings)
+
+        process = QProcess()
+        # keep a reference until the process finishes; nothing else owns it
+        self.processes.add(process)
+        process.readyReadStandardError.connect(lambda: self.handle_stderr(process, shared_state, worker_name))
+        process.finished.connect(lambda exit_code, exit_status: finished(self.process_finished(process, pdf, output_file, worker_name, shared_state.total_parts, cache, cache_key)))
+        process.errorOccurred.connect(lambda error: self.process_failed_to_start(process, error, pdf, worker_name, finished))
+        cmd = ["ocrmypdf", "--force-ocr", "-v", "1", "--optimize", str(optimize_level), "--output-type", ocr_filetype, pdf, output_file]
+        if deskew_toggle:
+            cmd.append("--deskew")
+        if jobs:
+            cmd.extend(["--jobs", str(jobs)])
+        logger.debug(f"Command: {cmd}")
+        process.start(cmd[0], cmd[1:])
+
+    def prepare(self, pdf, settings, output_file=None):
+        """
+        Set up progress tracking and the output path for one OCR.
+        Args:
+            pdf (str): Path of the PDF file to perform OCR on.
+            settings (OperationSettings): Settings to use.
+            output_file (str): Optional. Path to write to. Defaults to a filename constructed from pdf.
+        Returns:
+            tuple: (worker_name, SharedState, output_file)
+        """
         logger.info(f"OCRing {pdf}...")
-        QApplication.processEvents()
-        self.file_tree = file_tree
-        self.shared_state = SharedState()
-        self.worker_name = f"OCR_{pdf}"
-        logger.debug(f"OCR assigned worker name: {self.worker_name}")
-        self.worker_progress.emit(self.worker_name, 0)
+        shared_state = SharedState()
+        worker_name = f"OCR_{pdf}"
+        logger.debug(f"OCR assigned worker name: {worker_name}")
+        self.worker_progress.emit(worker_name, 0)
 
-        self.shared_state.total_parts = len(pymupdf.open(pdf))
-        logger.debug(f"PDF Length: {self.shared_state.total_parts}")
+        with pymupdf.open(pdf) as doc:
+            shared_state.total_parts = len(doc)
+        logger.debug(f"PDF Length: {shared_state.total_parts}")
 
-        output_file = construct_filename(pdf, "ocr_ps")
+        output_file = output_file or construct_filename(pdf, "ocr_ps", settings=settings)
+        return worker_name, shared_state, output_file
 
-        self.settings = SettingsWindow.instance()
-        deskew_toggle = self.settings.ocr_deskew_checkbox.isChecked()
+    def ocr_options(self, settings):
+        """
+        Read the ocrmypdf options from settings.
+        Args:
+            settings (OperationSettings): Settings to use.
+        Returns:
+            tuple: (deskew, output type, optimize level)
+        """
+        deskew_toggle = settings.ocr_deskew
         logger.debug(f"deskew: {deskew_toggle}")
-        if self.settings.ocr_pdf_radio.isChecked():
+        if settings.ocr_pdf_checked:
             ocr_filetype = 'pdf'
         else:
             ocr_filetype = 'pdfa'
         logger.debug(f"filetype: {ocr_filetype}")
-        optimize_level = self.settings.ocr_optimize_level.value()
+        optimize_level = settings.ocr_optimize_level
         logger.debug(f"optimize: {optimize_level}")
-        native_ocr = self.settings.native_ocr_checkbox.isChecked()
+        return deskew_toggle, ocr_filetype, optimize_level
 
-        project_root = QDir.currentPath()
-        progress_plugin = os.path.join(project_root, "main_window.py")
-        logger.debug(f"Plugin dir: {progress_plugin}")
-
-        if native_ocr:
-            if not self.check_command_installed("ocrmypdf"):
-                logger.error(f"ocrmypdf is not installed natively. Please install through your operating system's package manager or uncheck the box in settings.")
-                return
-            self.process = QProcess()
-            self.process.readyReadStandardError.connect(self.handle_stderr)
-            self.process.finished.connect(lambda: self.process_finished(output_file))
-            try:
-                cmd = ["ocrmypdf", "--force-ocr", "-v", "1", "--optimize", str(optimize_level), "--output-type", ocr_filetype, pdf, output_file]
-                if deskew_toggle:
-                    cmd.append("--deskew")
-                logger.debug(f"Command: {cmd}")
-                self.process.start(cmd[0], cmd[1:])
-                #QProcess start is async unless we wait. I want this eventually but I'm not set up for it yet
-                #it stops blocking before process_finished can run though. button_toggle triggers before we finish
-                self.process.waitForFinished()
-            except subprocess.CalledProcessError as e:
-                self.worker_done.emit(self.worker_name)
-                logger.error(f"Conversion failed with exit code {e.returncode}")
-        else:
-            try:
-                ocrmypdf.configure_logging(verbosity=-1) # --quiet equivalent
-                ocrmypdf.ocr(pdf, output_file, deskew=deskew_toggle, output_type=ocr_filetype, optimize=optimize_level, progress_bar=False, force_ocr=True, plugins=progress_plugin)
-                logger.success(f"OCR complete. Output: {output_file}")
-                if self.settings.add_file_checkbox.isChecked():
-                    self.file_tree.add_file(output_file)
-            except Exception as e:
-                tb_str = traceback.format_exc()
-                logger.error(tb_str)
-                error_msg = f"Error converting {pdf}: {str(e)}"
-                logger.error(error_msg)
-                self.worker_done.emit(self.worker_name)
-        return output_file
+    def cache_lookup(self, pdf, settings):
+        """
+        Return the result cache and the key of this OCR, keyed on the input and the options that change ocrmypdf's output.
+        Args:
+            pdf (str): Path of the PDF file to perform OCR on.
+            settings (OperationSettings): Settings to use.
+        Returns:
+            tuple: (ResultCache, key), or (None, None) if caching is disabled.
+        """
+        cache = ResultCache.for_settings(settings)
+        if cache is None:
+            return None, None
+        deskew_toggle, ocr_filetype, optimize_level = self.ocr_options(settings)
+        params = {"deskew": deskew_toggle, "output_type": ocr_filetype, "optimize": optimize_level, "force_ocr": True}
+        return cache, cache.key(pdf, "ocr", params)
 
     def check_command_installed(self, command):
         """
-        Run a placeholder command to determine if the program is installed.
+        Determine if the program is installed by looking for it on PATH.
         Args:
             command (str): The program to check installation status of.
         """
-        try:
-            result = subprocess.run([command, '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            return True
-        except:
+        if shutil.which(command) is None:
             logger.error(f"Error: {command} not installed.")
             return False
+        return True
 
-    def handle_stderr(self):
+    def handle_stderr(self, process, shared_state, worker_name):
         """
         Processes the standard error and updates the shared state and UI elements as needed for native ocr operations.
         ocrmypdf sends all log messages to stderr because it uses stdout for the pdf output.
+        Args:
+            process (QProcess): The running ocrmypdf process.
+            shared_state (SharedState): Progress state of the process.
+            worker_name (str): Name of the progress bar worker.
         """
-        msg = self.process.readAllStandardError().data().decode()
+        msg = process.readAllStandardError().data().decode()
         #the Grafting message is sometimes sent attached to other messages.
         #only accept Grafting if it is the end of the message or right before a newline.
-        update_postprocessing_bar = ((self.shared_state.postprocessing == True) and (re.search(r'Page \d+(?=\n|$)', msg)))
+        update_postprocessing_bar = ((shared_state.postprocessing == True) and (re.search(r'Page \d+(?=\n|$)', msg)))
         if re.search(r'Grafting(?=\n|$)', msg) or update_postprocessing_bar:
-            self.shared_state.progress += 1
-            self.shared_state.progress_percentage = (self.shared_state.progress / self.shared_state.total_parts) * 100
-            self.worker_progress.emit(self.worker_name, self.shared_state.progress_percentage)
-            QApplication.processEvents()
+            shared_state.progress += 1
+            shared_state.progress_percentage = (shared_state.progress / shared_state.total_parts) * 100
+            self.worker_progress.emit(worker_name, shared_state.progress_percentage)
         if re.search(r'Postprocessing...', msg):
-            self.shared_state.postprocessing = True
-            self.revise_worker_label.emit(self.worker_name, "OCR Postprocessing")
-            self.shared_state.progress = 0
-            self.shared_state.progress_percentage = 0
-            self.worker_progress.emit(self.worker_name, self.shared_state.progress_percentage)
-            QApplication.processEvents()
+            shared_state.postprocessing = True
+            self.revise_worker_label.emit(worker_name, "OCR Postprocessing")
+            shared_state.progress = 0
+            shared_state.progress_percentage = 0
+            self.worker_progress.emit(worker_name, shared_state.progress_percentage)
 
-    def process_finished(self, output_file):
+    def process_finished(self, process, pdf, output_file, worker_name, pages, cache=None, cache_key=None):
         """
         Run cleanup for native ocr operations.
         Args:
+            process (QProcess): The finished ocrmypdf process.
+            pdf (str): Path of the input PDF.
             output_file (str): The full path to the output.
+            worker_name (str): Name of the progress bar worker.
+            pages (int): Page count of the input PDF.
+            cache (ResultCache): Optional. Cache to store a successful output in.
+            cache_key (str): Optional. Key to store the output under.
+        Returns:
+            JobResult: The result of the OCR.
         """
+        self.processes.discard(process)
+        process.deleteLater()
+        self.worker_done.emit(worker_name)
+        if process.exitStatus() != QProcess.NormalExit or process.exitCode() != 0:
+            logger.error(f"OCR of {pdf} failed with exit code {process.exitCode()}.")
+            return JobResult.failed(pdf, f"ocrmypdf exited with code {process.exitCode()}")
+        if cache:
+            cache.store(cache_key, output_file)
         logger.success(f"OCR complete. Output: {output_file}")
-        if self.settings.add_file_checkbox.isChecked():
-            self.file_tree.add_file(output_file)
-        self.worker_done.emit(self.worker_name)
+        return JobResult.success(pdf, [output_file], pages=pages)
+
+    def process_failed_to_start(self, process, error, pdf, worker_name, finished):
+        """
+        Report a native ocr process that could not be started. QProcess does not emit finished in this case.
+        Args:
+            process (QProcess): The ocrmypdf process.
+            error (QProcess.ProcessError): The error that occurred.
+            pdf (str): Path of the input PDF.
+            worker_name (str): Name of the progress bar worker.
+            finished (callable): Called with the failed JobResult.
+        """
+        if error != QProcess.FailedToStart:
+            return
+        self.processes.discard(process)
+        process.deleteLater()
+        self.worker_done.emit(worker_name)
+        logger.error(f"ocrmypdf failed to start: {process.errorString()}")
+        finished(JobResult.failed(pdf, f"ocrmypdf failed to start: {process.errorString()}"))
 
 ocr = Converter()
\ No newline at end of file
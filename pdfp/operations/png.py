@@ -1,58 +1,152 @@
 from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QApplication
-from pdfp.settings_window import SettingsWindow
+from pdfp.utils.operation_settings import OperationSettings
 from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.job_result import JobResult
+from pdfp.utils.page_ranges import parse_page_ranges, page_indices
+from pdfp.utils import page_renderer
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 import pymupdf
 import logging
+import time
 import os
 
 logger = logging.getLogger("pdfp")
 
+# Pages below which rendering stays in this process, since starting worker processes would take longer
+PARALLEL_MIN_PAGES = 4
+
 class Converter(QObject):
     """
     Handles PDF to PNG conversion.
+    Pages of a PDF on disk are spread across worker processes, each opening the PDF once.
+    Signals:
+        worker_progress: Updates the value of the progress bar while pages render. Connects to progress_widget.
+        revise_worker_label: Updates the label of the progress bar while pages render. Connects to progress_widget.
+        worker_done: Signals that all pages are rendered. Connects to progress_widget.
     """
+    worker_progress = Signal(str, int)
+    revise_worker_label = Signal(str, str)
+    worker_done = Signal(str)
+
     def __init__(self):
         super().__init__()
 
-    def convert(self, file_tree, pdf, pg):
+    def convert(self, pdf, pg, settings=None):
         """
-        Converts a specific page of a PDF file to PNG format.
+        Converts pages of a PDF file to PNG format.
         Args:
-            file_tree (QWidget): The file tree widget where output files may be added.
             pdf (str): Path of the PDF file to convert.
-            pg (str): Page number (as a string) to convert to PNG. If empty, defaults to "1".
+            pg (str): Pages to convert, in the syntax of the trim field, e.g. "1 3-5 10-end". If empty, defaults to "1".
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        Returns:
+            JobResult: The result of the conversion.
         """
         if not pdf.endswith('.pdf'):
             logger.error(f"File is not a PDF.")
-            return
-
-        if pg == "":
-            pg = "1"
+            return JobResult.failed(pdf, "File is not a PDF.")
 
+        #syntax is checked before the PDF is opened
         try:
-            pg = int(pg)
-        except ValueError:
-            logger.error(f"Page selection input is not an integer")
-            return
+            page_ranges = parse_page_ranges(str(pg) or "1")
+        except ValueError as e:
+            logger.error(str(e))
+            return JobResult.failed(pdf, str(e))
 
         logger.info(f"Converting {pdf} to PNG...")
-        QApplication.processEvents()
 
-        settings = SettingsWindow.instance()
+        settings = settings or OperationSettings.current()
 
-        doc = pymupdf.open(pdf)
-        if pg < 1 or pg > len(doc):
-            raise ValueError("Invalid page number")
-        page = doc.load_page(pg - 1)
-        pix = page.get_pixmap()
-        if settings.png_cover_checkbox.isChecked():
-            output_file = os.path.join(os.path.dirname(pdf), "cover.png")
+        with pymupdf.open(pdf) as doc:
+            try:
+                return self.save_pages(doc, pdf, page_ranges, settings, source=pdf)
+            except ValueError as e:
+                logger.error(str(e))
+                return JobResult.failed(pdf, str(e))
+
+    def save_pages(self, doc, pdf, pg, settings, source=None):
+        """
+        Saves pages of an open PDF as PNGs.
+        Args:
+            doc (pymupdf.Document): The open PDF. May exist only in memory.
+            pdf (str): Path the output filenames are constructed from.
+            pg (str, int or list of PageRange): Pages to convert, e.g. "1 3-5 10-end", or entries from parse_page_ranges.
+                If empty, defaults to "1". Pages entered more than once are converted once.
+            settings (OperationSettings): Settings to use.
+            source (str): Optional. Path of doc on disk. Only then are pages rendered in worker processes,
+                since each worker opens the PDF itself.
+        Returns:
+            JobResult: The result of the conversion.
+        Raises:
+            ValueError: If pg is not a valid page entry for doc.
+        """
+        page_ranges = pg if isinstance(pg, list) else parse_page_ranges(str(pg) or "1")
+        pages = [index + 1 for index in page_indices(page_ranges, len(doc), unique=True)]
+        if settings.png_cover and len(pages) == 1:
+            output_files = [os.path.join(os.path.dirname(pdf), "cover.png")]
         else:
-            output_file = construct_filename(pdf, "png_ps", str(pg))
-        pix.save(output_file)
+            if settings.png_cover:
+                logger.warning("cover.png is only used when exporting one page.")
+            output_files = [construct_filename(pdf, "png_ps", str(page), settings) for page in pages]
+        options = (settings.png_dpi, settings.png_colorspace, settings.png_alpha)
+
+        workers = self.worker_count(len(pages), settings) if source else 1
+        worker_name = f"PNG_{pdf}"
+        start = time.perf_counter()
+        if len(pages) > 1:
+            self.worker_progress.emit(worker_name, 0)
+            self.revise_worker_label.emit(worker_name, f"PNG ({len(pages)} pages)")
+        try:
+            if workers > 1:
+                self.render_parallel(source, pages, output_files, options, workers, worker_name)
+            else:
+                for done, (page, output_file) in enumerate(zip(pages, output_files), 1):
+                    page_renderer.render_page(doc, page, output_file, *options)
+                    if len(pages) > 1:
+                        self.worker_progress.emit(worker_name, done * 100 // len(pages))
+        finally:
+            if len(pages) > 1:
+                self.worker_done.emit(worker_name)
 
-        logger.success(f"Conversion complete. Output: {output_file}")
-        return output_file
+        elapsed = time.perf_counter() - start
+        if len(pages) > 1:
+            logger.success(f"Conversion complete. {len(pages)} pages at {settings.png_dpi} DPI in {elapsed:.2f}s ({len(pages) / elapsed:.1f} pages/s, {workers} process(es)). Output: {output_files[0]} ... {output_files[-1]}")
+        else:
+            logger.success(f"Conversion complete. Output: {output_files[0]}")
+        return JobResult.success(pdf, output_files, pages=len(pages))
+
+    def worker_count(self, page_count, settings):
+        """
+        Return the number of processes to render page_count pages with.
+        Worker processes of a headless batch render in-process, since their siblings already use every core.
+        """
+        if page_count < PARALLEL_MIN_PAGES or multiprocessing.parent_process() is not None:
+            return 1
+        processes = settings.png_processes or os.cpu_count() or 1
+        return max(1, min(processes, page_count))
+
+    def render_parallel(self, pdf, pages, output_files, options, workers, worker_name):
+        """
+        Renders pages in worker processes. Each worker opens the PDF once and takes the next page as it finishes one,
+        so workers stay busy even when some pages are much slower to render than others.
+        Args:
+            pdf (str): Path of the PDF to render.
+            pages (list of int): Page numbers to render, starting at 1.
+            output_files (list of str): Path of the PNG of each page.
+            options (tuple): (dpi, colorspace, alpha) passed to page_renderer.render_page.
+            workers (int): Number of processes.
+            worker_name (str): Name of the progress bar worker.
+        """
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=page_renderer.init_worker, initargs=(pdf,)) as executor:
+            futures = [executor.submit(page_renderer.render_worker_page, page, output_file, *options) for page, output_file in zip(pages, output_files)]
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    future.result()
+                    self.worker_progress.emit(worker_name, done * 100 // len(pages))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
 
-pdf2png = Converter()
\ No newline at end of file
+pdf2png = Converter()
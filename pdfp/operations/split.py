@@ -0,0 +1,195 @@
+from PySide6.QtCore import QObject, Signal
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.job_result import JobResult
+from pdfp.utils.page_ranges import parse_page_ranges
+from concurrent.futures import ThreadPoolExecutor
+import pymupdf
+import logging
+
+logger = logging.getLogger("pdfp")
+
+# Threads writing finished pieces to disk
+SPLIT_WRITERS = 4
+# Pieces held in memory waiting to be written, per writer
+PIECES_PER_WRITER = 2
+# Characters of a bookmark title kept in a piece's filename
+TITLE_LENGTH = 60
+
+def parse_split(split_by):
+    """
+    Parse how to split a PDF. Only the syntax is checked, so this can run before the PDF is opened.
+    Args:
+        split_by (str): A page count ("50" writes every 50 pages), "toc" for one piece per top-level bookmark,
+            or page entries in the syntax of the trim field ("1-10 11-end"), one piece per entry.
+    Returns:
+        tuple: ("pages", int), ("toc", None) or ("ranges", list of PageRange).
+    Raises:
+        ValueError: If split_by is empty or not valid.
+    """
+    split_by = split_by.strip()
+    if split_by == "":
+        raise ValueError("No split entered. Enter a page count, \"toc\", or page ranges.")
+    if split_by.isdigit():
+        if int(split_by) < 1:
+            raise ValueError("Pieces must have at least 1 page.")
+        return "pages", int(split_by)
+    if split_by.lower() in ("toc", "bookmarks"):
+        return "toc", None
+    return "ranges", parse_page_ranges(split_by)
+
+def page_runs(indices):
+    """
+    Group page indices into runs of consecutive pages, so each run is copied with one insert_pdf call.
+    Args:
+        indices (iterable of int): Page indices starting at 0, in order.
+    Returns:
+        list of tuple: (first, last) index of each run.
+    """
+    runs = []
+    for index in indices:
+        if runs and index == runs[-1][1] + 1:
+            runs[-1][1] = index
+        else:
+            runs.append([index, index])
+    return [tuple(run) for run in runs]
+
+def write_piece(output_file, data):
+    """Write the bytes of a piece to disk. Runs on a writer thread."""
+    with open(output_file, "wb") as f:
+        f.write(data)
+    return output_file
+
+class Converter(QObject):
+    """
+    Splits a PDF into pieces in one pass: every N pages, one piece per top-level bookmark, or one piece per page range.
+    The source is opened once. Pieces are built and serialized on the job thread, since PyMuPDF documents must not be
+    used from several threads, and written to disk by writer threads while the next piece is built.
+    Signals:
+        worker_progress: Updates the value of the progress bar while pieces are written. Connects to progress_widget.
+        revise_worker_label: Updates the label of the progress bar while pieces are written. Connects to progress_widget.
+        worker_done: Signals that every piece is written. Connects to progress_widget.
+    """
+    worker_progress = Signal(str, int)
+    revise_worker_label = Signal(str, str)
+    worker_done = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+
+    def convert(self, pdf, split_by, settings=None):
+        """
+        Splits a PDF file into pieces written next to it.
+        Args:
+            pdf (str): Path of the PDF file to split.
+            split_by (str): How to split. See parse_split.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        Returns:
+            JobResult: The result of the split. output_files lists the pieces in page order.
+        """
+        if not pdf.endswith('.pdf'):
+            logger.error(f"File is not a PDF.")
+            return JobResult.failed(pdf, "File is not a PDF.")
+
+        #syntax is checked before the PDF is opened
+        try:
+            split = parse_split(split_by)
+        except ValueError as e:
+            logger.error(str(e))
+            return JobResult.failed(pdf, str(e))
+
+        logger.info(f"Splitting {pdf}...")
+        settings = settings or OperationSettings.current()
+
+        with pymupdf.open(pdf) as doc:
+            try:
+                return self.split_document(doc, pdf, split, settings)
+            except ValueError as e:
+                logger.error(str(e))
+                return JobResult.failed(pdf, str(e))
+
+    def pieces(self, doc, split):
+        """
+        List the pieces a PDF is split into.
+        Args:
+            doc (pymupdf.Document): The open PDF.
+            split (tuple): From parse_split.
+        Returns:
+            list of tuple: (label, page indices) of each piece. The label is added to the piece's filename.
+        Raises:
+            ValueError: If a range is outside the document, or splitting by bookmarks and the PDF has none.
+        """
+        mode, value = split
+        page_count = len(doc)
+        if mode == "pages":
+            return [(f"{start + 1}-{min(start + value, page_count)}", range(start, min(start + value, page_count)))
+                    for start in range(0, page_count, value)]
+        if mode == "ranges":
+            return [(page_range.text, page_range.resolve(page_count)) for page_range in value]
+
+        chapters = [(title.strip(), page - 1) for level, title, page in doc.get_toc(simple=True) if level == 1 and 1 <= page <= page_count]
+        if not chapters:
+            raise ValueError("The PDF has no top-level bookmarks to split by.")
+        chapters.sort(key=lambda chapter: chapter[1])
+        width = len(str(len(chapters)))
+        pieces = []
+        if chapters[0][1] > 0:
+            # pages before the first bookmark, e.g. a cover and contents
+            pieces.append((f"{0:0{width}d} 1-{chapters[0][1]}", range(0, chapters[0][1])))
+        for number, (title, start) in enumerate(chapters, 1):
+            end = chapters[number][1] if number < len(chapters) else page_count
+            if end <= start:
+                logger.debug(f"Bookmark {title} shares its page with the next one; it is part of that piece.")
+                continue
+            pieces.append((f"{number:0{width}d} {title[:TITLE_LENGTH]}".rstrip(), range(start, end)))
+        return pieces
+
+    def split_document(self, doc, pdf, split, settings):
+        """
+        Writes the pieces of an open PDF.
+        Args:
+            doc (pymupdf.Document): The open PDF. May exist only in memory.
+            pdf (str): Path the output filenames are constructed from.
+            split (str or tuple): How to split, as entered or from parse_split.
+            settings (OperationSettings): Settings to use.
+        Returns:
+            JobResult: The result of the split.
+        Raises:
+            ValueError: If split is not valid for doc.
+        """
+        if isinstance(split, str):
+            split = parse_split(split)
+        pieces = self.pieces(doc, split)
+        if not pieces:
+            raise ValueError("The PDF has no pages to split.")
+        worker_name = f"Split_{pdf}"
+        self.worker_progress.emit(worker_name, 0)
+        self.revise_worker_label.emit(worker_name, f"Split ({len(pieces)} pieces)")
+
+        output_files = []
+        pages = 0
+        try:
+            with ThreadPoolExecutor(max_workers=SPLIT_WRITERS, thread_name_prefix="pdfp-split") as executor:
+                pending = []
+                for number, (label, indices) in enumerate(pieces, 1):
+                    with pymupdf.open() as piece:
+                        for first, last in page_runs(indices):
+                            piece.insert_pdf(doc, from_page=first, to_page=last)
+                        data = piece.tobytes(garbage=3, deflate=True)
+                    output_file = construct_filename(pdf, "split_ps", label, settings)
+                    output_files.append(output_file)
+                    pages += len(indices)
+                    pending.append(executor.submit(write_piece, output_file, data))
+                    # wait for the oldest writes, so only a few serialized pieces are held in memory
+                    while len(pending) > SPLIT_WRITERS * PIECES_PER_WRITER:
+                        pending.pop(0).result()
+                    self.worker_progress.emit(worker_name, number * 100 // len(pieces))
+                for future in pending:
+                    future.result()
+        finally:
+            self.worker_done.emit(worker_name)
+
+        logger.success(f"Split complete. {len(output_files)} pieces. Output: {output_files[0]} ... {output_files[-1]}")
+        return JobResult.success(pdf, output_files, pages=pages)
+
+split = Converter()
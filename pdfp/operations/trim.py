@@ -1,8 +1,8 @@
-import re
 from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QApplication
-from pdfp.settings_window import SettingsWindow
+from pdfp.utils.operation_settings import OperationSettings
 from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.job_result import JobResult
+from pdfp.utils.page_ranges import parse_page_ranges, page_indices
 import pymupdf
 import logging
 
@@ -14,61 +14,64 @@ class Converter(QObject):
     """
     def __init__(self):
         super().__init__()
-    def convert(self, file_tree, pdf, keep_pgs):
+    def trim_document(self, input_pdf, keep_pgs):
+        """
+        Keeps the specified pages of an open PDF, in the order entered, in memory.
+        Uses Document.select, which rewrites the page tree in place instead of copying pages into a new PDF,
+        so shared resources are kept once and links and bookmarks to kept pages still work.
+        Args:
+            input_pdf (pymupdf.Document): The PDF to trim. Modified in place.
+            keep_pgs (str or list of PageRange): Pages to keep, e.g. "12-16 32-end 1-end:2 -3-end", or entries from parse_page_ranges.
+        Returns:
+            pymupdf.Document: input_pdf, trimmed. Nothing is written to disk.
+        Raises:
+            ValueError: If keep_pgs is not a valid page entry for input_pdf. input_pdf is left unchanged.
+        """
+        page_ranges = parse_page_ranges(keep_pgs) if isinstance(keep_pgs, str) else keep_pgs
+        keep = page_indices(page_ranges, len(input_pdf))
+        if keep != list(range(len(input_pdf))):
+            input_pdf.select(keep)
+        return input_pdf
+
+    def convert(self, pdf, keep_pgs, settings=None):
         """
         Performs PDF trimming operation based on specified page ranges.
         Args:
-            file_tree (QWidget): The file tree widget where output files may be added.
             pdf (str): Path of the PDF file to trim.
             keep_pgs (str): Page ranges or numbers to keep in the PDF.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        Returns:
+            JobResult: The result of the trim.
         """
         if keep_pgs == "":
             logger.error(f"No pages entered")
-            return
+            return JobResult.failed(pdf, "No pages entered")
 
         if not pdf.endswith('.pdf'):
-            self.util_msgs.emit(f"File is not a PDF.")
-            return
-
-        logger.info(f"Converting {pdf}")
-        QApplication.processEvents()
-        self.settings = SettingsWindow.instance()
-
-        input_pdf = pymupdf.open(pdf)
-        output_pdf = pymupdf.open()
-
-        pdf_length = len(input_pdf)
+            logger.error(f"File is not a PDF.")
+            return JobResult.failed(pdf, "File is not a PDF.")
 
-        keep_pgs_list = keep_pgs.split()
-        page_ranges = []
+        #syntax is checked before the PDF is opened
         try:
-            for pg_pair in keep_pgs_list:
-                if re.fullmatch(r"(\d+)", pg_pair):
-                    page_ranges.append((int(pg_pair), int(pg_pair)))
-                elif match := (re.fullmatch(r"(\d+)-(\d+)", pg_pair)):
-                    page_ranges.append((int(match.group(1)), int(match.group(2))))
-                elif match := (re.fullmatch(r"(\d+)-end", pg_pair)):
-                    page_ranges.append((int(match.group(1)), pdf_length))
-                else:
-                    logger.error(f"Invalid page number entry.")
-                    return
-        except ValueError:
-            logger.error(f"Invalid page number entry.")
-            return
-                    
-        for start, end in page_ranges:
-            for page_num in range(start-1, end):
-                if page_num < 0 or page_num > pdf_length:
-                    logger.error(f"Invalid page number entry. Out of range.")
-                    return
-                page = input_pdf.load_page(page_num)
-                output_pdf.insert_pdf(input_pdf, from_page=page_num, to_page=page_num)
+            page_ranges = parse_page_ranges(keep_pgs)
+        except ValueError as e:
+            logger.error(str(e))
+            return JobResult.failed(pdf, str(e))
+
+        logger.info(f"Converting {pdf}")
+        settings = settings or OperationSettings.current()
 
-        output_file = construct_filename(pdf, "trim_ps", keep_pgs)
-        output_pdf.save(output_file)
+        with pymupdf.open(pdf) as doc:
+            try:
+                self.trim_document(doc, page_ranges)
+            except ValueError as e:
+                logger.error(str(e))
+                return JobResult.failed(pdf, str(e))
+            output_file = construct_filename(pdf, "trim_ps", keep_pgs, settings)
+            #garbage collection drops the objects only the removed pages used
+            doc.save(output_file, garbage=3, deflate=True)
+            pages = len(doc)
         logger.success(f"Conversion complete. Output: {output_file}")
-        if self.settings.add_file_checkbox.isChecked():
-            file_tree.add_file(output_file)
-        return output_file
+        return JobResult.success(pdf, [output_file], pages=pages)
 
 trim = Converter()
\ No newline at end of file
@@ -1,12 +1,13 @@
 import logging
 import re
-import os
-from PySide6.QtCore import QObject, Signal, QDir
-from PySide6.QtWidgets import QApplication
-from pdfp.settings_window import SettingsWindow
+import threading
+from PySide6.QtCore import QObject, Signal
+from pdfp.utils.operation_settings import OperationSettings
 from pdfp.utils.filename_constructor import construct_filename
-from pdfp.utils.clean_text import clean_text
-from pdfp.utils.tts_limit import tts_word_count
+from pdfp.utils.clean_text import iter_clean_text
+from pdfp.utils.tts_limit import WordChunker, split_value
+from pdfp.utils.job_result import JobResult
+from pdfp.utils.tts_synthesis import backend_for, synthesize_parallel
 from gtts import gTTS
 import pymupdf
 import shlex
@@ -31,6 +32,8 @@ class SharedState:
 class QueueHandler(logging.Handler):
     """
     Custom logging handler for processing specific log messages during TTS conversion.
+    Only records from the thread that created the handler are counted, so concurrent TTS jobs
+    sharing the gtts logger do not advance each other's progress bars.
 
     Args:
         shared_state (SharedState): Shared state object for tracking conversion progress.
@@ -44,6 +47,7 @@ class QueueHandler(logging.Handler):
         self.worker_progress = worker_progress
         self.revise_worker_label = revise_worker_label
         self.worker_name = worker_name
+        self.thread_id = threading.get_ident()
     
     def emit(self, record):
         """
@@ -54,6 +58,8 @@ class QueueHandler(logging.Handler):
             - Updates total_parts based on specific log messages.
             - Updates progress and progress percentage when a part is created.
         """
+        if record.thread != self.thread_id:
+            return
         try:
             msg = self.format(record)
             
@@ -61,14 +67,12 @@ class QueueHandler(logging.Handler):
             if match:
                 digit_str = match.group(1)
                 self.shared_state.total_parts = int(digit_str)
-                QApplication.processEvents()
             
             match = re.search(r"part-(\d+) created", msg)
             if match:
                 self.shared_state.progress += 1
                 self.shared_state.progress_percentage = (self.shared_state.progress / self.shared_state.total_parts) * 100
                 self.worker_progress.emit(self.worker_name, self.shared_state.progress_percentage)
-                QApplication.processEvents()
                 
         except Exception:
             self.handleError(record)
@@ -86,12 +90,14 @@ class Converter(QObject):
     worker_done = Signal(str)
     def __init__(self):
         super().__init__()
-    def convert(self, file_tree, pdf):
+    def convert(self, pdf, settings=None):
         """
         Converts the specified PDF or text file to speech using Google Text-to-Speech (gTTS).
         Args:
-            file_tree (QWidget): The file tree widget where output files may be added.
             pdf (str): Path of the PDF or text file to convert to speech.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        Returns:
+            JobResult: The result of the conversion. Launching Balabolka is reported as skipped.
         Notes:
             - Emits a message if the provided file is not a PDF or text file.
             - Initializes shared state and sets up logging for progress tracking.
@@ -100,28 +106,28 @@ class Converter(QObject):
         """
         if not any(pdf.lower().endswith(ext) for ext in ['.pdf', '.txt']):
             logger.error(f"Cannot TTS. Filetype is not TXT or PDF.")
-            return
-        self.settings = SettingsWindow.instance()
+            return JobResult.failed(pdf, "Filetype is not TXT or PDF.")
+        settings = settings or OperationSettings.current()
         logger.info(f"Converting {pdf}")
 
-        if self.settings.enable_balabolka_checkbox.isChecked():
+        if settings.enable_balabolka:
             system_platform = platform.system()
             logger.debug(f"Operating System: {system_platform}")
-            balabolka_location = self.settings.balabolka_location_display.text()
+            balabolka_location = settings.balabolka_location
             if system_platform == "Windows":
                 balabolka_command = balabolka_location
             else:
-                wine_prefix_location = self.settings.wine_prefix_location_display.text()
+                wine_prefix_location = settings.wine_prefix_location
                 wine_prefix_location = shlex.quote(wine_prefix_location)
-                wine_prefix_enabled = self.settings.wine_prefix_checkbox.isChecked()
+                wine_prefix_enabled = settings.enable_wine_prefix
                 if balabolka_location == "":
                     logger.error("Balabolka location is not specified")
-                    return
+                    return JobResult.failed(pdf, "Balabolka location is not specified")
                 balabolka_command = ["wine-stable", "C:\\windows\\command\\start.exe", "/Unix", balabolka_location]
                 if wine_prefix_enabled:
                     if wine_prefix_location == "":
                         logger.error(f"Wine Prefix is enabled but not specified")
-                        return
+                        return JobResult.failed(pdf, "Wine Prefix is enabled but not specified")
                     wine_prefix_cmd = ["env", f"WINEPREFIX={wine_prefix_location}"]
                     balabolka_command = wine_prefix_cmd + balabolka_command
             try:
@@ -129,8 +135,21 @@ class Converter(QObject):
                 logger.success("Launching Balabolka...")
             except Exception as e:
                 logger.error(f"Launching Balabolka failed with error: {e}")
-            return
+                return JobResult.failed(pdf, f"Launching Balabolka failed with error: {e}")
+            return JobResult(pdf, "skipped", message="Balabolka launched.")
+
+        return self.speak(iter_clean_text(pdf, settings), pdf, settings)
 
+    def speak(self, text, pdf, settings):
+        """
+        Converts cleaned text to speech using gTTS.
+        Args:
+            text (str or iterable of str): Cleaned text to convert, or a stream of pieces from iter_clean_text.
+            pdf (str): Path the output filenames are constructed from.
+            settings (OperationSettings): Settings to use.
+        Returns:
+            JobResult: The result of the conversion.
+        """
         shared_state = SharedState()
 
         worker_name = f"TTS_{pdf}"
@@ -141,51 +160,54 @@ class Converter(QObject):
         handler = QueueHandler(shared_state, self.worker_progress, self.revise_worker_label, worker_name)
         tts_logger.addHandler(handler)
 
+        output_files = []
         try:
-            text = clean_text(pdf)
-            if self.settings.split_txt_checkbox.isChecked():
-                temp_file = os.path.join(self.get_temp_dir(), "tts-tempfile.txt")
-                output_paths = tts_word_count(text, temp_file, True)
-                output_count = len(output_paths)
-                count = 0
-                for output_path in output_paths:
-                    count += 1
-                    self.revise_worker_label.emit(worker_name, f"TTS ({count}/{output_count})")
-                    with open(output_path, 'r', encoding='utf-8') as txt_file:
-                        text = txt_file.read()
-                    tts = gTTS(text, lang='en', tld='us')
-                    output_file = construct_filename(pdf, "tts_ps")
-                    tts.save(output_file)
-                    logger.success(f"Conversion {count}/{output_count} complete. Output: {output_file}")
-                    self.worker_progress.emit(worker_name, 0)
-                    shared_state.progress = 0
-                    shared_state.total_parts = 0 
-                    shared_state.progress_percentage = 0
-                    os.remove(output_path)
-            else:
-                tts = gTTS(text, lang='en', tld='us')
-                output_file = construct_filename(pdf, "tts_ps")
-                tts.save(output_file)
-                logger.success(f"Conversion complete. Output: {output_file}")
+            splitvalue = split_value(settings) if settings.enable_split_txt else None
+            #chunks go straight from the text stream to gTTS, one at a time
+            chunker = WordChunker(text, splitvalue)
+            for number, chunk, last in chunker:
+                label = "TTS" if number == 1 and last else f"TTS ({number})"
+                self.revise_worker_label.emit(worker_name, label)
+                output_file = construct_filename(pdf, "tts_ps", settings=settings)
+                self.synthesize(chunk, output_file, settings, worker_name, label)
+                output_files.append(output_file)
+                logger.success(f"Conversion {number} complete. Output: {output_file}")
+                self.worker_progress.emit(worker_name, 0)
+                shared_state.progress = 0
+                shared_state.total_parts = 0
+                shared_state.progress_percentage = 0
+            logger.info(f"Word count: {chunker.wordcount}")
+            if not output_files:
+                raise ValueError("No text to speak")
+            result = JobResult.success(pdf, output_files)
         except Exception as e:
             logger.error(f"Error converting {pdf}: {str(e)}")
+            result = JobResult.failed(pdf, str(e))
         self.worker_done.emit(worker_name)
-        tts_logger.disabled = True
         tts_logger.removeHandler(handler)
         handler.close()
 
-        return output_file
+        return result
 
-    def get_temp_dir(self):
+    def synthesize(self, text, output_file, settings, worker_name, label="TTS"):
         """
-        Check if the temp directory exists. If not, create it. Return the temp directory path.
-        Returns:
-            str: The path to the temp directory.
+        Writes the speech of text to output_file.
+        With more than one concurrent request in settings, parts are requested in parallel and the progress bar
+        label shows parts per second. Otherwise gTTS requests them one at a time and QueueHandler tracks progress.
+        Args:
+            text (str): Text to speak.
+            output_file (str): Path of the MP3 to write.
+            settings (OperationSettings): Settings to use.
+            worker_name (str): Name of the progress bar worker.
+            label (str): Optional. Progress bar label before the rate.
         """
-        project_root = QDir.currentPath()
-        temp_directory = os.path.join(project_root, "temp")
-        if not os.path.isdir(temp_directory):
-            os.mkdir(temp_directory)
-        return temp_directory
+        if settings.tts_parallel_requests > 1 or settings.tts_server:
+            def progress(done, total, parts_per_second):
+                self.worker_progress.emit(worker_name, int(done / total * 100))
+                self.revise_worker_label.emit(worker_name, f"{label} {parts_per_second:.1f} parts/s")
+            synthesize_parallel(text, output_file, backend_for(settings), settings.tts_parallel_requests, progress)
+        else:
+            tts = gTTS(text, lang='en', tld='us')
+            tts.save(output_file)
 
 tts = Converter()
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+import logging
+from PySide6.QtWidgets import QListView, QAbstractItemView, QApplication
+from PySide6.QtCore import Qt, QSize, QAbstractListModel, QModelIndex
+from pdfp.settings_window import SettingsWindow
+from pdfp.utils.thumbnail_cache import ThumbnailCache, ThumbnailLoader, THUMBNAIL_WIDTH
+
+logger = logging.getLogger("pdfp")
+
+# Height of a thumbnail cell, fitting an A4 page at THUMBNAIL_WIDTH
+THUMBNAIL_HEIGHT = int(THUMBNAIL_WIDTH * 1.42)
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    Model of the pages of the previewed document: one row per page, with its thumbnail as decoration.
+    Thumbnails are requested from the loader when the view asks for them, so only pages that are drawn are rendered.
+    Attributes:
+        path (str): Path of the previewed document, or None.
+        stamp (tuple): (size, mtime_ns) of the document when it was previewed, so an edited file gets new thumbnails.
+        pages (int): Page count of the document.
+    """
+    def __init__(self, cache, loader):
+        super().__init__()
+        self.cache = cache
+        self.loader = loader
+        self.path = None
+        self.stamp = None
+        self.pages = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.pages
+
+    def key(self, row):
+        """Return the thumbnail cache key of a page."""
+        return (self.path, *self.stamp, row)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.pages:
+            return None
+        if role == Qt.DisplayRole:
+            return str(index.row() + 1)
+        if role == Qt.DecorationRole:
+            key = self.key(index.row())
+            image = self.cache.get(key)
+            if image is None:
+                self.loader.request(key)
+            return image
+        if role == Qt.SizeHintRole:
+            return QSize(THUMBNAIL_WIDTH + 16, THUMBNAIL_HEIGHT + 24)
+        return None
+
+    def set_document(self, path, stamp=None, pages=0):
+        """
+        Show the pages of another document.
+        Args:
+            path (str): Path of the document, or None to show nothing.
+            stamp (tuple): Optional. (size, mtime_ns) of the document.
+            pages (int): Optional. Page count of the document.
+        """
+        self.beginResetModel()
+        self.path = path
+        self.stamp = stamp
+        self.pages = pages
+        self.endResetModel()
+
+    def thumbnail_loaded(self, key, image):
+        """Redraw a page whose thumbnail was loaded, if it belongs to the previewed document."""
+        if self.path is None or key[:3] != (self.path, *self.stamp) or key[3] >= self.pages:
+            return
+        index = self.index(key[3])
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+class PreviewWidget(QListView):
+    """
+    Pane next to file_tree_widget showing page thumbnails of the current file.
+    Thumbnails are rendered on a background thread and kept in a memory budget set in settings,
+    and on disk in the result cache directory while the result cache is enabled, so scrolling back is instant.
+    """
+    def __init__(self, file_tree_widget):
+        super().__init__()
+        self.settings = SettingsWindow.instance()
+        self.file_tree_widget = file_tree_widget
+        self.file_model = file_tree_widget.model
+
+        self.cache = ThumbnailCache(0)
+        self.cache.configure(self.settings.snapshot())
+        self.loader = ThumbnailLoader(self.cache)
+        self.model = ThumbnailModel(self.cache, self.loader)
+        self.loader.loaded.connect(self.model.thumbnail_loaded, Qt.QueuedConnection)
+        self.setModel(self.model)
+
+        self.setViewMode(QListView.IconMode)
+        self.setIconSize(QSize(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT))
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSpacing(4)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setMinimumWidth(THUMBNAIL_WIDTH + 40)
+
+        file_tree_widget.selectionModel().currentRowChanged.connect(self.current_row_changed)
+        self.file_model.prober.probed.connect(self.document_probed, Qt.QueuedConnection)
+        self.file_model.modelReset.connect(self.clear)
+        QApplication.instance().aboutToQuit.connect(self.loader.shutdown)
+        self.settings.preview_checkbox.toggled.connect(self.setVisible)
+        self.setVisible(self.settings.preview_checkbox.isChecked())
+
+    def current_row_changed(self, current, previous):
+        """Preview the file of the current row of file_tree_widget."""
+        path = self.file_model.path(current.row()) if current.isValid() else None
+        if path != self.model.path:
+            self.show_document(path)
+
+    def show_document(self, path):
+        """
+        Preview a file. Queued thumbnails of the previous file are dropped.
+        The page count comes from the file tree's details, which are probed first if they are not known yet.
+        Args:
+            path (str): Path of the file, or None to clear the preview.
+        """
+        self.loader.cancel()
+        if path is None or path.lower().endswith(".txt"):
+            self.model.set_document(None)
+            return
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logger.debug(f"Cannot preview {path}: {e}")
+            self.model.set_document(None)
+            return
+        self.cache.configure(self.settings.snapshot())
+        info = self.file_model.details.get(path)
+        if info is None:
+            self.file_model.prober.request(path)
+        pages = (info.pages or 0) if info is not None else 0
+        self.model.set_document(path, (stat.st_size, stat.st_mtime_ns), pages)
+        self.scrollToTop()
+
+    def document_probed(self, path, info):
+        """Fill in the pages of the previewed file once its page count is known."""
+        if path == self.model.path and info.pages and info.pages != self.model.pages:
+            self.model.set_document(path, self.model.stamp, info.pages)
+
+    def clear(self):
+        """Clear the preview, e.g. when every file is removed from the tree."""
+        self.loader.cancel()
+        self.model.set_document(None)
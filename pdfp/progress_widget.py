@@ -1,17 +1,26 @@
 from PySide6.QtWidgets import QWidget, QPushButton, QMainWindow, QHBoxLayout, QVBoxLayout, QToolBar, QStatusBar, QMessageBox, QTreeView, QLineEdit, QGroupBox, QRadioButton, QLabel, QFrame, QTextEdit, QProgressBar, QScrollArea, QApplication
-from PySide6.QtCore import QSize, Qt, Slot, QEvent, QObject, Signal
+from PySide6.QtCore import QSize, Qt, Slot, QEvent, QObject, Signal, QTimer
 from PySide6.QtGui import QAction, QIcon, QStandardItem, QStandardItemModel
 from pdfp.operations.ocr import ocr
 from pdfp.operations.crop import crop
 from pdfp.operations.tts import tts
+from pdfp.operations.png import pdf2png
+from pdfp.operations.split import split
+from pdfp.operations.merge import merge
+from pdfp.operations.file2pdf import file2pdf
+from pdfp.utils.job_engine import JobEngine
 # from pdfp.utils.ocr_progress_plugin import pb
 # from pdfp.utils.ocr_progress_plugin import MyProgressBar
 import os
 import logging
+import threading
 from ocrmypdf import hookimpl
 
 logger = logging.getLogger("pdfp")
 
+# Progress bars are repainted at most this many times per second
+PROGRESS_FPS = 30
+
 class WorkerProgress(QWidget):
     """
     Widget to display progress of a specific worker.
@@ -36,13 +45,42 @@ class WorkerProgress(QWidget):
         self.layout().addWidget(self.progress)
         self.layout().setSpacing(10)
 
+class PendingUpdate:
+    """
+    Latest progress, label and completion posted for one worker since the last frame.
+    Attributes:
+        progress (int): Latest progress value, or None.
+        label (str): Latest label prefix, or None.
+        done_before (bool): The worker finished before the latest progress or label, so its bar is replaced by a new one.
+        done (bool): The worker finished after the latest progress or label.
+    """
+    __slots__ = ("progress", "label", "done_before", "done")
+
+    def __init__(self):
+        self.progress = None
+        self.label = None
+        self.done_before = False
+        self.done = False
+
+    def restart_if_done(self):
+        if self.done:
+            self.done_before = True
+            self.done = False
+
 class ProgressWidget(QScrollArea):
     """
     Scrollable area widget to manage and display multiple worker progress bars.
+    Updates are posted from any thread and coalesced: only the latest value per worker is applied, at most PROGRESS_FPS times per second.
     Attributes:
         workers (dict): Dictionary to store worker progress widgets.
         pb_list (QVBoxLayout): Layout to organize progress widgets vertically.
+        pending (dict): Updates posted since the last frame, by worker name.
+        frame_timer (QTimer): Single-shot timer that applies pending updates.
+    Signals:
+        updates_posted: Emitted once per frame by the first post, to start frame_timer on the GUI thread.
     """
+    updates_posted = Signal()
+
     _instance = None
     def __new__(cls, *args, **kwargs):
         """
@@ -65,16 +103,23 @@ class ProgressWidget(QScrollArea):
 
     def __init__(self):
         self.workers = {}
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.frame_scheduled = False
         super().__init__()
-        crop.worker_done.connect(self.worker_done)
-        crop.worker_progress.connect(self.worker_progress)
-        crop.revise_worker_label.connect(self.revise_worker_label)
-        ocr.worker_done.connect(self.worker_done)
-        ocr.worker_progress.connect(self.worker_progress)
-        ocr.revise_worker_label.connect(self.revise_worker_label)
-        tts.worker_done.connect(self.worker_done)
-        tts.worker_progress.connect(self.worker_progress)
-        tts.revise_worker_label.connect(self.revise_worker_label)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(1000 // PROGRESS_FPS)
+        self.frame_timer.timeout.connect(self.apply_pending)
+        self.updates_posted.connect(self.schedule_frame, Qt.QueuedConnection)
+        #direct connections run the post methods on the emitting thread, so a progress tick costs a dict update instead of a queued event
+        for converter in (file2pdf, crop, ocr, tts, pdf2png, split, merge):
+            converter.worker_done.connect(self.post_done, Qt.DirectConnection)
+            converter.worker_progress.connect(self.post_progress, Qt.DirectConnection)
+            converter.revise_worker_label.connect(self.post_label, Qt.DirectConnection)
+        job_engine = JobEngine.instance()
+        job_engine.batch_progress.connect(self.batch_progress)
+        job_engine.batch_finished.connect(self.batch_finished)
         # pb = MyProgressBar(total=0,desc="Progress Widget",unit="")
         # pb.worker_done.connect(self.worker_done)
         # pb.worker_progress.connect(self.worker_progress)
@@ -93,6 +138,73 @@ class ProgressWidget(QScrollArea):
 
         self.installEventFilter(self)
 
+    def pending_update(self, worker_name):
+        """Return the pending update of worker_name, scheduling a frame if none is pending. Call with pending_lock held."""
+        update = self.pending.get(worker_name)
+        if update is None:
+            update = self.pending[worker_name] = PendingUpdate()
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.updates_posted.emit()
+        return update
+
+    def post_progress(self, worker_name, progress):
+        """
+        Records the progress of a worker for the next frame. Safe to call from any thread.
+        Args:
+            worker_name (str): Name of the worker.
+            progress (int): Progress value to show.
+        """
+        with self.pending_lock:
+            update = self.pending_update(worker_name)
+            update.restart_if_done()
+            update.progress = progress
+
+    def post_label(self, worker_name, label_prefix):
+        """
+        Records a new label prefix of a worker for the next frame. Safe to call from any thread.
+        Args:
+            worker_name (str): Name of the worker.
+            label_prefix (str): New prefix for the worker's label.
+        """
+        with self.pending_lock:
+            update = self.pending_update(worker_name)
+            update.restart_if_done()
+            update.label = label_prefix
+
+    def post_done(self, worker_name):
+        """
+        Records that a worker finished, removing its bar on the next frame. Safe to call from any thread.
+        Args:
+            worker_name (str): Name of the worker.
+        """
+        with self.pending_lock:
+            self.pending_update(worker_name).done = True
+
+    @Slot()
+    def schedule_frame(self):
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    @Slot()
+    def apply_pending(self):
+        """Applies the latest pending update of each worker."""
+        with self.pending_lock:
+            pending = self.pending
+            self.pending = {}
+            self.frame_scheduled = False
+        for worker_name, update in pending.items():
+            if update.done_before:
+                self.worker_done(worker_name)
+            if update.done:
+                #no point drawing a bar that is removed in the same frame
+                self.worker_done(worker_name)
+                continue
+            if update.progress is not None:
+                self.worker_progress(worker_name, update.progress)
+            if update.label is not None:
+                self.revise_worker_label(worker_name, update.label)
+
     def init_worker_progress(self, worker_name):
         """
         Initializes a new WorkerProgress widget for the specified worker.
@@ -138,6 +250,27 @@ class ProgressWidget(QScrollArea):
             logger.debug("No more workers. Closing progress widget.")
             self.setVisible(False)
 
+    def batch_progress(self, batch):
+        """
+        Updates the queue progress bar of a job engine batch. Single-file batches have no queue bar.
+        Once pages have been processed, the label shows the aggregate pages per second.
+        Args:
+            batch (Batch): The batch that made progress.
+        """
+        if batch.total < 2:
+            return
+        self.post_progress(batch.worker_name, (batch.done / batch.total) * 100)
+        if batch.pages:
+            self.post_label(batch.worker_name, f"Queue {batch.pages_per_second:.2f} pages/s")
+
+    def batch_finished(self, batch):
+        """
+        Removes the queue progress bar of a finished job engine batch.
+        Args:
+            batch (Batch): The batch that finished.
+        """
+        self.post_done(batch.worker_name)
+
     def revise_worker_label(self, worker_name, label_prefix):
         """
         Updates the label of the specified worker with a new prefix.
@@ -2,6 +2,10 @@ import os
 from PySide6.QtWidgets import *
 from PySide6.QtCore import *
 import logging
+from pdfp.utils.result_cache import ResultCache, DEFAULT_CACHE_DIR, RESULTS_SUBDIR
+from pdfp.utils.text_cache import TextCache
+from pdfp.utils.thumbnail_cache import ThumbnailCache
+from pdfp.utils.operation_settings import OperationSettings
 
 logger = logging.getLogger("pdfp")
 
@@ -43,27 +47,104 @@ class SettingsWindow(QWidget):
         self.setMinimumHeight(250)
 
         self.settings = QSettings()
+        self.saved_snapshot = None
 
         #general
         gen_settings_label = QLabel("<strong>General Settings</strong>")
         self.add_file_checkbox = QCheckBox("Add created files to tree")
         self.remember_window_checkbox = QCheckBox("Remember window placement")
+        self.file_details_checkbox = QCheckBox("Show page count, size and text layer of files")
+        self.preview_checkbox = QCheckBox("Show page previews of the current file")
+        thumbnail_memory_label = QLabel("Preview memory (MB):")
+        self.thumbnail_memory_spinbox = NoScrollSpinBox()
+        self.thumbnail_memory_spinbox.setRange(8, 4096)
+        self.thumbnail_memory_spinbox.setSingleStep(16)
+        self.thumbnail_memory_spinbox.setToolTip("Memory kept for page thumbnails. Thumbnails are also kept in the cache directory while the result cache is enabled")
+        max_jobs_label = QLabel("Max concurrent jobs:")
+        self.max_jobs_spinbox = NoScrollSpinBox()
+        self.max_jobs_spinbox.setRange(1, max(1, QThread.idealThreadCount()))
+        import_depth_label = QLabel("Folder import depth:")
+        self.import_depth_spinbox = NoScrollSpinBox()
+        self.import_depth_spinbox.setRange(-1, 99)
+        self.import_depth_spinbox.setSpecialValueText("Unlimited")
+        self.import_depth_spinbox.setToolTip("Levels of subfolders to import. 0 imports only the selected folder")
+        import_include_label = QLabel("Import only:")
+        self.import_include_input = QLineEdit()
+        self.import_include_input.setPlaceholderText("All files, e.g. *.pdf; scan*")
+        import_exclude_label = QLabel("Skip:")
+        self.import_exclude_input = QLineEdit()
+        self.import_exclude_input.setPlaceholderText("Nothing, e.g. .git; *_ocr.pdf")
+        self.import_exclude_input.setToolTip("Files and folders matching these patterns are skipped")
 
         gen_grid = QGridLayout()
         gen_grid.addWidget(gen_settings_label, 0, 0, 1, 2, alignment=Qt.AlignCenter)
         gen_grid.addWidget(self.add_file_checkbox, 1, 0, 1, 2, alignment=Qt.AlignCenter)
         gen_grid.addWidget(self.remember_window_checkbox, 2, 0, 1, 2, alignment=Qt.AlignCenter)
+        gen_grid.addWidget(self.file_details_checkbox, 3, 0, 1, 2, alignment=Qt.AlignCenter)
+        gen_grid.addWidget(self.preview_checkbox, 4, 0, 1, 2, alignment=Qt.AlignCenter)
+        gen_grid.addWidget(thumbnail_memory_label, 5, 0, alignment=Qt.AlignRight)
+        gen_grid.addWidget(self.thumbnail_memory_spinbox, 5, 1, alignment=Qt.AlignLeft)
+        gen_grid.addWidget(max_jobs_label, 6, 0, alignment=Qt.AlignRight)
+        gen_grid.addWidget(self.max_jobs_spinbox, 6, 1, alignment=Qt.AlignLeft)
+        gen_grid.addWidget(import_depth_label, 7, 0, alignment=Qt.AlignRight)
+        gen_grid.addWidget(self.import_depth_spinbox, 7, 1, alignment=Qt.AlignLeft)
+        gen_grid.addWidget(import_include_label, 8, 0, alignment=Qt.AlignRight)
+        gen_grid.addWidget(self.import_include_input, 8, 1)
+        gen_grid.addWidget(import_exclude_label, 9, 0, alignment=Qt.AlignRight)
+        gen_grid.addWidget(self.import_exclude_input, 9, 1)
 
         gen_box = QGroupBox()
         gen_box.setLayout(gen_grid)
 
+        #result cache
+        cache_settings_label = QLabel("<strong>Result Cache Settings</strong>")
+        self.result_cache_checkbox = QCheckBox("Reuse OCR, File to PDF, extracted text and page previews for identical inputs")
+        self.result_cache_checkbox.toggled.connect(self.result_cache_checkbox_action)
+        self.result_cache_location_button = QPushButton("Cache location")
+        self.result_cache_location_button.setFixedWidth(125)
+        self.result_cache_location_display = QLineEdit()
+        self.result_cache_location_display.setPlaceholderText("Default: pdfp/cache")
+        self.result_cache_location_display.setReadOnly(True)
+        self.result_cache_location_button.clicked.connect(self.select_result_cache_folder)
+        result_cache_location_layout = QHBoxLayout()
+        result_cache_location_layout.addWidget(self.result_cache_location_button)
+        result_cache_location_layout.addWidget(self.result_cache_location_display)
+        self.result_cache_max_label = QLabel("Max size (MB):")
+        self.result_cache_max_mb = NoScrollSpinBox()
+        self.result_cache_max_mb.setRange(1, 1048576)
+        self.result_cache_max_mb.setSingleStep(256)
+        self.result_cache_hardlink_checkbox = QCheckBox("Hard link cached results instead of copying")
+        self.result_cache_hardlink_checkbox.setToolTip("Saves disk space. Editing an output in place also changes the cached copy")
+        self.result_cache_clear_button = QPushButton("Clear Cache")
+        self.result_cache_clear_button.clicked.connect(self.clear_result_cache)
+
+        cache_grid = QGridLayout()
+        cache_grid.addWidget(cache_settings_label, 0, 0, 1, 2, alignment=Qt.AlignCenter)
+        cache_grid.addWidget(self.result_cache_checkbox, 1, 0, 1, 2, alignment=Qt.AlignCenter)
+        cache_grid.addLayout(result_cache_location_layout, 2, 0, 1, 2)
+        cache_grid.addWidget(self.result_cache_max_label, 3, 0, alignment=Qt.AlignRight)
+        cache_grid.addWidget(self.result_cache_max_mb, 3, 1, alignment=Qt.AlignLeft)
+        cache_grid.addWidget(self.result_cache_hardlink_checkbox, 4, 0, 1, 2, alignment=Qt.AlignCenter)
+        cache_grid.addWidget(self.result_cache_clear_button, 5, 0, 1, 2, alignment=Qt.AlignCenter)
+
+        cache_box = QGroupBox()
+        cache_box.setLayout(cache_grid)
+
         #f2pdf
         f2p_settings_label = QLabel("<strong>File to PDF Settings</strong>")
         self.f2p_cover_checkbox = QCheckBox("Use images named 'cover' as first page")
+        f2p_batch_label = QLabel("Pages per batch: ")
+        self.f2p_batch_spinbox = NoScrollSpinBox()
+        self.f2p_batch_spinbox.setRange(0, 100000)
+        self.f2p_batch_spinbox.setSingleStep(50)
+        self.f2p_batch_spinbox.setSpecialValueText("All")
+        self.f2p_batch_spinbox.setToolTip("Pages converted at a time. Smaller batches keep memory low for very large books. All converts the whole file at once.")
 
         f2p_grid = QGridLayout()
-        f2p_grid.addWidget(f2p_settings_label,0,0,alignment=Qt.AlignCenter)
-        f2p_grid.addWidget(self.f2p_cover_checkbox,1,0,alignment=Qt.AlignCenter)
+        f2p_grid.addWidget(f2p_settings_label,0,0,1,2,alignment=Qt.AlignCenter)
+        f2p_grid.addWidget(self.f2p_cover_checkbox,1,0,1,2,alignment=Qt.AlignCenter)
+        f2p_grid.addWidget(f2p_batch_label,2,0,alignment=Qt.AlignRight)
+        f2p_grid.addWidget(self.f2p_batch_spinbox,2,1,alignment=Qt.AlignLeft)
 
         f2p_box = QGroupBox()
         f2p_box.setLayout(f2p_grid)
@@ -71,10 +152,29 @@ class SettingsWindow(QWidget):
         #png
         png_settings_label = QLabel("<strong>PNG Settings</strong>")
         self.png_cover_checkbox = QCheckBox("Always output to cover.png")
+        png_dpi_label = QLabel("DPI: ")
+        self.png_dpi_spinbox = NoScrollSpinBox()
+        self.png_dpi_spinbox.setRange(36, 1200)
+        png_colorspace_label = QLabel("Color: ")
+        self.png_colorspace_combobox = NoScrollComboBox()
+        self.png_colorspace_combobox.addItems(["RGB", "Gray"])
+        self.png_alpha_checkbox = QCheckBox("Transparent background")
+        png_processes_label = QLabel("Processes: ")
+        self.png_processes_spinbox = NoScrollSpinBox()
+        self.png_processes_spinbox.setRange(0, max(1, QThread.idealThreadCount()))
+        self.png_processes_spinbox.setSpecialValueText("Auto")
+        self.png_processes_spinbox.setToolTip("Processes rendering the pages of one PDF. Auto uses one per core.")
 
         png_grid = QGridLayout()
-        png_grid.addWidget(png_settings_label,0,0,alignment=Qt.AlignCenter)
-        png_grid.addWidget(self.png_cover_checkbox,1,0,alignment=Qt.AlignCenter)
+        png_grid.addWidget(png_settings_label,0,0,1,2,alignment=Qt.AlignCenter)
+        png_grid.addWidget(self.png_cover_checkbox,1,0,1,2,alignment=Qt.AlignCenter)
+        png_grid.addWidget(png_dpi_label,2,0,alignment=Qt.AlignRight)
+        png_grid.addWidget(self.png_dpi_spinbox,2,1,alignment=Qt.AlignLeft)
+        png_grid.addWidget(png_colorspace_label,3,0,alignment=Qt.AlignRight)
+        png_grid.addWidget(self.png_colorspace_combobox,3,1,alignment=Qt.AlignLeft)
+        png_grid.addWidget(self.png_alpha_checkbox,4,0,1,2,alignment=Qt.AlignCenter)
+        png_grid.addWidget(png_processes_label,5,0,alignment=Qt.AlignRight)
+        png_grid.addWidget(self.png_processes_spinbox,5,1,alignment=Qt.AlignLeft)
 
         png_box = QGroupBox()
         png_box.setLayout(png_grid)
@@ -89,6 +189,15 @@ class SettingsWindow(QWidget):
         self.ocr_optimize_level = NoScrollSpinBox()
         self.ocr_optimize_level.setRange(0,3)
         self.native_ocr_checkbox = QCheckBox("Use native ocrmypdf package")
+        ocr_docs_label = QLabel("Documents in parallel: ")
+        self.ocr_parallel_docs = NoScrollSpinBox()
+        self.ocr_parallel_docs.setRange(0, max(1, QThread.idealThreadCount()))
+        self.ocr_parallel_docs.setSpecialValueText("Auto")
+        self.ocr_parallel_docs.setToolTip("Used with native ocrmypdf and in batch mode. Otherwise documents are OCRed one at a time with every core.")
+        ocr_jobs_label = QLabel("Cores per document: ")
+        self.ocr_jobs_per_doc = NoScrollSpinBox()
+        self.ocr_jobs_per_doc.setRange(0, max(1, QThread.idealThreadCount()))
+        self.ocr_jobs_per_doc.setSpecialValueText("Auto")
 
         ocr_grid = QGridLayout()
         ocr_grid.addWidget(ocr_settings_label,0,0,1,3,alignment=Qt.AlignCenter)
@@ -99,6 +208,10 @@ class SettingsWindow(QWidget):
         ocr_grid.addWidget(self.ocr_optimize_level,2,1,alignment=Qt.AlignLeft)
         ocr_grid.addWidget(self.ocr_deskew_checkbox,3,0,1,3,alignment=Qt.AlignCenter)
         ocr_grid.addWidget(self.native_ocr_checkbox,4,0,1,3,alignment=Qt.AlignCenter)
+        ocr_grid.addWidget(ocr_docs_label,5,0,alignment=Qt.AlignRight)
+        ocr_grid.addWidget(self.ocr_parallel_docs,5,1,alignment=Qt.AlignLeft)
+        ocr_grid.addWidget(ocr_jobs_label,6,0,alignment=Qt.AlignRight)
+        ocr_grid.addWidget(self.ocr_jobs_per_doc,6,1,alignment=Qt.AlignLeft)
         ocr_grid.setColumnStretch(0,50)
         ocr_grid.setColumnStretch(1,15)
         ocr_grid.setColumnStretch(2,35)
@@ -161,6 +274,10 @@ class SettingsWindow(QWidget):
         self.wordcount_split_label = QLabel("Word count to split on:")
         self.wordcount_split_display = QLineEdit()
         self.wordcount_split_display.setPlaceholderText("Default: 100000")
+        self.tts_parallel_requests_label = QLabel("Concurrent requests:")
+        self.tts_parallel_requests = NoScrollSpinBox()
+        self.tts_parallel_requests.setRange(1, 32)
+        self.tts_parallel_requests.setToolTip("gTTS requests to send at once. 1 sends them one at a time")
 
         self.enable_balabolka_checkbox = QCheckBox("Use Balabolka rather than gTTS")
         self.enable_balabolka_checkbox.toggled.connect(self.enable_balabolka_checkbox_action)
@@ -206,14 +323,28 @@ class SettingsWindow(QWidget):
         tts_grid.addWidget(self.split_txt_checkbox,1,0,1,2,alignment=Qt.AlignCenter)
         tts_grid.addWidget(self.wordcount_split_label,2,0,alignment=Qt.AlignRight)
         tts_grid.addWidget(self.wordcount_split_display,2,1,alignment=Qt.AlignLeft)
-        tts_grid.addWidget(self.enable_balabolka_checkbox,3,0,1,2,alignment=Qt.AlignCenter)
-        tts_grid.addWidget(self.bal_box,4,0,1,2,alignment=Qt.AlignCenter)
+        tts_grid.addWidget(self.tts_parallel_requests_label,3,0,alignment=Qt.AlignRight)
+        tts_grid.addWidget(self.tts_parallel_requests,3,1,alignment=Qt.AlignLeft)
+        tts_grid.addWidget(self.enable_balabolka_checkbox,4,0,1,2,alignment=Qt.AlignCenter)
+        tts_grid.addWidget(self.bal_box,5,0,1,2,alignment=Qt.AlignCenter)
         self.wordcount_split_label.setFixedWidth(150)
         self.wordcount_split_display.setFixedWidth(150)
 
         tts_box = QGroupBox()
         tts_box.setLayout(tts_grid)
 
+        #chain
+        chain_settings_label = QLabel("<strong>Chain Settings</strong>")
+        self.chain_keep_intermediates_checkbox = QCheckBox("Keep intermediate files")
+        self.chain_keep_intermediates_checkbox.setToolTip("Write the output of every operation in a chain, not only the last one")
+
+        chain_grid = QGridLayout()
+        chain_grid.addWidget(chain_settings_label,0,0,alignment=Qt.AlignCenter)
+        chain_grid.addWidget(self.chain_keep_intermediates_checkbox,1,0,alignment=Qt.AlignCenter)
+
+        chain_box = QGroupBox()
+        chain_box.setLayout(chain_grid)
+
         #filename
         filename_settings_label = QLabel("<strong>Filename Settings</strong>")
         self.default_filename_checkbox = QCheckBox("Default Filename:")
@@ -285,6 +416,8 @@ class SettingsWindow(QWidget):
         trim_ps_label = QLabel("trim pages: ")
         cc_ps_label = QLabel("clean copy: ")
         tts_ps_label = QLabel("tts: ")
+        split_ps_label = QLabel("split: ")
+        merge_ps_label = QLabel("merge: ")
         self.f2pdf_ps_input = QLineEdit()
         self.png_ps_input = QLineEdit()
         self.ocr_ps_input = QLineEdit()
@@ -292,6 +425,8 @@ class SettingsWindow(QWidget):
         self.trim_ps_input = QLineEdit()
         self.cc_ps_input = QLineEdit()
         self.tts_ps_input = QLineEdit()
+        self.split_ps_input = QLineEdit()
+        self.merge_ps_input = QLineEdit()
         char_ps_label = QLabel("Prefix/Suffix character:")
         self.char_ps_input = QLineEdit()
         self.char_ps_input.setFixedWidth(150)
@@ -317,7 +452,11 @@ class SettingsWindow(QWidget):
         ps_grid.addWidget(self.tts_ps_input,5,3)
         ps_grid.addWidget(crop_ps_label,6,0)
         ps_grid.addWidget(self.crop_ps_input,6,1)
-        ps_grid.addWidget(self.disable_non_pdf_ps_checkbox,7,0,1,4,alignment=Qt.AlignCenter)
+        ps_grid.addWidget(split_ps_label,6,2)
+        ps_grid.addWidget(self.split_ps_input,6,3)
+        ps_grid.addWidget(merge_ps_label,7,0)
+        ps_grid.addWidget(self.merge_ps_input,7,1)
+        ps_grid.addWidget(self.disable_non_pdf_ps_checkbox,8,0,1,4,alignment=Qt.AlignCenter)
 
         self.ps_box = QGroupBox()
         self.ps_box.setLayout(ps_grid)
@@ -349,23 +488,65 @@ class SettingsWindow(QWidget):
         self.log_level_combobox.addItem("WARNING")
         self.log_level_combobox.addItem("ERROR")
         self.log_level_combobox.addItem("SUCCESS")
+        log_max_lines_label = QLabel("Log view lines:")
+        self.log_max_lines_spinbox = NoScrollSpinBox()
+        self.log_max_lines_spinbox.setRange(100, 1000000)
+        self.log_max_lines_spinbox.setSingleStep(1000)
+        self.log_max_lines_spinbox.setToolTip("Older lines are dropped from the log view. Log files are not affected")
         self.log_file_checkbox = QCheckBox("Enable logging to file")
         self.log_file_radio = QRadioButton("TXT")
         self.json_file_radio = QRadioButton("JSON")
+        self.log_rotation_label = QLabel("Rotate log file:")
+        self.log_rotation_combobox = NoScrollComboBox()
+        self.log_rotation_combobox.addItem("Never")
+        self.log_rotation_combobox.addItem("By size")
+        self.log_rotation_combobox.addItem("Daily")
+        self.log_rotation_size_label = QLabel("Rotate at (MB):")
+        self.log_rotation_size_spinbox = NoScrollSpinBox()
+        self.log_rotation_size_spinbox.setRange(1, 10240)
+        self.log_backup_count_label = QLabel("Rotated files kept:")
+        self.log_backup_count_spinbox = NoScrollSpinBox()
+        self.log_backup_count_spinbox.setRange(1, 1000)
+        self.log_compress_checkbox = QCheckBox("Compress rotated log files")
+        self.latency_monitor_checkbox = QCheckBox("Log GUI stalls")
+        self.latency_monitor_checkbox.setToolTip("Report when the window stops responding, which operation caused it, and a summary on exit")
+        self.latency_threshold_label = QLabel("Stall threshold (ms):")
+        self.latency_threshold_spinbox = NoScrollSpinBox()
+        self.latency_threshold_spinbox.setRange(50, 10000)
+        self.latency_threshold_spinbox.setSingleStep(50)
         restart_logger_button = QPushButton("Restart Logger")
 
         log_grid = QGridLayout()
         log_grid.addWidget(logging_settings_label, 0, 0, 1, 2, alignment=Qt.AlignCenter)
         log_grid.addWidget(log_level_label, 1, 0, alignment=Qt.AlignRight)
         log_grid.addWidget(self.log_level_combobox, 1, 1, alignment=Qt.AlignLeft)
-        log_grid.addWidget(self.log_file_checkbox, 2, 0, 1, 2, alignment=Qt.AlignCenter)
-        log_grid.addWidget(self.log_file_radio, 3, 0, alignment=Qt.AlignRight)
-        log_grid.addWidget(self.json_file_radio, 3, 1, alignment=Qt.AlignLeft)
-        log_grid.addWidget(restart_logger_button, 4, 0, 1, 2, alignment=Qt.AlignCenter)
+        log_grid.addWidget(log_max_lines_label, 2, 0, alignment=Qt.AlignRight)
+        log_grid.addWidget(self.log_max_lines_spinbox, 2, 1, alignment=Qt.AlignLeft)
+        log_grid.addWidget(self.log_file_checkbox, 3, 0, 1, 2, alignment=Qt.AlignCenter)
+        log_grid.addWidget(self.log_file_radio, 4, 0, alignment=Qt.AlignRight)
+        log_grid.addWidget(self.json_file_radio, 4, 1, alignment=Qt.AlignLeft)
+        log_grid.addWidget(self.log_rotation_label, 5, 0, alignment=Qt.AlignRight)
+        log_grid.addWidget(self.log_rotation_combobox, 5, 1, alignment=Qt.AlignLeft)
+        log_grid.addWidget(self.log_rotation_size_label, 6, 0, alignment=Qt.AlignRight)
+        log_grid.addWidget(self.log_rotation_size_spinbox, 6, 1, alignment=Qt.AlignLeft)
+        log_grid.addWidget(self.log_backup_count_label, 7, 0, alignment=Qt.AlignRight)
+        log_grid.addWidget(self.log_backup_count_spinbox, 7, 1, alignment=Qt.AlignLeft)
+        log_grid.addWidget(self.log_compress_checkbox, 8, 0, 1, 2, alignment=Qt.AlignCenter)
+        log_grid.addWidget(self.latency_monitor_checkbox, 9, 0, 1, 2, alignment=Qt.AlignCenter)
+        log_grid.addWidget(self.latency_threshold_label, 10, 0, alignment=Qt.AlignRight)
+        log_grid.addWidget(self.latency_threshold_spinbox, 10, 1, alignment=Qt.AlignLeft)
+        log_grid.addWidget(restart_logger_button, 11, 0, 1, 2, alignment=Qt.AlignCenter)
 
         self.log_level_combobox.currentIndexChanged.connect(self.update_log_level_action)
+        self.log_max_lines_spinbox.valueChanged.connect(self.update_log_max_lines_action)
         self.log_file_checkbox.toggled.connect(self.log_file_checkbox_action)
         self.json_file_radio.toggled.connect(self.update_log_file_action)
+        self.log_rotation_combobox.currentIndexChanged.connect(self.log_rotation_combobox_action)
+        self.log_rotation_size_spinbox.editingFinished.connect(self.update_log_file_action)
+        self.log_backup_count_spinbox.editingFinished.connect(self.update_log_file_action)
+        self.log_compress_checkbox.toggled.connect(self.update_log_file_action)
+        self.latency_monitor_checkbox.toggled.connect(self.latency_monitor_checkbox_action)
+        self.latency_threshold_spinbox.valueChanged.connect(self.update_latency_monitor_action)
         restart_logger_button.clicked.connect(self.restart_logger_action)
 
         log_box = QGroupBox()
@@ -392,12 +573,14 @@ class SettingsWindow(QWidget):
         scrollable_content = QWidget()
         scrollable_layout = QVBoxLayout(scrollable_content)
         scrollable_layout.addWidget(gen_box)
+        scrollable_layout.addWidget(cache_box)
         scrollable_layout.addWidget(f2p_box)
         scrollable_layout.addWidget(png_box)
         scrollable_layout.addWidget(ocr_box)
         scrollable_layout.addWidget(crop_box)
         scrollable_layout.addWidget(cc_box)
         scrollable_layout.addWidget(tts_box)
+        scrollable_layout.addWidget(chain_box)
         scrollable_layout.addWidget(filename_box)
         scrollable_layout.addWidget(log_box)
 
@@ -417,6 +600,18 @@ class SettingsWindow(QWidget):
         self.ini_file = QSettings(save_filename, QSettings.IniFormat)
         self.save_settings(True, self.ini_file)
 
+    def snapshot(self):
+        """
+        Return the saved settings as a frozen OperationSettings.
+        Batches take one snapshot when they are queued, so editing settings while they run does not change them.
+        The snapshot is reused until settings are saved or reset.
+        Returns:
+            OperationSettings: The saved settings.
+        """
+        if self.saved_snapshot is None:
+            self.saved_snapshot = OperationSettings(self.settings)
+        return self.saved_snapshot
+
     def load_as_settings(self):
         """Load settings configuration from an INI file."""
         load_filename = self.load_ini_file()
@@ -426,6 +621,7 @@ class SettingsWindow(QWidget):
     def reset_settings(self):
         """Clear current settings configuration and load default values."""
         self.settings.clear()
+        self.saved_snapshot = None
         self.load_settings(True)
     
     def load_settings(self, remain_open=False, ini_file=""):
@@ -444,12 +640,31 @@ class SettingsWindow(QWidget):
         #general
         self.add_file_checkbox.setChecked(get_value("enable_add_file", True, type=bool))
         self.remember_window_checkbox.setChecked(get_value("enable_remember_window", False, type=bool))
+        self.file_details_checkbox.setChecked(get_value("show_file_details", True, type=bool))
+        self.preview_checkbox.setChecked(get_value("show_preview", True, type=bool))
+        self.thumbnail_memory_spinbox.setValue(get_value("thumbnail_memory_mb", 64, type=int))
+        self.max_jobs_spinbox.setValue(get_value("max_jobs", 2, type=int))
+        self.import_depth_spinbox.setValue(get_value("import_depth", -1, type=int))
+        self.import_include_input.setText(get_value("import_include", "", type=str))
+        self.import_exclude_input.setText(get_value("import_exclude", "", type=str))
+
+        #result cache
+        self.result_cache_checkbox.setChecked(enable_result_cache := get_value("enable_result_cache", True, type=bool))
+        self.result_cache_checkbox_action(enable_result_cache)
+        self.result_cache_location_display.setText(get_value("result_cache_location", "", type=str))
+        self.result_cache_max_mb.setValue(get_value("result_cache_max_mb", 2048, type=int))
+        self.result_cache_hardlink_checkbox.setChecked(get_value("result_cache_hardlink", False, type=bool))
 
         #file2pdf
         self.f2p_cover_checkbox.setChecked(get_value("f2p_cover", True, type=bool))
+        self.f2p_batch_spinbox.setValue(get_value("f2p_batch_pages", 200, type=int))
 
         #png
         self.png_cover_checkbox.setChecked(get_value("png_cover", False, type=bool))
+        self.png_dpi_spinbox.setValue(get_value("png_dpi", 72, type=int))
+        self.png_colorspace_combobox.setCurrentText(get_value("png_colorspace", "RGB", type=str))
+        self.png_alpha_checkbox.setChecked(get_value("png_alpha", False, type=bool))
+        self.png_processes_spinbox.setValue(get_value("png_processes", 0, type=int))
 
         #ocr
         self.ocr_deskew_checkbox.setChecked(get_value("ocr_deskew", True, type=bool))
@@ -457,6 +672,8 @@ class SettingsWindow(QWidget):
         self.ocr_pdfa_radio.setChecked(not ocr_pdf_checked)
         self.ocr_optimize_level.setValue(get_value("ocr_optimize_level", 0, type=int))
         self.native_ocr_checkbox.setChecked(get_value("native_ocr", True, type=bool))
+        self.ocr_parallel_docs.setValue(get_value("ocr_parallel_docs", 0, type=int))
+        self.ocr_jobs_per_doc.setValue(get_value("ocr_jobs_per_doc", 0, type=int))
 
         #briss/crop
         self.auto_crop_radio.setChecked(auto_crop_checked := get_value("auto_crop_checked", False, type=bool))
@@ -472,6 +689,7 @@ class SettingsWindow(QWidget):
         self.split_txt_checkbox.setChecked(enable_split_txt := get_value("enable_split_txt", True, type=bool))
         self.split_txt_checkbox_action(enable_split_txt)
         self.wordcount_split_display.setText(get_value("wordcount_split", "100000", type=str))
+        self.tts_parallel_requests.setValue(get_value("tts_parallel_requests", 4, type=int))
 
         self.enable_balabolka_checkbox.setChecked(enable_balabolka := get_value("enable_balabolka", False, type=bool))
         self.enable_balabolka_checkbox_action(enable_balabolka)
@@ -480,6 +698,9 @@ class SettingsWindow(QWidget):
         self.wine_prefix_checkbox_action(enable_wine_prefix)
         self.wine_prefix_location_display.setText(get_value("wine_prefix_location", "", type=str))
 
+        #chain
+        self.chain_keep_intermediates_checkbox.setChecked(get_value("chain_keep_intermediates", False, type=bool))
+
         #filename
         self.default_filename_checkbox.setChecked(enable_default_filename := get_value("enable_default_filename", False, type=bool))
         self.default_filename_checkbox_action(enable_default_filename)
@@ -511,6 +732,8 @@ class SettingsWindow(QWidget):
         self.ocr_ps_input.setText(get_value("ocr_ps", "ocr", type=str))
         self.crop_ps_input.setText(get_value("crop_ps", "crop", type=str))
         self.trim_ps_input.setText(get_value("trim_ps", "trim", type=str))
+        self.split_ps_input.setText(get_value("split_ps", "split", type=str))
+        self.merge_ps_input.setText(get_value("merge_ps", "merged", type=str))
         self.cc_ps_input.setText(get_value("cc_ps", "copy", type=str))
         self.tts_ps_input.setText(get_value("tts_ps", "tts", type=str))
         self.char_ps_input.setText(get_value("char_ps", "-", type=str))
@@ -518,10 +741,19 @@ class SettingsWindow(QWidget):
 
         #logging
         self.log_level_combobox.setCurrentText(get_value("logging_level", "INFO", type=str))
+        self.log_max_lines_spinbox.setValue(get_value("log_max_lines", 10000, type=int))
         self.log_file_checkbox.setChecked(enable_log_file := get_value("enable_log_file", True, type=bool))
         self.log_file_checkbox_action(enable_log_file)
         self.json_file_radio.setChecked(json_log_checked := get_value("json_log_checked", True, type=bool))
         self.log_file_radio.setChecked(not json_log_checked)
+        self.log_rotation_size_spinbox.setValue(get_value("log_rotation_mb", 10, type=int))
+        self.log_backup_count_spinbox.setValue(get_value("log_backup_count", 5, type=int))
+        self.log_compress_checkbox.setChecked(get_value("log_compress", True, type=bool))
+        self.log_rotation_combobox.setCurrentText(get_value("log_rotation", "By size", type=str))
+        self.log_rotation_combobox_action()
+        self.latency_threshold_spinbox.setValue(get_value("latency_threshold_ms", 200, type=int))
+        self.latency_monitor_checkbox.setChecked(latency_monitor := get_value("enable_latency_monitor", False, type=bool))
+        self.latency_monitor_checkbox_action(latency_monitor)
 
         if not remain_open:
             self.close()
@@ -537,22 +769,43 @@ class SettingsWindow(QWidget):
             set_value = ini_file.setValue
         else:
             set_value = self.settings.setValue
+            self.saved_snapshot = None
 
         #general
         set_value("enable_add_file", self.add_file_checkbox.isChecked())
         set_value("enable_remember_window", self.remember_window_checkbox.isChecked())
+        set_value("show_file_details", self.file_details_checkbox.isChecked())
+        set_value("show_preview", self.preview_checkbox.isChecked())
+        set_value("thumbnail_memory_mb", self.thumbnail_memory_spinbox.value())
+        set_value("max_jobs", self.max_jobs_spinbox.value())
+        set_value("import_depth", self.import_depth_spinbox.value())
+        set_value("import_include", self.import_include_input.text())
+        set_value("import_exclude", self.import_exclude_input.text())
+
+        #result cache
+        set_value("enable_result_cache", self.result_cache_checkbox.isChecked())
+        set_value("result_cache_location", self.result_cache_location_display.text())
+        set_value("result_cache_max_mb", self.result_cache_max_mb.value())
+        set_value("result_cache_hardlink", self.result_cache_hardlink_checkbox.isChecked())
 
         #file2pdf
         set_value("f2p_cover", self.f2p_cover_checkbox.isChecked())
+        set_value("f2p_batch_pages", self.f2p_batch_spinbox.value())
 
         #png
         set_value("png_cover", self.png_cover_checkbox.isChecked())
+        set_value("png_dpi", self.png_dpi_spinbox.value())
+        set_value("png_colorspace", self.png_colorspace_combobox.currentText())
+        set_value("png_alpha", self.png_alpha_checkbox.isChecked())
+        set_value("png_processes", self.png_processes_spinbox.value())
 
         #ocr
         set_value("ocr_deskew", self.ocr_deskew_checkbox.isChecked())
         set_value("ocr_pdf_checked", self.ocr_pdf_radio.isChecked())
         set_value("ocr_optimize_level", self.ocr_optimize_level.value())
         set_value("native_ocr", self.native_ocr_checkbox.isChecked())
+        set_value("ocr_parallel_docs", self.ocr_parallel_docs.value())
+        set_value("ocr_jobs_per_doc", self.ocr_jobs_per_doc.value())
 
         #briss/crop
         set_value("auto_crop_checked", self.auto_crop_radio.isChecked())
@@ -565,12 +818,16 @@ class SettingsWindow(QWidget):
         #tts
         set_value("enable_split_txt", self.split_txt_checkbox.isChecked())
         set_value("wordcount_split", self.wordcount_split_display.text())
+        set_value("tts_parallel_requests", self.tts_parallel_requests.value())
 
         set_value("enable_balabolka", self.enable_balabolka_checkbox.isChecked())
         set_value("balabolka_location", self.balabolka_location_display.text())
         set_value("enable_wine_prefix", self.wine_prefix_checkbox.isChecked())
         set_value("wine_prefix_location", self.wine_prefix_location_display.text())
 
+        #chain
+        set_value("chain_keep_intermediates", self.chain_keep_intermediates_checkbox.isChecked())
+
         #filename
         set_value("enable_default_filename", self.default_filename_checkbox.isChecked())
         set_value("default_filename", self.default_filename_input.text())
@@ -595,6 +852,8 @@ class SettingsWindow(QWidget):
         set_value("ocr_ps", self.ocr_ps_input.text())
         set_value("crop_ps", self.crop_ps_input.text())
         set_value("trim_ps", self.trim_ps_input.text())
+        set_value("split_ps", self.split_ps_input.text())
+        set_value("merge_ps", self.merge_ps_input.text())
         set_value("cc_ps", self.cc_ps_input.text())
         set_value("tts_ps", self.tts_ps_input.text())
         set_value("char_ps", self.char_ps_input.text())
@@ -602,8 +861,15 @@ class SettingsWindow(QWidget):
 
         #logging
         set_value("logging_level", self.log_level_combobox.currentText())
+        set_value("log_max_lines", self.log_max_lines_spinbox.value())
         set_value("enable_log_file", self.log_file_checkbox.isChecked())
         set_value("json_log_checked", self.json_file_radio.isChecked())
+        set_value("log_rotation", self.log_rotation_combobox.currentText())
+        set_value("log_rotation_mb", self.log_rotation_size_spinbox.value())
+        set_value("log_backup_count", self.log_backup_count_spinbox.value())
+        set_value("log_compress", self.log_compress_checkbox.isChecked())
+        set_value("enable_latency_monitor", self.latency_monitor_checkbox.isChecked())
+        set_value("latency_threshold_ms", self.latency_threshold_spinbox.value())
 
         if not remain_open:
             self.close()
@@ -634,6 +900,19 @@ class SettingsWindow(QWidget):
         """
         self.log_file_radio.setEnabled(checked)
         self.json_file_radio.setEnabled(checked)
+        self.log_rotation_label.setEnabled(checked)
+        self.log_rotation_combobox.setEnabled(checked)
+        self.log_rotation_combobox_action()
+
+    def log_rotation_combobox_action(self):
+        """Enable rotation widgets that apply to the selected rotation, then update the log file handler."""
+        enabled = self.log_file_checkbox.isChecked()
+        rotation = self.log_rotation_combobox.currentText()
+        self.log_rotation_size_label.setEnabled(enabled and rotation == "By size")
+        self.log_rotation_size_spinbox.setEnabled(enabled and rotation == "By size")
+        self.log_backup_count_label.setEnabled(enabled and rotation != "Never")
+        self.log_backup_count_spinbox.setEnabled(enabled and rotation != "Never")
+        self.log_compress_checkbox.setEnabled(enabled and rotation != "Never")
         self.update_log_file_action()
 
     def update_log_file_action(self):
@@ -646,6 +925,24 @@ class SettingsWindow(QWidget):
         self.log_signal.emit("update_log_level")
         logger.debug("Log level updated")
 
+    def update_log_max_lines_action(self):
+        """Update the line cap of the log view with new settings."""
+        self.log_signal.emit("update_max_lines")
+
+    def latency_monitor_checkbox_action(self, checked):
+        """
+        Handle action for latency monitor checkbox.
+        Args:
+            checked (bool): Whether the checkbox is checked or not.
+        """
+        self.latency_threshold_label.setEnabled(checked)
+        self.latency_threshold_spinbox.setEnabled(checked)
+        self.update_latency_monitor_action()
+
+    def update_latency_monitor_action(self):
+        """Start, stop or reconfigure the latency monitor with new settings."""
+        self.log_signal.emit("update_latency_monitor")
+
     def restart_logger_action(self):
         """Restart the logger. Disable, remove all handlers, and re-initialize."""
         self.log_signal.emit("restart_logger")
@@ -736,11 +1033,35 @@ class SettingsWindow(QWidget):
         self.split_txt_checkbox.setEnabled(not checked)
         self.wordcount_split_label.setEnabled(not checked)
         self.wordcount_split_display.setEnabled(not checked)
+        self.tts_parallel_requests_label.setEnabled(not checked)
+        self.tts_parallel_requests.setEnabled(not checked)
 
     def select_balabolka_file(self):
         selected_file = self.select_file()
         self.balabolka_location_display.setText(selected_file)
 
+    def result_cache_checkbox_action(self, checked):
+        self.result_cache_location_button.setEnabled(checked)
+        self.result_cache_location_display.setEnabled(checked)
+        self.result_cache_max_label.setEnabled(checked)
+        self.result_cache_max_mb.setEnabled(checked)
+        self.result_cache_hardlink_checkbox.setEnabled(checked)
+
+    def select_result_cache_folder(self):
+        selected_folder = self.select_folder()
+        if selected_folder:
+            self.result_cache_location_display.setText(selected_folder)
+
+    def clear_result_cache(self):
+        """
+        Delete the cached results, text and thumbnails in the result cache location shown in settings.
+        Only the subdirectories pdfp writes in are touched, never the rest of the chosen folder.
+        """
+        location = self.result_cache_location_display.text() or DEFAULT_CACHE_DIR
+        ResultCache(os.path.join(location, RESULTS_SUBDIR), 0).clear()
+        TextCache(os.path.join(location, "text", "pages.sqlite3")).clear()
+        ThumbnailCache(0, os.path.join(location, "thumbnails")).clear_disk()
+
     def select_wine_prefix_folder(self):
         selected_folder = self.select_folder()
         self.wine_prefix_location_display.setText(selected_folder)
@@ -1,32 +1,113 @@
 import pymupdf
 from PySide6.QtCore import Signal, QObject
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.text_cache import TextCache
 import logging
 
 logger = logging.getLogger("pdfp")
 
-def clean_text(file):
+# Approximate characters of a TXT file normalized at a time by iter_clean_text
+TXT_BLOCK_SIZE = 1 << 16
+# Options that change the cached text of a page. Bump normalize when normalize_text changes.
+EXTRACTION_OPTIONS = {"get_text": "text", "normalize": 2}
+
+def clean_text(file, settings=None):
     """
     Cleans up and normalizes the text of a file.
     Args:
-        file (str): Fullpath to file with text to be transformed.
+        file (str or pymupdf.Document): Fullpath to file with text to be transformed, or an open PDF.
+        settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
     Returns:
         text (str): Cleaned text.
     """
+    pieces = iter_clean_text(file, settings)
+    if pieces is None:
+        return
+    return "".join(pieces)
 
+def iter_clean_text(file, settings=None):
+    """
+    Cleans up and normalizes the text of a file one page at a time.
+    Only one page (or block of a TXT file) is held in memory, so long documents can be written out incrementally.
+    The pages of PDF files are read from and stored in the text cache when the result cache is enabled,
+    so clean copy and TTS of the same file only extract it once.
+    Args:
+        file (str or pymupdf.Document): Fullpath to file with text to be transformed, or an open PDF.
+        settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+    Returns:
+        generator of str: Cleaned text, roughly one piece per page. Joining the pieces gives clean_text(file).
+            Every piece after the first starts with a space, so no word is split between two pieces.
+            None if the file is not a PDF or TXT.
+    """
+    if isinstance(file, pymupdf.Document):
+        return normalize_pages(page.get_text() for page in file)
     lowerfile = file.lower()
     if lowerfile.endswith('.pdf'):
-        with pymupdf.open(file) as doc:
-            text = "\n".join([page.get_text() for page in doc])
+        pages = (normalize_text(page) for page in read_pdf_pages(file))
+        cache = TextCache.for_settings(settings or OperationSettings.current())
+        if cache:
+            pages = cache.iter_pages(file, pages, EXTRACTION_OPTIONS)
+        return join_pages(pages)
     elif lowerfile.endswith('.txt'):
-        with open(file, 'r', encoding='utf-8') as txt_file:
-            text = txt_file.read()
-    else:
-        logger.warning(f"Filetype is not PDF or TXT.")
-        return
+        return normalize_pages(read_txt_blocks(file))
+    logger.warning(f"Filetype is not PDF or TXT.")
+    return None
 
-    text = ' '.join(text.splitlines())
-    text = text.replace('- ', '')
-    text = text.strip()
+def read_pdf_pages(file):
+    """Yield the raw text of each page of a PDF, keeping only one page in memory."""
+    with pymupdf.open(file) as doc:
+        for page in doc:
+            yield page.get_text()
+
+def read_txt_blocks(file):
+    """Yield a TXT file in blocks of whole lines, so no word is split between blocks."""
+    with open(file, 'r', encoding='utf-8') as txt_file:
+        while block := txt_file.read(TXT_BLOCK_SIZE):
+            yield block + txt_file.readline()
+
+def normalize_pages(pages):
+    """
+    Joins lines, removes line-break hyphenation and collapses whitespace, page by page.
+    Args:
+        pages (iterable of str): Raw text of each page.
+    Returns:
+        generator of str: Cleaned text. Every piece after the first starts with a space.
+    """
+    return join_pages(normalize_text(page) for page in pages)
+
+def join_pages(pages):
+    """
+    Joins normalized pages with spaces.
+    A page ending in a hyphen is joined to the first word of the next page, like a line ending in a hyphen.
+    Args:
+        pages (iterable of str): Text of each page, already passed through normalize_text.
+    Yields:
+        str: Cleaned text. Every piece after the first starts with a space.
+    """
+    pending = None
+    for text in pages:
+        if not text:
+            continue
+        if pending is None:
+            pending = text
+        elif pending.endswith('-'):
+            # hyphenated word running onto the next page
+            pending = pending[:-1] + text
+        else:
+            yield pending
+            pending = " " + text
+    if pending is not None:
+        yield pending
+
+def normalize_text(text):
+    """
+    Joins lines, removes line-break hyphenation and collapses whitespace.
+    Args:
+        text (str): Raw extracted text.
+    Returns:
+        text (str): Cleaned text.
+    """
     text = ' '.join(text.split())
+    text = text.replace('- ', '')
     #text = text.encode('utf-8').decode('utf-8')
-    return text
\ No newline at end of file
+    return text
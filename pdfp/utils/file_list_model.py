@@ -0,0 +1,255 @@
+import os
+import logging
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from pdfp.utils.metadata_prober import MetadataProber
+
+logger = logging.getLogger("pdfp")
+
+COLUMNS = ["File", "Pages", "Size", "Text", "Encrypted", "Words"]
+
+def format_size(size):
+    """Return a file size in bytes as a short human-readable string."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+class FileListModel(QAbstractTableModel):
+    """
+    Model of the files in FileTreeWidget: one row per file, with the path followed by document detail columns.
+    Paths are kept in a plain list with a path -> row dict, so looking up a path is O(1) and
+    adding or removing thousands of files is a single model change instead of one per file.
+    Details are read lazily: a detail cell the view asks for that is not known yet is requested from the prober,
+    so only rows that are drawn are ever opened.
+    Attributes:
+        paths (list of str): File paths in display order.
+        rows (dict): Row of each path in paths.
+        details (dict): DocumentInfo of each path probed so far.
+        prober (MetadataProber): Reads details in the background.
+    Signals:
+        rename_requested: Emits the row and the text entered when an item is edited. Connects to file_tree_widget,
+            which renames the file and calls replace_path.
+    """
+    rename_requested = Signal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self.paths = []
+        self.rows = {}
+        self.details = {}
+        self.prober = MetadataProber()
+        self.prober.probed.connect(self.set_details, Qt.QueuedConnection)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.paths):
+            return None
+        path = self.paths[index.row()]
+        column = index.column()
+        if column == 0:
+            if role in (Qt.DisplayRole, Qt.ToolTipRole):
+                return path
+            if role == Qt.EditRole:
+                # files are renamed without their directory or extension
+                return os.path.splitext(os.path.basename(path))[0]
+            return None
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter) if column in (1, 2, 5) else int(Qt.AlignCenter)
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        info = self.details.get(path)
+        if info is None:
+            self.prober.request(path)
+            return "…" if role == Qt.DisplayRole else None
+        if role == Qt.ToolTipRole:
+            return info.error or None
+        return self.detail_text(info, column)
+
+    def detail_text(self, info, column):
+        """Return the text shown for a detail column of a probed document."""
+        if info.error and column != 2:
+            return "?"
+        if column == 1:
+            return "" if info.pages is None else str(info.pages)
+        if column == 2:
+            return format_size(info.size)
+        if column == 3:
+            return "" if info.has_text is None else ("Yes" if info.has_text else "No")
+        if column == 4:
+            return "Yes" if info.encrypted else ""
+        if column == 5:
+            return "" if info.words is None else f"~{info.words:,}"
+        return None
+
+    def set_details(self, path, info):
+        """
+        Store the details of a probed document and redraw its row if it is still in the model.
+        Args:
+            path (str): Path of the document.
+            info (DocumentInfo): Its details.
+        """
+        row = self.rows.get(path)
+        if row is None:
+            return
+        self.details[path] = info
+        self.dataChanged.emit(self.index(row, 1), self.index(row, len(COLUMNS) - 1))
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() != 0:
+            return False
+        self.rename_requested.emit(index.row(), value)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsEnabled
+        if index.column() != 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable | Qt.ItemIsDragEnabled
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path in self.rows
+
+    def path(self, row):
+        """Return the path at row."""
+        return self.paths[row]
+
+    def row_of(self, path):
+        """Return the row of path, or None if it is not in the model."""
+        return self.rows.get(path)
+
+    def index_of(self, path):
+        """Return the QModelIndex of path, or None if it is not in the model."""
+        row = self.rows.get(path)
+        return None if row is None else self.index(row, 0)
+
+    def refresh_details(self, path):
+        """Forget the details of path, e.g. after an operation changed the file, so they are read again."""
+        if self.details.pop(path, None) is not None and (row := self.rows.get(path)) is not None:
+            self.dataChanged.emit(self.index(row, 1), self.index(row, len(COLUMNS) - 1))
+
+    def insert_paths(self, paths):
+        """
+        Append paths that are not already in the model, in one insertion.
+        Args:
+            paths (iterable of str): Paths to add.
+        Returns:
+            list of str: The paths added. Duplicates and paths already present are left out.
+        """
+        new_paths = []
+        seen = set()
+        for path in paths:
+            if path in self.rows or path in seen:
+                continue
+            seen.add(path)
+            new_paths.append(path)
+        if not new_paths:
+            return []
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_paths) - 1)
+        self.paths.extend(new_paths)
+        for row, path in enumerate(new_paths, first):
+            self.rows[path] = row
+        self.endInsertRows()
+        return new_paths
+
+    def remove_rows(self, rows):
+        """
+        Remove rows, one model change per contiguous run.
+        Args:
+            rows (iterable of int): Rows to remove, in any order.
+        Returns:
+            list of str: The paths removed, in display order.
+        """
+        rows = sorted(set(rows))
+        if not rows:
+            return []
+        removed = [self.paths[row] for row in rows]
+        # group into contiguous runs and remove from the bottom up so earlier rows keep their numbers
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.paths[first:last + 1]
+            self.endRemoveRows()
+        for path in removed:
+            del self.rows[path]
+            self.details.pop(path, None)
+        self.reindex(rows[0])
+        return removed
+
+    def remove_paths(self, paths):
+        """
+        Remove paths that are in the model.
+        Args:
+            paths (iterable of str): Paths to remove.
+        Returns:
+            list of str: The paths removed, in display order.
+        """
+        return self.remove_rows(row for path in paths if (row := self.rows.get(path)) is not None)
+
+    def clear(self):
+        """Remove every path."""
+        self.beginResetModel()
+        self.paths = []
+        self.rows = {}
+        self.details = {}
+        self.endResetModel()
+
+    def replace_path(self, row, path):
+        """
+        Replace the path at row, e.g. after the file was renamed.
+        Args:
+            row (int): Row to change.
+            path (str): New path.
+        """
+        del self.rows[self.paths[row]]
+        self.details.pop(self.paths[row], None)
+        self.paths[row] = path
+        self.rows[path] = row
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+
+    def move_row(self, row, new_row):
+        """
+        Move the path at row to new_row.
+        Args:
+            row (int): Row to move.
+            new_row (int): Row the path ends up in.
+        Returns:
+            bool: False if either row is out of range.
+        """
+        if not (0 <= row < len(self.paths) and 0 <= new_row < len(self.paths)) or row == new_row:
+            return False
+        # beginMoveRows takes the row the item is inserted before, counted before the move
+        destination = new_row + 1 if new_row > row else new_row
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+        self.paths.insert(new_row, self.paths.pop(row))
+        self.endMoveRows()
+        self.reindex(min(row, new_row))
+        return True
+
+    def reindex(self, first_row=0):
+        """Refresh the path -> row dict from first_row on."""
+        for row in range(first_row, len(self.paths)):
+            self.rows[self.paths[row]] = row
@@ -0,0 +1,2 @@
+# Extensions of the files pdfp imports and converts
+ALLOWED_EXTENSIONS = ['.pdf', '.epub', '.txt', '.cbz', '.mobi', '.xps', '.svg', '.fb2']
@@ -1,35 +1,43 @@
 import os
 import re
-from pdfp.settings_window import SettingsWindow
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.path_allocator import PathAllocator
 import logging
 
 logger = logging.getLogger("pdfp")
 
-def construct_filename(input_file, operation_ps_id, pgnum=""):
+# Characters Windows does not allow in filenames
+INVALID_FILENAME_CHARS = r'[<>:"/\\|?*]'
+
+def construct_filename(input_file, operation_ps_id, pgnum="", settings=None, allocate=True):
     """
     Construct a filename based on user settings and operation specifics.
     Args:
         input_file (str): The path of the input file.
         operation_ps_id (str): The operation-specific prefix or suffix identifier.
-        pgnum (str): Optional. Relevant page numbers for the operation.
+        pgnum (str): Optional. Relevant page numbers for the operation. For split, the label of the piece, which is always appended.
+        settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        allocate (bool): Optional. Reserve a non-overwriting name through PathAllocator if prevent_overwrite is on.
+            Pass False for names that are never written, e.g. chain steps that are not kept.
     Returns:
         str: The constructed output filename including the appropriate file extension based on the operation.
     Notes:
-        - Uses settings from SettingsWindow instance to determine filename modifications.
+        - Uses OperationSettings to determine filename modifications.
         - Supports default filename, lowercase conversion, first-word extraction, prefix/suffix addition, page number appending, and iterating filesnames to prevent overwriting.
+        - Iterated filenames come from PathAllocator, which lists the directory once and reserves the name for the running job, creating it as an empty placeholder until the job writes it.
         - Appends specific extensions based on the operation ('cc_ps', 'tts_ps', 'png_ps', default 'pdf').
     """
-    settings = SettingsWindow.instance()
+    settings = settings or OperationSettings.current()
     dirpath = os.path.dirname(input_file)
 
-    if settings.default_filename_checkbox.isChecked():
-        filename = settings.default_filename_input.currentText()
+    if settings.enable_default_filename:
+        filename = settings.default_filename
     else:
         filename = os.path.basename(input_file)
         filename, _ = os.path.splitext(filename)
 
-        lowercase_enabled = settings.lowercase_filename_checkbox.isChecked()
-        first_word_filename_enabled = settings.first_word_filename_checkbox.isChecked()
+        lowercase_enabled = settings.enable_lowercase_filename
+        first_word_filename_enabled = settings.enable_first_word_filename
 
         if lowercase_enabled:
             filename = filename.lower()
@@ -45,32 +53,37 @@ def construct_filename(input_file, operation_ps_id, pgnum=""):
                     break
             filename = alpha_string
 
-        if settings.filler_char_checkbox.isChecked():
+        if settings.enable_filler_char:
             char_rm = [' ', '-', '_']
-            new_char = settings.filler_char_input.text()
+            new_char = settings.filler_char
             pattern = r'[' + re.escape(''.join(char_rm)) + r']+'
             filename = re.sub(pattern, new_char, filename)
             filename = filename.strip(new_char)
 
-    ps_enabled = settings.prefix_suffix_checkbox.isChecked()
-    disable_ps_ext = settings.disable_non_pdf_ps_checkbox.isChecked() and (operation_ps_id in ("png_ps", "cc_ps", "tts_ps")) # and input_file.endswith('.pdf') #txt files with cc could match output_file name
+    ps_enabled = settings.enable_prefix_suffix
+    disable_ps_ext = settings.disable_non_pdf_ps and (operation_ps_id in ("png_ps", "cc_ps", "tts_ps")) # and input_file.endswith('.pdf') #txt files with cc could match output_file name
     if ps_enabled and not disable_ps_ext:
-        prefix_enabled = settings.prefix_radio.isChecked()
-        char_ps = settings.char_ps_input.text()
-        operation_ps = settings.settings.value(operation_ps_id, "", type=str)
+        prefix_enabled = settings.prefix_radio_checked
+        char_ps = settings.char_ps
+        operation_ps = getattr(settings, operation_ps_id, "")
         if operation_ps != "":
             if prefix_enabled:
                 filename = f"{operation_ps}{char_ps}{filename}"
             else:
                 filename = f"{filename}{char_ps}{operation_ps}"
                 
-    pgnum_enabled = settings.page_number_checkbox.isChecked()
-    if pgnum_enabled and ((operation_ps_id == "png_ps" and settings.png_pagenum_checkbox.isChecked()) or (operation_ps_id == "trim_ps" and settings.trim_pagenum_checkbox.isChecked())):
-        if settings.pgnum_prefix_checkbox.isChecked():
-            pgnum_prefix = settings.pgnum_prefix_input.text()
+    pgnum_enabled = settings.enable_pgnum
+    if operation_ps_id == "split_ps":
+        #pieces of a split always need their pages or bookmark title to tell them apart
+        filename = f"{filename} {re.sub(INVALID_FILENAME_CHARS, '_', pgnum)}"
+    elif pgnum_enabled and ((operation_ps_id == "png_ps" and settings.enable_png_pgnum) or (operation_ps_id == "trim_ps" and settings.enable_trim_pgnum)):
+        #page steps such as "1-end:2" contain characters Windows does not allow in filenames
+        pgnum = re.sub(INVALID_FILENAME_CHARS, '_', pgnum)
+        if settings.enable_pgnum_prefix:
+            pgnum_prefix = settings.pgnum_prefix
             pgnum = f"{pgnum_prefix}{pgnum}"
-        if settings.pgnum_wrap_checkbox.isChecked():
-            wrap = settings.pgnum_wrap_input.text()
+        if settings.enable_pgnum_wrap:
+            wrap = settings.pgnum_wrap
             try:
                 opener = wrap[0]
                 closer = wrap[1]
@@ -92,17 +105,11 @@ def construct_filename(input_file, operation_ps_id, pgnum=""):
     else:
         output_file = f"{output_file}.pdf"
 
-    if os.path.exists(output_file) and settings.prevent_overwrite_checkbox.isChecked():
-        base, extension = os.path.splitext(output_file)
-        counter = 1
-        new_output_file = output_file
-        if settings.filler_char_checkbox.isChecked():
-            filler = settings.filler_char_input.text()
+    if settings.prevent_overwrite and allocate:
+        if settings.enable_filler_char:
+            filler = settings.filler_char
         else:
             filler = "_"
-        while os.path.exists(new_output_file):
-            new_output_file = f"{base}{filler}{counter}{extension}"
-            counter += 1
-        output_file = new_output_file
+        output_file = PathAllocator.instance().allocate(output_file, filler)
 
     return output_file
\ No newline at end of file
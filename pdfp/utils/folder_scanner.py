@@ -0,0 +1,133 @@
+import os
+import time
+import fnmatch
+import logging
+import threading
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+logger = logging.getLogger("pdfp")
+
+# Paths found before a batch is sent to the file tree
+IMPORT_BATCH_SIZE = 500
+# Seconds after which a partial batch is sent anyway, so slow network shares still fill in progressively
+IMPORT_BATCH_INTERVAL = 0.25
+
+def parse_patterns(text):
+    """
+    Split a pattern setting into glob patterns.
+    Args:
+        text (str): Patterns separated by commas or semicolons, e.g. "*.pdf; scans*".
+    Returns:
+        list of str: The patterns, lowercased for case-insensitive matching.
+    """
+    return [pattern.strip().lower() for pattern in text.replace(";", ",").split(",") if pattern.strip()]
+
+def matches(name, patterns):
+    """Whether a file or folder name matches any of the glob patterns."""
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+def scan_folder(folder, extensions, include=(), exclude=(), max_depth=None, cancelled=None):
+    """
+    Walk a folder with os.scandir, yielding the files to import.
+    Entries are listed in name order. Symlinked folders are not followed, so links cannot loop.
+    Folders that cannot be read are skipped.
+    Args:
+        folder (str): Folder to import.
+        extensions (tuple of str): Lowercase extensions of the files to yield, e.g. (".pdf", ".txt").
+        include (list of str): Optional. Glob patterns a file name must match. Empty matches every file.
+        exclude (list of str): Optional. Glob patterns of file and folder names to skip. Excluded folders are not entered.
+        max_depth (int): Optional. Levels of subfolders to enter. 0 imports only the folder itself. None has no limit.
+        cancelled (threading.Event): Optional. Stops the walk when set.
+    Yields:
+        str: Path of each file found.
+    """
+    stack = [(folder, 0)]
+    while stack:
+        if cancelled is not None and cancelled.is_set():
+            return
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name.lower())
+        except OSError as e:
+            logger.debug(f"Skipping unreadable folder {directory}: {e}")
+            continue
+        subfolders = []
+        for entry in entries:
+            if exclude and matches(entry.name, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if max_depth is None or depth < max_depth:
+                        subfolders.append((entry.path, depth + 1))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if not entry.name.lower().endswith(extensions):
+                continue
+            if include and not matches(entry.name, include):
+                continue
+            yield entry.path
+        # reversed so subfolders are walked in name order
+        stack.extend(reversed(subfolders))
+
+class FolderImportSignals(QObject):
+    """
+    Signals for a FolderImport. QRunnable is not a QObject, so it cannot define signals itself.
+    Signals:
+        batch_found: Emits a list of file paths. Connects to file_tree_widget.
+        finished: Emits the FolderImport once the walk is done or cancelled. Connects to file_tree_widget.
+    """
+    batch_found = Signal(list)
+    finished = Signal(object)
+
+class FolderImport(QRunnable):
+    """
+    Walks a folder on a pool thread and sends the files found to the GUI thread in batches.
+    Attributes:
+        folder (str): Folder being imported.
+        found (int): Files found so far.
+        added (int): Files added to the tree. Updated on the GUI thread.
+        elapsed (float): Seconds the walk took. Set when finished.
+        cancelled (threading.Event): Set to stop the walk early.
+    """
+    def __init__(self, folder, extensions, include=(), exclude=(), max_depth=None):
+        super().__init__()
+        # file_tree_widget holds the reference until the finished signal arrives
+        self.setAutoDelete(False)
+        self.folder = folder
+        self.extensions = tuple(extensions)
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.found = 0
+        self.added = 0
+        self.elapsed = 0.0
+        self.cancelled = threading.Event()
+        self.signals = FolderImportSignals()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        start = time.perf_counter()
+        batch = []
+        last_sent = start
+        try:
+            for path in scan_folder(self.folder, self.extensions, self.include, self.exclude, self.max_depth, self.cancelled):
+                batch.append(path)
+                self.found += 1
+                now = time.perf_counter()
+                if len(batch) >= IMPORT_BATCH_SIZE or now - last_sent >= IMPORT_BATCH_INTERVAL:
+                    self.signals.batch_found.emit(batch)
+                    batch = []
+                    last_sent = now
+            if batch:
+                self.signals.batch_found.emit(batch)
+        except Exception as e:
+            logger.error(f"Error importing {self.folder}: {e}")
+        self.elapsed = time.perf_counter() - start
+        self.signals.finished.emit(self)
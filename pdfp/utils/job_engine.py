@@ -0,0 +1,244 @@
+import time
+import logging
+import traceback
+from collections import deque
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal, Slot
+from PySide6.QtWidgets import QApplication
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.path_allocator import PathAllocator
+from pdfp.utils.job_result import JobResult
+
+logger = logging.getLogger("pdfp")
+
+class Batch:
+    """
+    A group of jobs submitted together by a single button press.
+    Attributes:
+        name (str): Name of the operation, shown in the progress widget.
+        total (int): Number of jobs in the batch.
+        concurrency (int): Maximum jobs of this batch to run at once, from the settings snapshot of the batch.
+        asynchronous (bool): Whether the jobs are AsyncJobs started on the GUI thread rather than Jobs run on pool threads.
+        results (list of JobResult): Results of the jobs that have finished.
+        start_time (float): perf_counter timestamp of submission.
+    """
+    def __init__(self, name, total, concurrency=0, asynchronous=False):
+        self.name = name
+        self.total = total
+        self.concurrency = concurrency
+        self.asynchronous = asynchronous
+        self.results = []
+        self.start_time = time.perf_counter()
+
+    @property
+    def done(self):
+        return len(self.results)
+
+    @property
+    def worker_name(self):
+        return f"Queue_{self.name} ({self.total} files)"
+
+    @property
+    def pages(self):
+        """Total pages processed by the successful jobs of the batch so far."""
+        return sum(result.pages for result in self.results if result.ok)
+
+    @property
+    def pages_per_second(self):
+        """Aggregate throughput of the batch since submission."""
+        elapsed = time.perf_counter() - self.start_time
+        return self.pages / elapsed if elapsed > 0 else 0.0
+
+class JobSignals(QObject):
+    """Signals for a Job. QRunnable is not a QObject, so it cannot define signals itself."""
+    finished = Signal(object, object)
+
+class Job(QRunnable):
+    """
+    Runs one operation on one file on a QThreadPool thread.
+    Exceptions are caught and turned into failed JobResults so a single bad file cannot stall a batch.
+    Output paths the operation allocates stay reserved until it returns.
+    """
+    def __init__(self, batch, function, file_path, args, kwargs):
+        super().__init__()
+        # the engine holds the reference until the finished signal arrives
+        self.setAutoDelete(False)
+        self.batch = batch
+        self.function = function
+        self.file_path = file_path
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        allocator = PathAllocator.instance()
+        try:
+            with allocator.owner(self):
+                result = self.function(self.file_path, *self.args, **self.kwargs)
+            if result is None:
+                result = JobResult(self.file_path, "skipped")
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            logger.error(f"Error processing {self.file_path}: {e}")
+            result = JobResult.failed(self.file_path, str(e))
+        allocator.release(self)
+        result.elapsed = time.perf_counter() - start
+        self.signals.finished.emit(self, result)
+
+class AsyncJob:
+    """
+    Runs one operation on one file without occupying a thread, e.g. an operation that drives a QProcess.
+    The operation is called on the GUI thread with a finished callback, starts its work and returns at once.
+    It calls finished(JobResult) when the work is done, normally from a signal handler.
+    Output paths the operation allocates while starting stay reserved until finished is called.
+    """
+    def __init__(self, batch, function, file_path, args, kwargs):
+        self.batch = batch
+        self.function = function
+        self.file_path = file_path
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self.start_time = 0.0
+        self.done = False
+
+    def run(self):
+        self.start_time = time.perf_counter()
+        try:
+            with PathAllocator.instance().owner(self):
+                self.function(self.file_path, *self.args, finished=self.finish, **self.kwargs)
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            logger.error(f"Error processing {self.file_path}: {e}")
+            self.finish(JobResult.failed(self.file_path, str(e)))
+
+    def finish(self, result):
+        """
+        Report the result of the job. Only the first call has an effect.
+        Args:
+            result (JobResult): The result of the operation. None is reported as skipped.
+        """
+        if self.done:
+            return
+        self.done = True
+        PathAllocator.instance().release(self)
+        if result is None:
+            result = JobResult(self.file_path, "skipped")
+        result.elapsed = time.perf_counter() - self.start_time
+        self.signals.finished.emit(self, result)
+
+class JobEngine(QObject):
+    """
+    Queues operations and runs them on a QThreadPool so the GUI thread only renders.
+    Jobs are dispatched in submission order, with at most the concurrency of the batch at the head of the queue running at once.
+    Asynchronous batches start AsyncJobs on the GUI thread instead, and count against the same limit while their work runs.
+    Finished jobs are reported back on the GUI thread through signals.
+    Signals:
+        job_finished: Emits the JobResult of each finished job. Connects to file_tree_widget.
+        batch_progress: Emits a Batch whenever one of its jobs finishes. Connects to progress_widget.
+        batch_finished: Emits a Batch once all of its jobs have finished. Connects to progress_widget.
+        queue_empty: Emitted when no jobs are queued or running. Connects to button_widget.
+    """
+    _instance = None
+    def __new__(cls, *args, **kwargs):
+        """
+        Override __new__ method to ensure only one instance of JobEngine exists.
+        If no existing instance, create one and return it. If an instance exists, return that instance.
+        """
+        if not cls._instance:
+            cls._instance = super(JobEngine, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+    @classmethod
+    def instance(cls):
+        """
+        Returns the single instance of JobEngine.
+        If no instance exists, creates one and returns it.
+        """
+        if cls._instance is None:
+            cls._instance = JobEngine()
+        return cls._instance
+
+    job_finished = Signal(object)
+    batch_progress = Signal(object)
+    batch_finished = Signal(object)
+    queue_empty = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.queue = deque()
+        self.active = set()
+
+    def is_busy(self):
+        """Whether any jobs are queued or running."""
+        return bool(self.queue or self.active)
+
+    def submit_batch(self, name, function, file_paths, *args, concurrency=0, asynchronous=False, **kwargs):
+        """
+        Queue a batch of jobs that call function(file_path, *args, **kwargs) for each file.
+        Args:
+            name (str): Name of the operation, shown in the progress widget.
+            function (callable): The operation to run. Should return a JobResult.
+            file_paths (list of str): Files to run the operation on.
+            concurrency (int): Optional. Maximum jobs of this batch to run at once.
+                0 uses max_jobs of the settings keyword argument, or of the saved settings if none is passed.
+            asynchronous (bool): Optional. Call function on the GUI thread with a finished keyword argument instead of on a pool thread.
+                function must return immediately and call finished(JobResult) later.
+        Returns:
+            Batch: The submitted batch.
+        """
+        if not concurrency:
+            concurrency = (kwargs.get("settings") or OperationSettings.current()).max_jobs
+        batch = Batch(name, len(file_paths), max(1, concurrency), asynchronous)
+        job_class = AsyncJob if asynchronous else Job
+        for file_path in file_paths:
+            self.queue.append(job_class(batch, function, file_path, args, kwargs))
+        logger.debug(f"Queued {batch.total} {name} jobs. Queue length: {len(self.queue)}")
+        self.batch_progress.emit(batch)
+        self.dispatch()
+        return batch
+
+    def dispatch(self):
+        """Start queued jobs until the concurrency limit is reached."""
+        while self.queue:
+            job = self.queue[0]
+            limit = job.batch.concurrency
+            if len(self.active) >= limit:
+                break
+            self.queue.popleft()
+            # queued so that an AsyncJob finishing inside run() does not re-enter dispatch
+            job.signals.finished.connect(self.on_job_finished, Qt.QueuedConnection)
+            self.active.add(job)
+            if job.batch.asynchronous:
+                job.run()
+                continue
+            # follows the limit down as well as up, so lowering max jobs takes effect for the next batch
+            if self.pool.maxThreadCount() != limit:
+                self.pool.setMaxThreadCount(limit)
+            self.pool.start(job)
+
+    @Slot(object, object)
+    def on_job_finished(self, job, result):
+        """
+        Record a finished job on the GUI thread and start the next queued job.
+        Args:
+            job (Job or AsyncJob): The job that finished.
+            result (JobResult): The result of the job.
+        """
+        self.active.discard(job)
+        batch = job.batch
+        batch.results.append(result)
+        if result.clipboard_text is not None:
+            QApplication.clipboard().setText(result.clipboard_text)
+        self.job_finished.emit(result)
+        self.batch_progress.emit(batch)
+        if batch.done == batch.total:
+            failed = sum(1 for r in batch.results if r.status == "failed")
+            elapsed = time.perf_counter() - batch.start_time
+            logger.debug(f"{batch.name} batch finished in {elapsed:.2f}s: {batch.total - failed}/{batch.total} succeeded")
+            if batch.pages:
+                logger.info(f"{batch.name}: {batch.pages} pages in {elapsed:.1f}s ({batch.pages / elapsed:.2f} pages/s)")
+            self.batch_finished.emit(batch)
+        self.dispatch()
+        if not self.is_busy():
+            self.queue_empty.emit()
@@ -0,0 +1,54 @@
+class JobResult:
+    """
+    Structured outcome of running one operation on one file.
+    Attributes:
+        input_file (str): Path of the file the operation ran on.
+        status (str): "success", "failed", or "skipped".
+        output_files (list of str): Paths of the files created by the operation.
+        message (str): Error or informational message.
+        clipboard_text (str): Text to place on the clipboard from the GUI thread, or None.
+        pages (int): Number of pages processed, if relevant to the operation.
+        elapsed (float): Seconds the job took. Set by the job engine.
+    """
+    def __init__(self, input_file, status="success", output_files=None, message="", clipboard_text=None, pages=0):
+        self.input_file = input_file
+        self.status = status
+        self.output_files = output_files or []
+        self.message = message
+        self.clipboard_text = clipboard_text
+        self.pages = pages
+        self.elapsed = 0.0
+
+    @classmethod
+    def success(cls, input_file, output_files=None, **kwargs):
+        """Return a successful result with the given output files."""
+        return cls(input_file, "success", output_files, **kwargs)
+
+    @classmethod
+    def failed(cls, input_file, message):
+        """Return a failed result with the reason for failure."""
+        return cls(input_file, "failed", message=message)
+
+    @property
+    def ok(self):
+        """Whether the operation succeeded."""
+        return self.status == "success"
+
+    @property
+    def output_file(self):
+        """The first output file, or None if the operation created nothing."""
+        return self.output_files[0] if self.output_files else None
+
+    def to_dict(self):
+        """Return the result as a JSON-serializable dict. Clipboard text is omitted."""
+        return {
+            "input_file": self.input_file,
+            "status": self.status,
+            "output_files": self.output_files,
+            "message": self.message,
+            "pages": self.pages,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+    def __repr__(self):
+        return f"JobResult({self.input_file!r}, {self.status!r}, {self.output_files!r})"
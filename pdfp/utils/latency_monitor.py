@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+from PySide6.QtCore import Qt, QObject, QTimer
+from PySide6.QtWidgets import QApplication
+from pdfp.utils.job_engine import JobEngine
+
+logger = logging.getLogger("pdfp")
+
+# Milliseconds between watchdog ticks on the GUI thread
+TICK_MS = 50
+# Stall threshold when none is configured
+DEFAULT_THRESHOLD_MS = 200
+# Frames of the blocking stack included in a stall report
+STACK_DEPTH = 12
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class StallStats:
+    """
+    Stalls attributed to one operation.
+    Attributes:
+        count (int): Number of stalls.
+        total (float): Sum of the stall lengths in seconds.
+        longest (float): Longest stall in seconds.
+    """
+    __slots__ = ("count", "total", "longest")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def add(self, stall):
+        self.count += 1
+        self.total += stall
+        self.longest = max(self.longest, stall)
+
+class LatencyMonitor(QObject):
+    """
+    Optional watchdog that measures how late ticks of the Qt event loop arrive.
+    A timer on the GUI thread ticks every TICK_MS. While a tick is overdue, a sampler thread records the GUI thread's
+    Python stack. When a late tick finally arrives and it was later than the threshold, the stall is logged with the
+    operation found in the most common sampled stack, and added to a per-operation summary logged when the app quits.
+    Attributes:
+        threshold (float): Stall length in seconds that is reported.
+        stats (dict): StallStats by operation.
+    """
+    _instance = None
+    def __new__(cls, *args, **kwargs):
+        """
+        Override __new__ method to ensure only one instance of LatencyMonitor exists.
+        If no existing instance, create one and return it. If an instance exists, return that instance.
+        """
+        if not cls._instance:
+            cls._instance = super(LatencyMonitor, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+    @classmethod
+    def instance(cls):
+        """
+        Returns the single instance of LatencyMonitor.
+        If no instance exists, creates one and returns it.
+        """
+        if cls._instance is None:
+            cls._instance = LatencyMonitor()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.threshold = DEFAULT_THRESHOLD_MS / 1000
+        self.stats = {}
+        self.ticks = 0
+        self.last_tick = 0.0
+        self.samples = []
+        self.samples_lock = threading.Lock()
+        self.gui_thread_id = threading.get_ident()
+        self.sampler = None
+        self.stop_sampler = threading.Event()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(TICK_MS)
+        self.timer.timeout.connect(self.tick)
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    @property
+    def running(self):
+        return self.timer.isActive()
+
+    def configure(self, enabled, threshold_ms=DEFAULT_THRESHOLD_MS):
+        """
+        Start or stop monitoring.
+        Args:
+            enabled (bool): Whether to monitor the event loop.
+            threshold_ms (int): Optional. Stall length in milliseconds that is reported.
+        """
+        self.threshold = max(TICK_MS, threshold_ms) / 1000
+        if enabled and not self.running:
+            self.start()
+        elif not enabled and self.running:
+            self.stop()
+
+    def start(self):
+        """Start the watchdog timer and the stack sampler. Call on the GUI thread."""
+        self.gui_thread_id = threading.get_ident()
+        self.last_tick = time.perf_counter()
+        self.stop_sampler.clear()
+        self.sampler = threading.Thread(target=self.sample_loop, name="pdfp-latency", daemon=True)
+        self.sampler.start()
+        self.timer.start()
+        logger.debug(f"Latency monitor started. Threshold: {self.threshold * 1000:.0f} ms")
+
+    def stop(self):
+        """Stop the watchdog timer and the stack sampler."""
+        self.timer.stop()
+        self.stop_sampler.set()
+        if self.sampler:
+            self.sampler.join()
+            self.sampler = None
+        logger.debug("Latency monitor stopped.")
+
+    def tick(self):
+        """Measure how late this tick arrived and report it if it exceeds the threshold."""
+        now = time.perf_counter()
+        stall = now - self.last_tick - TICK_MS / 1000
+        self.last_tick = now
+        self.ticks += 1
+        with self.samples_lock:
+            samples = self.samples
+            self.samples = []
+        if stall >= self.threshold:
+            self.report(stall, samples)
+
+    def sample_loop(self):
+        """Sample the GUI thread's stack while a tick is overdue. Runs on the sampler thread."""
+        interval = min(TICK_MS, self.threshold * 1000 / 4) / 1000
+        while not self.stop_sampler.wait(interval):
+            if time.perf_counter() - self.last_tick < TICK_MS / 1000 + interval:
+                continue
+            frame = sys._current_frames().get(self.gui_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name))
+                frame = frame.f_back
+            with self.samples_lock:
+                self.samples.append(tuple(stack))
+
+    def report(self, stall, samples):
+        """
+        Log a stall and add it to the summary.
+        Args:
+            stall (float): Seconds the tick was late.
+            samples (list of tuple): GUI thread stacks sampled during the stall, innermost frame first.
+        """
+        stack = Counter(samples).most_common(1)[0][0] if samples else ()
+        operation = self.attribute(stack)
+        self.stats.setdefault(operation, StallStats()).add(stall)
+        running = sorted({job.batch.name for job in JobEngine.instance().active})
+        frames = [f"{os.path.relpath(filename, PACKAGE_DIR) if filename.startswith(PACKAGE_DIR) else filename}:{lineno} in {name}" for filename, lineno, name in stack[:STACK_DEPTH]]
+        details = {
+            "stall_ms": round(stall * 1000),
+            "operation": operation,
+            "running_jobs": running,
+            "samples": len(samples),
+            "stack": frames,
+        }
+        logger.warning(f"GUI blocked for {stall * 1000:.0f} ms in {operation}", extra={"details": details})
+        if frames:
+            logger.debug("Blocking stack (innermost first):\n" + "\n".join(frames))
+
+    def attribute(self, stack):
+        """
+        Name the operation responsible for a stack.
+        Args:
+            stack (tuple): Frames as (filename, lineno, function), innermost first.
+        Returns:
+            str: The innermost pdfp operation module, otherwise the innermost pdfp module and function,
+                otherwise "Qt" for time spent in Qt itself.
+        """
+        operations_dir = os.path.join(PACKAGE_DIR, "operations")
+        for filename, _, name in stack:
+            if filename.startswith(operations_dir):
+                return os.path.splitext(os.path.basename(filename))[0]
+        for filename, _, name in stack:
+            #main.py only holds app.exec(), so time spent there is Qt's own
+            if filename.startswith(PACKAGE_DIR) and os.path.basename(filename) not in ("latency_monitor.py", "main.py"):
+                return f"{os.path.splitext(os.path.basename(filename))[0]}.{name}"
+        return "Qt"
+
+    def summary(self):
+        """Return the stall summary as a JSON-serializable dict, longest total first."""
+        return {
+            operation: {"stalls": stats.count, "total_ms": round(stats.total * 1000), "longest_ms": round(stats.longest * 1000)}
+            for operation, stats in sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True)
+        }
+
+    def shutdown(self):
+        """Stop monitoring and log the per-operation summary."""
+        if not self.running:
+            return
+        self.stop()
+        summary = self.summary()
+        if not summary:
+            logger.info(f"GUI latency summary: no stalls over {self.threshold * 1000:.0f} ms in {self.ticks} ticks.")
+            return
+        lines = [f"{operation}: {entry['stalls']} stalls, {entry['total_ms']} ms total, longest {entry['longest_ms']} ms" for operation, entry in summary.items()]
+        logger.info("GUI latency summary:\n" + "\n".join(lines), extra={"details": {"ticks": self.ticks, "operations": summary}})
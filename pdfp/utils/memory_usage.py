@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+import logging
+
+logger = logging.getLogger("pdfp")
+
+# Seconds between samples of the resident set size while a PeakMemory is active
+SAMPLE_INTERVAL = 0.05
+
+def current_rss():
+    """
+    Return the resident set size of this process in bytes, or None where it cannot be read without extra dependencies.
+    Read from /proc on Linux and GetProcessMemoryInfo on Windows.
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        if sys.platform == "win32":
+            return windows_memory_counters().WorkingSetSize
+    except (OSError, ValueError, AttributeError) as e:
+        logger.debug(f"Cannot read memory usage: {e}")
+    return None
+
+def peak_rss():
+    """Return the highest resident set size of this process so far in bytes, or None if it cannot be read."""
+    try:
+        if sys.platform == "win32":
+            return windows_memory_counters().PeakWorkingSetSize
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        #kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError, AttributeError) as e:
+        logger.debug(f"Cannot read peak memory usage: {e}")
+    return None
+
+def windows_memory_counters():
+    """Return the PROCESS_MEMORY_COUNTERS of this process on Windows."""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.WinDLL("kernel32")
+    psapi = ctypes.WinDLL("psapi")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        raise OSError(ctypes.get_last_error(), "GetProcessMemoryInfo failed")
+    return counters
+
+class PeakMemory:
+    """
+    Context manager measuring the highest resident set size of this process while it is active.
+    A daemon thread samples the resident set size every SAMPLE_INTERVAL, and sample() can be called at known high points.
+    Where the current size cannot be read, the peak falls back to the process's peak so far when the block exits.
+    The whole process is measured, so jobs running at the same time are included.
+    Attributes:
+        start (int): Resident set size in bytes when the block was entered, or None.
+        peak (int): Highest resident set size in bytes seen, or None.
+    """
+    def __init__(self):
+        self.start = None
+        self.peak = None
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def __enter__(self):
+        self.start = current_rss()
+        if self.start is not None:
+            self.peak = self.start
+            self.thread = threading.Thread(target=self.run, name="pdfp-memory", daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.sample()
+        else:
+            self.peak = peak_rss()
+        return False
+
+    def run(self):
+        while not self.stopped.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def sample(self):
+        """Record the current resident set size if it is the highest so far."""
+        rss = current_rss()
+        if rss is None:
+            return
+        with self.lock:
+            if self.peak is None or rss > self.peak:
+                self.peak = rss
+
+    def describe(self):
+        """Return the peak as text for a log message, e.g. "412 MB (+380 MB)"."""
+        if self.peak is None:
+            return "unknown"
+        if self.start is None:
+            return f"{self.peak / 1048576:.0f} MB (process peak)"
+        return f"{self.peak / 1048576:.0f} MB (+{(self.peak - self.start) / 1048576:.0f} MB)"
@@ -0,0 +1,146 @@
+import os
+import logging
+import threading
+from collections import deque
+import pymupdf
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger("pdfp")
+
+# Documents opened at once by the prober
+PROBE_THREADS = 2
+# Requests kept waiting. Older requests are dropped; their rows ask again if they are still visible
+PROBE_QUEUE_LIMIT = 256
+# Pages read to detect a text layer and estimate the word count
+SAMPLE_PAGES = 3
+# Average characters per word, including the space, for estimating TXT word counts from their size
+CHARS_PER_WORD = 6
+
+class DocumentInfo:
+    """
+    Details of a document shown in the file tree.
+    Attributes:
+        size (int): File size in bytes.
+        pages (int): Page count, or None if unknown.
+        has_text (bool): Whether the document has a text layer, or None if unknown.
+        encrypted (bool): Whether the document is encrypted.
+        words (int): Estimated word count, or None if unknown.
+        error (str): Why the document could not be read, or "".
+    """
+    __slots__ = ("size", "pages", "has_text", "encrypted", "words", "error")
+
+    def __init__(self, size=0, pages=None, has_text=None, encrypted=False, words=None, error=""):
+        self.size = size
+        self.pages = pages
+        self.has_text = has_text
+        self.encrypted = encrypted
+        self.words = words
+        self.error = error
+
+def probe_document(path, size):
+    """
+    Read the details of a document, opening it once and reading at most SAMPLE_PAGES pages.
+    Args:
+        path (str): Path of the document.
+        size (int): File size in bytes.
+    Returns:
+        DocumentInfo: The details read.
+    """
+    if path.lower().endswith(".txt"):
+        return DocumentInfo(size, has_text=True, words=size // CHARS_PER_WORD)
+    with pymupdf.open(path) as doc:
+        info = DocumentInfo(size, pages=doc.page_count, encrypted=bool(doc.is_encrypted or doc.needs_pass))
+        if doc.needs_pass or not doc.page_count:
+            return info
+        # evenly spaced pages, so a cover or a blank first page does not decide the result
+        step = max(1, doc.page_count // SAMPLE_PAGES)
+        sampled = range(0, doc.page_count, step)[:SAMPLE_PAGES]
+        words = [len(doc[pg].get_text().split()) for pg in sampled]
+        info.has_text = any(words)
+        info.words = round(sum(words) / len(words) * doc.page_count)
+    return info
+
+class ProbeRunner(QRunnable):
+    """Probes queued documents on a pool thread until the prober's queue is empty."""
+    def __init__(self, prober):
+        super().__init__()
+        self.prober = prober
+
+    def run(self):
+        while (path := self.prober.next_request()) is not None:
+            self.prober.probe(path)
+
+class MetadataProber(QObject):
+    """
+    Fills in document details in the background for the rows the file tree shows.
+    Requests are served newest first, so the rows currently on screen are probed before rows scrolled past.
+    Results are cached by path, size and modification time, so re-imported files are not opened again.
+    Signals:
+        probed: Emits a path and its DocumentInfo. Connects to file_list_model.
+    """
+    probed = Signal(str, object)
+
+    def __init__(self, threads=PROBE_THREADS):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(threads)
+        self.threads = threads
+        self.lock = threading.Lock()
+        self.requests = deque(maxlen=PROBE_QUEUE_LIMIT)
+        self.requested = set()
+        self.runners = 0
+        # (path, size, mtime_ns) -> DocumentInfo
+        self.cache = {}
+
+    def request(self, path):
+        """
+        Queue a document to be probed. Safe to call repeatedly; queued paths are not queued twice.
+        Args:
+            path (str): Path of the document.
+        """
+        with self.lock:
+            if path in self.requested:
+                return
+            if len(self.requests) == self.requests.maxlen:
+                self.requested.discard(self.requests[0])
+            self.requests.append(path)
+            self.requested.add(path)
+            if self.runners >= self.threads:
+                return
+            self.runners += 1
+        self.pool.start(ProbeRunner(self))
+
+    def next_request(self):
+        """Return the newest queued path, or None once the queue is empty. Called by ProbeRunner."""
+        with self.lock:
+            if not self.requests:
+                self.runners -= 1
+                return None
+            # stays in requested while it is probed, so repaints do not queue it again
+            return self.requests.pop()
+
+    def probe(self, path):
+        """Probe one document, or take it from the cache, and emit the result. Runs on a pool thread."""
+        try:
+            stat = os.stat(path)
+            key = (path, stat.st_size, stat.st_mtime_ns)
+            info = self.cache.get(key)
+            if info is None:
+                try:
+                    info = probe_document(path, stat.st_size)
+                except Exception as e:
+                    logger.debug(f"Could not read details of {path}: {e}")
+                    info = DocumentInfo(stat.st_size, error=str(e))
+                self.cache[key] = info
+        except OSError as e:
+            info = DocumentInfo(error=str(e))
+        with self.lock:
+            self.requested.discard(path)
+        self.probed.emit(path, info)
+
+    def shutdown(self):
+        """Drop queued requests and wait for documents being probed."""
+        with self.lock:
+            self.requests.clear()
+            self.requested.clear()
+        self.pool.waitForDone()
@@ -0,0 +1,68 @@
+from PySide6.QtCore import QObject
+from pdfp.operations.ocr import ocr
+import logging
+import threading
+from ocrmypdf import hookimpl
+
+logger = logging.getLogger("pdfp")
+
+class WorkerName(threading.local):
+    """Progress bar worker name, kept per thread so concurrent OCR jobs report to their own bars."""
+    value = ""
+
+class MyProgressBar(QObject):
+    """
+    ocrmypdf progress bar that reports through the ocr converter's signals.
+    ocrmypdf runs on job engine threads, so widgets are never touched directly.
+    """
+    worker = WorkerName()
+    def __init__(
+        self,
+        *,
+        total: int | float | None,
+        desc: str | None,
+        unit: str | None,
+        disable: bool = False,
+        **kwargs,
+    ):
+        super().__init__()
+        logger.debug(f"OCR job total units: {total}")
+        logger.debug(f"OCR job description: {desc}")
+        self.total = total
+        self.desc = desc
+        self.wn = self.worker.value
+
+    def __enter__(self):
+        """Enter a progress bar context."""
+        if self.wn == "":
+            return self
+        ocr.revise_worker_label.emit(self.wn, self.desc)
+        logger.debug(f"Revising worker label: {self.desc}")
+        self.progress = 0
+        self.total_parts = self.total
+        self.progress_percentage = 0
+        return self
+
+    def __exit__(self, *args):
+        """Exit a progress bar context."""
+        if self.desc == "Linearizing":
+            ocr.worker_done.emit(self.wn)
+        return False
+
+    def update(self, n=1, *, completed=None):
+        """Update the progress bar by an increment."""
+        if self.wn == "":
+            return
+        self.progress += n
+        self.progress_percentage = (self.progress / self.total_parts) * 100
+        ocr.worker_progress.emit(self.wn, self.progress_percentage)
+        # logger.debug(f"Worker progress: {self.wn}, {self.progress_percentage}") #very chatty
+
+@hookimpl
+def get_progressbar_class():
+    return MyProgressBar
+
+@hookimpl
+def validate(pdfinfo, options):
+    MyProgressBar.worker.value = f"OCR_{options.input_file}"
+    logger.debug(f"Validate worker name: {MyProgressBar.worker.value}")
\ No newline at end of file
@@ -0,0 +1,20 @@
+from pdfp.operations.file2pdf import file2pdf
+from pdfp.operations.png import pdf2png
+from pdfp.operations.ocr import ocr
+from pdfp.operations.crop import crop
+from pdfp.operations.trim import trim
+from pdfp.operations.split import split
+from pdfp.operations.clean_copy import clean_copy
+from pdfp.operations.tts import tts
+
+# Operation names used on the command line and in prefix/suffix settings, mapped to their convert functions.
+operation_map = {
+    "file2pdf": file2pdf.convert,
+    "pdf2png": pdf2png.convert,
+    "ocr": ocr.convert,
+    "crop": crop.convert,
+    "trim": trim.convert,
+    "split": split.convert,
+    "cc": clean_copy.convert,
+    "tts": tts.convert,
+}
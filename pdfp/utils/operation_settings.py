@@ -0,0 +1,190 @@
+from PySide6.QtCore import QSettings
+import hashlib
+import logging
+
+logger = logging.getLogger("pdfp")
+
+# Keys and defaults of every saved setting, as written by SettingsWindow.save_settings.
+# Keep in sync with the defaults in SettingsWindow.load_settings.
+DEFAULT_SETTINGS = {
+    #general
+    "enable_add_file": True,
+    "enable_remember_window": False,
+    "show_file_details": True,
+    "show_preview": True,
+    "thumbnail_memory_mb": 64,
+    "max_jobs": 2,
+    "import_depth": -1,
+    "import_include": "",
+    "import_exclude": "",
+    #result cache
+    "enable_result_cache": True,
+    "result_cache_location": "",
+    "result_cache_max_mb": 2048,
+    "result_cache_hardlink": False,
+    #file2pdf
+    "f2p_cover": True,
+    "f2p_batch_pages": 200,
+    #png
+    "png_cover": False,
+    "png_dpi": 72,
+    "png_colorspace": "RGB",
+    "png_alpha": False,
+    "png_processes": 0,
+    #ocr
+    "ocr_deskew": True,
+    "ocr_pdf_checked": False,
+    "ocr_optimize_level": 0,
+    "native_ocr": True,
+    "ocr_parallel_docs": 0,
+    "ocr_jobs_per_doc": 0,
+    #briss/crop
+    "auto_crop_checked": False,
+    "briss_location": "",
+    #clean copy
+    "cc_file_radio_checked": False,
+    "enable_cc_split_txt": False,
+    #tts
+    "enable_split_txt": True,
+    "wordcount_split": "100000",
+    "tts_parallel_requests": 4,
+    #advanced: set only in preset INI files. Address of a stand-in TTS server, see HTTPBackend
+    "tts_server": "",
+    "enable_balabolka": False,
+    "balabolka_location": "",
+    "enable_wine_prefix": False,
+    "wine_prefix_location": "",
+    #chain
+    "chain_keep_intermediates": False,
+    #filename
+    "enable_default_filename": False,
+    "default_filename": "",
+    "enable_filler_char": False,
+    "filler_char": "",
+    "enable_first_word_filename": False,
+    "enable_lowercase_filename": False,
+    "prevent_overwrite": True,
+    "enable_pgnum": False,
+    "enable_png_pgnum": False,
+    "enable_trim_pgnum": False,
+    "enable_pgnum_wrap": False,
+    "pgnum_wrap": "()",
+    "enable_pgnum_prefix": False,
+    "pgnum_prefix": "Pages ",
+    "enable_prefix_suffix": True,
+    "prefix_radio_checked": False,
+    "f2pdf_ps": "f2p",
+    "png_ps": "png",
+    "ocr_ps": "ocr",
+    "crop_ps": "crop",
+    "trim_ps": "trim",
+    "split_ps": "split",
+    "merge_ps": "merged",
+    "cc_ps": "copy",
+    "tts_ps": "tts",
+    "char_ps": "-",
+    "disable_non_pdf_ps": False,
+    #logging
+    "logging_level": "INFO",
+    "log_max_lines": 10000,
+    "enable_log_file": True,
+    "json_log_checked": True,
+    "log_rotation": "By size",
+    "log_rotation_mb": 10,
+    "log_backup_count": 5,
+    "log_compress": True,
+    "enable_latency_monitor": False,
+    "latency_threshold_ms": 200,
+}
+
+class OperationSettings:
+    """
+    Frozen plain-value snapshot of the saved settings, readable without any widgets.
+    Each key of DEFAULT_SETTINGS is a slot, e.g. settings.ocr_deskew. Attributes cannot be changed after creation,
+    so a snapshot captured when a batch is submitted stays the same for every job of the batch, on any thread.
+    Snapshots compare and hash by value, pickle to worker processes, and have a digest for cache keys.
+    Operations read settings through this class so they can run headless and on worker threads or processes.
+    """
+    __slots__ = tuple(DEFAULT_SETTINGS) + ("_digest",)
+
+    def __init__(self, qsettings=None, **overrides):
+        """
+        Args:
+            qsettings (QSettings): Optional. Settings store to read from. Defaults are used for missing keys, or for every key if None.
+            **overrides: Optional. Values to use instead of the stored ones, e.g. ocr_deskew=False.
+        """
+        for key, default in DEFAULT_SETTINGS.items():
+            if key in overrides:
+                value = overrides.pop(key)
+            elif qsettings is None:
+                value = default
+            else:
+                value = qsettings.value(key, default, type=type(default))
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, "_digest", None)
+        if overrides:
+            raise TypeError(f"Unknown settings: {', '.join(overrides)}")
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"OperationSettings is frozen. Use replace({key}=...) to get a changed copy.")
+
+    def __delattr__(self, key):
+        raise AttributeError("OperationSettings is frozen.")
+
+    def values(self):
+        """Return the setting values as a tuple, in DEFAULT_SETTINGS order."""
+        return tuple(getattr(self, key) for key in DEFAULT_SETTINGS)
+
+    def as_dict(self):
+        """Return the settings as a dict keyed like DEFAULT_SETTINGS."""
+        return {key: getattr(self, key) for key in DEFAULT_SETTINGS}
+
+    def replace(self, **changes):
+        """
+        Return a copy with some settings changed.
+        Args:
+            **changes: New values, e.g. native_ocr=False.
+        """
+        return OperationSettings(None, **{**self.as_dict(), **changes})
+
+    def digest(self):
+        """Return a hex digest of every setting, computed once, e.g. to compare snapshots or build cache keys."""
+        if self._digest is None:
+            object.__setattr__(self, "_digest", hashlib.sha256(repr(self.values()).encode("utf-8")).hexdigest())
+        return self._digest
+
+    def __eq__(self, other):
+        if not isinstance(other, OperationSettings):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __hash__(self):
+        return hash(self.values())
+
+    def __reduce__(self):
+        # the default slot pickling sets attributes, which a frozen object refuses
+        return (_from_dict, (self.as_dict(),))
+
+    def __repr__(self):
+        return f"OperationSettings({self.digest()[:12]})"
+
+    @classmethod
+    def current(cls):
+        """
+        Return the settings last saved by SettingsWindow.
+        A new QSettings object is used on each call, since QSettings objects must not be shared between threads.
+        """
+        return cls(QSettings())
+
+    @classmethod
+    def from_ini(cls, ini_file):
+        """
+        Return the settings stored in an INI file written by SettingsWindow.save_as_settings.
+        Args:
+            ini_file (str): Path to the INI file.
+        """
+        return cls(QSettings(ini_file, QSettings.IniFormat))
+
+def _from_dict(values):
+    """Rebuild a pickled OperationSettings."""
+    return OperationSettings(None, **values)
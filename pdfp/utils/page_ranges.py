@@ -0,0 +1,89 @@
+import re
+
+# One page entry: a page or a range of pages, optionally with a step, e.g. "5", "3-9", "10-end", "1-end:2" or "-3-end".
+# Negative page numbers count from the end, so -1 is the last page.
+PAGE_ENTRY = re.compile(r"(-?\d+|end)(?:-(-?\d+|end))?(?::(\d+))?")
+
+class PageRange:
+    """
+    One parsed page entry. Page numbers are kept as entered until resolve() knows the page count.
+    Attributes:
+        first (int): First page, starting at 1. Negative counts from the end.
+        last (int): Last page, counted like first.
+        step (int): Distance between the pages taken. The range runs backwards if last comes before first.
+        text (str): The entry as entered, for error messages.
+    """
+    __slots__ = ("first", "last", "step", "text")
+
+    def __init__(self, first, last, step=1, text=""):
+        self.first = first
+        self.last = last
+        self.step = step
+        self.text = text
+
+    def resolve(self, page_count):
+        """
+        Return the pages of the entry in a document of page_count pages.
+        Args:
+            page_count (int): Number of pages in the document.
+        Returns:
+            range: Page indices starting at 0, in the order they are taken.
+        Raises:
+            ValueError: If the entry is outside the document.
+        """
+        first = self.index(self.first, page_count)
+        last = self.index(self.last, page_count)
+        if last >= first:
+            return range(first, last + 1, self.step)
+        return range(first, last - 1, -self.step)
+
+    def index(self, number, page_count):
+        """Return the index starting at 0 of a page number as entered."""
+        page = number if number > 0 else page_count + number + 1
+        if not 1 <= page <= page_count:
+            raise ValueError(f"Invalid page number entry. Out of range: {self.text} (document has {page_count} pages)")
+        return page - 1
+
+def parse_page_ranges(text):
+    """
+    Parse page entries such as "1 3-5 10-end 1-end:2 -3-end". Only the syntax is checked, so this can run before the document is opened.
+    Args:
+        text (str): Page entries separated by spaces. "end" stands for the last page, negative numbers count from the end,
+            and ":N" after a range takes every Nth page.
+    Returns:
+        list of PageRange: The entries in the order entered.
+    Raises:
+        ValueError: If an entry is not a page number or range, or no pages are entered.
+    """
+    page_ranges = []
+    for entry in text.split():
+        match = PAGE_ENTRY.fullmatch(entry)
+        if not match:
+            raise ValueError(f"Invalid page number entry: {entry}")
+        first, last, step = match.groups()
+        first = -1 if first == "end" else int(first)
+        last = first if last is None else (-1 if last == "end" else int(last))
+        step = 1 if step is None else int(step)
+        if first == 0 or last == 0:
+            raise ValueError(f"Invalid page number entry: {entry}. Pages start at 1")
+        if step == 0:
+            raise ValueError(f"Invalid page number entry: {entry}. The step must be at least 1")
+        page_ranges.append(PageRange(first, last, step, entry))
+    if not page_ranges:
+        raise ValueError("No pages entered")
+    return page_ranges
+
+def page_indices(page_ranges, page_count, unique=False):
+    """
+    List the pages of parsed page entries.
+    Args:
+        page_ranges (list of PageRange): Entries from parse_page_ranges.
+        page_count (int): Number of pages in the document.
+        unique (bool): Optional. Keep only the first occurrence of pages entered more than once.
+    Returns:
+        list of int: Page indices starting at 0, in the order entered.
+    Raises:
+        ValueError: If an entry is outside the document.
+    """
+    indices = [index for page_range in page_ranges for index in page_range.resolve(page_count)]
+    return list(dict.fromkeys(indices)) if unique else indices
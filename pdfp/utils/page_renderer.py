@@ -0,0 +1,38 @@
+import pymupdf
+
+# Colorspaces offered for PNG export. PNG cannot store CMYK.
+COLORSPACES = {"RGB": pymupdf.csRGB, "Gray": pymupdf.csGRAY}
+
+# Document opened by a render worker process, once for all the pages it renders
+worker_doc = None
+
+def render_page(doc, pg, output_file, dpi=72, colorspace="RGB", alpha=False):
+    """
+    Render one page of an open PDF to a PNG file.
+    Args:
+        doc (pymupdf.Document): The open PDF.
+        pg (int): Page number to render, starting at 1.
+        output_file (str): Path of the PNG to write.
+        dpi (int): Optional. Resolution to render at. 72 renders at the page's own size.
+        colorspace (str): Optional. A key of COLORSPACES.
+        alpha (bool): Optional. Keep a transparent background instead of filling it with white.
+    Returns:
+        str: output_file.
+    """
+    pix = doc.load_page(pg - 1).get_pixmap(dpi=dpi, colorspace=COLORSPACES.get(colorspace, pymupdf.csRGB), alpha=alpha)
+    pix.save(output_file)
+    return output_file
+
+def init_worker(pdf):
+    """
+    Open the PDF in a render worker process. Used as a ProcessPoolExecutor initializer, so each worker opens it once.
+    This module only imports pymupdf, so spawned workers start without loading Qt.
+    Args:
+        pdf (str): Path of the PDF to render.
+    """
+    global worker_doc
+    worker_doc = pymupdf.open(pdf)
+
+def render_worker_page(pg, output_file, dpi, colorspace, alpha):
+    """Render one page of the worker's PDF. Runs in a render worker process. See render_page."""
+    return render_page(worker_doc, pg, output_file, dpi, colorspace, alpha)
@@ -0,0 +1,177 @@
+import os
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger("pdfp")
+
+class DirectoryState:
+    """
+    Names taken in one output directory, read with a single os.scandir.
+    Attributes:
+        dirpath (str): The directory.
+        names (set of str): Normalized names of the files in the directory, plus names handed out since the scan.
+        counters (dict): Next counter to try for each (base, filler, extension), so repeated requests for the same
+            base name do not retry counters already known to be taken.
+        reservations (int): Names handed out to jobs that have not finished yet.
+    """
+    __slots__ = ("dirpath", "names", "counters", "reservations")
+
+    def __init__(self, dirpath):
+        self.dirpath = dirpath or "."
+        self.names = set()
+        self.counters = {}
+        self.reservations = 0
+        try:
+            with os.scandir(self.dirpath) as it:
+                self.names = {os.path.normcase(entry.name) for entry in it}
+        except OSError as e:
+            logger.debug(f"Could not list {dirpath}: {e}")
+
+    def take(self, filename, filler, claim=False):
+        """
+        Return filename if it is free, otherwise the first free filename{filler}{counter}, and mark it taken.
+        Args:
+            filename (str): File name without a directory.
+            filler (str): Character placed before the counter.
+            claim (bool): Optional. Also create the name on disk as an empty placeholder with O_EXCL, so jobs in
+                other processes, e.g. batch workers, cannot take it. Names created by another process since the
+                listing are skipped.
+        Returns:
+            tuple: (the free file name, whether a placeholder was created for it)
+        """
+        base, extension = os.path.splitext(filename)
+        key = (os.path.normcase(base), filler, os.path.normcase(extension))
+        candidate = filename
+        counter = None
+        while True:
+            normalized = os.path.normcase(candidate)
+            if normalized not in self.names:
+                self.names.add(normalized)
+                if counter is not None:
+                    self.counters[key] = counter + 1
+                if not claim:
+                    return candidate, False
+                try:
+                    os.close(os.open(os.path.join(self.dirpath, candidate), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    return candidate, True
+                except FileExistsError:
+                    logger.debug(f"{candidate} was created since {self.dirpath} was listed")
+                except OSError as e:
+                    # the operation reports unwritable directories itself
+                    logger.debug(f"Could not claim {candidate}: {e}")
+                    return candidate, False
+            counter = self.counters.get(key, 1) if counter is None else counter + 1
+            candidate = f"{base}{filler}{counter}{extension}"
+
+class PathAllocator:
+    """
+    Hands out output paths that do not overwrite existing files, without probing the filesystem once per counter.
+    Each output directory is listed once and the listing is kept while jobs hold names in it, so every file a job
+    writes, and every name handed to a job still running, is known without touching the disk again.
+    Names are handed out under a lock, so concurrent jobs never get the same path.
+    Names reserved for a job are also created on disk as empty placeholders with O_EXCL, which the operation
+    overwrites, so jobs in other processes with their own listing, such as batch workers, never get the same path.
+    Reservations belong to the job running on the current thread (see owner()) and are released when it finishes,
+    removing placeholders that were never written; a directory is listed again once no job holds a name in it,
+    picking up files written by other programs.
+    Paths requested outside a job are checked against a fresh listing and not reserved.
+    """
+    _instance = None
+    def __new__(cls, *args, **kwargs):
+        """
+        Override __new__ method to ensure only one instance of PathAllocator exists.
+        If no existing instance, create one and return it. If an instance exists, return that instance.
+        """
+        if not cls._instance:
+            cls._instance = super(PathAllocator, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+    @classmethod
+    def instance(cls):
+        """
+        Returns the single instance of PathAllocator.
+        If no instance exists, creates one and returns it.
+        """
+        if cls._instance is None:
+            cls._instance = PathAllocator()
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # normalized directory -> DirectoryState
+        self.directories = {}
+        # owner -> list of (normalized directory, placeholder path or None) it holds names in
+        self.reservations = {}
+
+    @contextmanager
+    def owner(self, owner):
+        """
+        Reserve the paths allocated on this thread for owner until release(owner) is called.
+        Args:
+            owner (object): The job allocating paths.
+        """
+        previous = getattr(self.local, "owner", None)
+        self.local.owner = owner
+        try:
+            yield
+        finally:
+            self.local.owner = previous
+
+    def current_owner(self):
+        """Return the owner paths allocated on this thread are reserved for, or None. Pass it to owner() to allocate for the same job on another thread."""
+        return getattr(self.local, "owner", None)
+
+    def allocate(self, output_file, filler="_"):
+        """
+        Return output_file, or output_file with the first free counter before the extension if it is taken.
+        Args:
+            output_file (str): The path wanted.
+            filler (str): Optional. Character placed before the counter.
+        Returns:
+            str: A path no other file or job has.
+        """
+        dirpath, filename = os.path.split(output_file)
+        key = os.path.normcase(os.path.abspath(dirpath or "."))
+        owner = getattr(self.local, "owner", None)
+        with self.lock:
+            state = self.directories.get(key)
+            if state is None:
+                state = DirectoryState(dirpath)
+                if owner is not None:
+                    self.directories[key] = state
+            filename, claimed = state.take(filename, filler, claim=owner is not None)
+            output_file = os.path.join(dirpath, filename)
+            if owner is not None:
+                state.reservations += 1
+                self.reservations.setdefault(owner, []).append((key, output_file if claimed else None))
+        return output_file
+
+    def release(self, owner):
+        """
+        Release the paths reserved by owner, removing placeholders the job left empty, e.g. outputs of a failed
+        operation. Directories no job holds names in are forgotten.
+        Args:
+            owner (object): The job that finished.
+        """
+        with self.lock:
+            reservations = self.reservations.pop(owner, ())
+            for key, _ in reservations:
+                state = self.directories.get(key)
+                if state is None:
+                    continue
+                state.reservations -= 1
+                if state.reservations <= 0:
+                    del self.directories[key]
+        for _, placeholder in reservations:
+            if placeholder is None:
+                continue
+            try:
+                if os.path.getsize(placeholder) == 0:
+                    os.remove(placeholder)
+            except OSError:
+                # written and moved, or removed by the operation
+                pass
@@ -0,0 +1,313 @@
+import os
+import time
+import tempfile
+import logging
+import pymupdf
+from pdfp.utils.operation_settings import OperationSettings
+from pdfp.utils.operation_map import operation_map
+from pdfp.utils.filename_constructor import construct_filename
+from pdfp.utils.page_ranges import parse_page_ranges
+from pdfp.utils.clean_text import clean_text
+from pdfp.utils.tts_limit import tts_word_count
+from pdfp.utils.job_result import JobResult
+from pdfp.operations.file2pdf import file2pdf
+from pdfp.operations.png import pdf2png
+from pdfp.operations.split import split, parse_split
+from pdfp.operations.ocr import ocr
+from pdfp.operations.crop import crop
+from pdfp.operations.trim import trim
+from pdfp.operations.tts import tts
+
+logger = logging.getLogger("pdfp")
+
+# Separates operations in a chain, e.g. "file2pdf > trim:1-5 10-end > ocr > cc"
+CHAIN_SEPARATOR = ">"
+# Operations that hand a PDF to the next operation, mapped to the prefix/suffix setting used to name their output.
+PDF_OPERATIONS = {"file2pdf": "f2pdf_ps", "trim": "trim_ps", "ocr": "ocr_ps", "crop": "crop_ps"}
+# Operations that produce neither a PDF nor text, so nothing can follow them.
+FINAL_OPERATIONS = ("pdf2png", "split", "tts")
+
+def parse_operation(text):
+    """
+    Split an operation into its name and argument.
+    Args:
+        text (str): Operation in the form NAME or NAME:ARG, e.g. "ocr" or "trim:1-5 10-end".
+    Returns:
+        tuple: (name, arg) where arg is "" if not given.
+    """
+    name, _, arg = text.partition(":")
+    return name.strip().lower(), arg.strip()
+
+def parse_chain(text):
+    """
+    Split a chain of operations into (name, arg) pairs.
+    Args:
+        text (str): Operations separated by CHAIN_SEPARATOR, e.g. "file2pdf > trim:1-5 > ocr".
+    Returns:
+        list of tuple: (name, arg) pairs in order.
+    """
+    return [parse_operation(step) for step in text.split(CHAIN_SEPARATOR) if step.strip()]
+
+class ChainState:
+    """
+    The document passed between the operations of a chain for one file.
+    The current PDF is either open in memory (doc), on disk (path), or both. Text stays in memory once extracted.
+    Attributes:
+        name (str): Output filename of the last operation. The next output filename is constructed from it,
+            so outputs are named as if each operation had been run by hand on the previous output.
+        outputs (list of str): Files written so far.
+        pages (int): Page count of the current PDF.
+    """
+    def __init__(self, file_path):
+        self.doc = None
+        self.path = file_path
+        self.text = None
+        self.name = file_path
+        self.outputs = []
+        self.pages = 0
+
+    def document(self):
+        """Return the current PDF, opening it from disk if it is not already in memory."""
+        if self.doc is None:
+            self.doc = pymupdf.open(self.path)
+        return self.doc
+
+    def set_document(self, doc):
+        """Replace the current PDF with an in-memory document that has not been written to disk."""
+        if self.doc is not None and self.doc is not doc:
+            self.doc.close()
+        self.doc = doc
+        self.path = None
+        self.pages = len(doc)
+
+    def set_file(self, path):
+        """Replace the current PDF with a file written by a subprocess."""
+        self.close()
+        self.path = path
+
+    def extract_text(self, settings=None):
+        """Return the cleaned text of the current document, or None if it is not a PDF or TXT file."""
+        if self.text is None:
+            self.text = clean_text(self.doc if self.doc is not None else self.path, settings)
+        return self.text
+
+    def file(self, directory):
+        """
+        Return a path to the current PDF on disk, writing the in-memory document into directory if needed.
+        Only operations that run in a subprocess need this.
+        """
+        if self.path is None:
+            os.makedirs(directory, exist_ok=True)
+            self.path = os.path.join(directory, os.path.basename(self.name))
+            self.doc.save(self.path)
+        return self.path
+
+    def close(self):
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+
+class Pipeline:
+    """
+    A chain of operations run on each file, each operation working on the output of the previous one.
+    PDFs are handed between file2pdf, trim and pdf2png in memory, and text is handed from cc to tts in memory.
+    OCR and Briss run in subprocesses, so their input and output go through a temp directory.
+    Only the final output is written next to the input file unless intermediates are kept.
+    """
+    def __init__(self, steps, keep_intermediates=None, cc_to_file=None, ocr_jobs=0):
+        """
+        Args:
+            steps (list of tuple): (name, arg) pairs, e.g. from parse_chain.
+            keep_intermediates (bool): Optional. Write every operation's output. Defaults to the chain_keep_intermediates setting.
+            cc_to_file (bool): Optional. Write clean copy text to a file instead of the clipboard. Defaults to the cc_file_radio_checked setting.
+            ocr_jobs (int): Optional. ocrmypdf jobs for each OCR operation. 0 lets ocrmypdf use all cores.
+        """
+        self.steps = list(steps)
+        self.keep_intermediates = keep_intermediates
+        self.cc_to_file = cc_to_file
+        self.ocr_jobs = ocr_jobs
+
+    @classmethod
+    def from_text(cls, text, **kwargs):
+        """Build a pipeline from a chain such as "file2pdf > trim:1-5 > ocr"."""
+        return cls(parse_chain(text), **kwargs)
+
+    def __str__(self):
+        return f" {CHAIN_SEPARATOR} ".join(f"{name}:{arg}" if arg else name for name, arg in self.steps)
+
+    def validate(self, settings):
+        """
+        Check that every operation exists, can run unattended, and accepts the output of the one before it.
+        Args:
+            settings (OperationSettings): Settings the chain will run with.
+        Returns:
+            str: An error message, or "" if the chain is valid.
+        """
+        if not self.steps:
+            return "No operations entered."
+        for index, (name, arg) in enumerate(self.steps):
+            previous = self.steps[index - 1][0] if index > 0 else None
+            if name not in operation_map:
+                return f"Unknown operation '{name}'. Choose from: {', '.join(operation_map)}"
+            if name == "trim" and arg == "":
+                return "trim requires pages to keep, e.g. trim:12-16 32-end"
+            if name in ("trim", "pdf2png") and arg:
+                try:
+                    parse_page_ranges(arg)
+                except ValueError as e:
+                    return f"{name}: {e}"
+            if name == "split":
+                try:
+                    parse_split(arg)
+                except ValueError as e:
+                    return f"split requires how to split, e.g. split:50, split:toc or split:1-10 11-end. {e}"
+            if name == "file2pdf" and index > 0:
+                return "file2pdf can only be the first operation."
+            if previous in FINAL_OPERATIONS:
+                return f"Nothing can follow {previous}."
+            if previous == "cc" and name != "tts":
+                return f"{name} needs a PDF, but cc produces text. Only tts can follow cc."
+            if name == "crop" and not settings.auto_crop_checked:
+                return "crop launches the Briss GUI unless automatic cropping is enabled in settings."
+            if name == "tts" and settings.enable_balabolka:
+                return "tts launches Balabolka unless Balabolka is disabled in settings."
+        return ""
+
+    def run(self, file_path, settings=None):
+        """
+        Runs the chain on one file. Called on job engine threads and batch worker processes.
+        Args:
+            file_path (str): The file to process.
+            settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+        Returns:
+            JobResult: The result of the chain. output_files lists every file written, final output last.
+        """
+        settings = settings or OperationSettings.current()
+        if self.keep_intermediates is None:
+            keep_intermediates = settings.chain_keep_intermediates
+        else:
+            keep_intermediates = self.keep_intermediates
+        logger.info(f"Running {self} on {file_path}")
+        start = time.perf_counter()
+
+        state = ChainState(file_path)
+        clipboard_text = None
+        with tempfile.TemporaryDirectory(prefix="pdfp-chain-") as temp_dir:
+            try:
+                for index, (name, arg) in enumerate(self.steps):
+                    step_start = time.perf_counter()
+                    keep = keep_intermediates or index == len(self.steps) - 1
+                    step_dir = os.path.join(temp_dir, str(index))
+                    if name == "cc":
+                        error, clipboard_text = self.run_text_step(state, settings, keep)
+                    else:
+                        error = self.run_step(name, arg, state, settings, keep, step_dir)
+                    if error:
+                        logger.error(f"{name} failed on {file_path}: {error}")
+                        return JobResult(file_path, "failed", state.outputs, f"{name}: {error}")
+                    logger.debug(f"{name} finished in {time.perf_counter() - step_start:.2f}s")
+            finally:
+                state.close()
+
+        logger.success(f"{self} complete on {file_path} in {time.perf_counter() - start:.2f}s. Output: {state.outputs[-1] if state.outputs else 'clipboard'}")
+        return JobResult.success(file_path, state.outputs, clipboard_text=clipboard_text, pages=state.pages)
+
+    def run_step(self, name, arg, state, settings, keep, step_dir):
+        """
+        Runs one PDF operation on the chain state.
+        Args:
+            name (str): Operation name.
+            arg (str): Operation argument, e.g. pages for trim.
+            state (ChainState): The document being passed along the chain. Updated in place.
+            settings (OperationSettings): Settings to use.
+            keep (bool): Whether to write the output of this operation next to the input file.
+            step_dir (str): Temp directory for this operation's subprocess input and output.
+        Returns:
+            str: An error message, or "" on success.
+        """
+        if name not in ("file2pdf", "tts") and state.doc is None and not state.path.lower().endswith(".pdf"):
+            return "File is not a PDF."
+        if name == "file2pdf":
+            if error := file2pdf.check_filetype(state.path):
+                return error
+            try:
+                state.set_document(file2pdf.convert_document(state.path, settings))
+            except ValueError as e:
+                return str(e)
+        elif name == "trim":
+            try:
+                state.set_document(trim.trim_document(state.document(), arg))
+            except ValueError as e:
+                return str(e)
+        elif name == "pdf2png":
+            try:
+                result = pdf2png.save_pages(state.document(), state.name, arg, settings, source=state.path)
+            except ValueError as e:
+                return str(e)
+            state.outputs.extend(result.output_files)
+            return ""
+        elif name == "split":
+            try:
+                result = split.split_document(state.document(), state.name, arg, settings)
+            except ValueError as e:
+                return str(e)
+            state.outputs.extend(result.output_files)
+            return ""
+        elif name == "tts":
+            text = state.extract_text(settings)
+            if text is None:
+                return "Filetype is not TXT or PDF."
+            result = tts.speak(text, state.name, settings)
+            state.outputs.extend(result.output_files)
+            return result.message
+        elif name in ("ocr", "crop"):
+            input_file = state.file(step_dir)
+            output_name = construct_filename(state.name, PDF_OPERATIONS[name], settings=settings, allocate=keep)
+            if keep:
+                output_file = output_name
+            else:
+                output_file = os.path.join(step_dir, "out", os.path.basename(output_name))
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            if name == "ocr":
+                result = ocr.convert(input_file, jobs=self.ocr_jobs, settings=settings, output_file=output_file)
+            else:
+                result = crop.convert(input_file, settings=settings, output_file=output_file)
+            if not result.ok:
+                return result.message or f"{name} did not finish"
+            state.set_file(output_file)
+            state.name = output_name
+            if keep:
+                state.outputs.append(output_file)
+            state.pages = result.pages or state.pages
+            return ""
+
+        pgnum = arg if name == "trim" else ""
+        state.name = construct_filename(state.name, PDF_OPERATIONS[name], pgnum, settings, allocate=keep)
+        if keep:
+            state.doc.save(state.name, garbage=4, deflate=True)
+            state.outputs.append(state.name)
+        return ""
+
+    def run_text_step(self, state, settings, keep):
+        """
+        Runs clean copy on the chain state, keeping the text in memory for tts.
+        Args:
+            state (ChainState): The document being passed along the chain. Updated in place.
+            settings (OperationSettings): Settings to use.
+            keep (bool): Whether to write the text next to the input file or copy it to the clipboard.
+        Returns:
+            tuple: (error message or "", clipboard text or None)
+        """
+        if state.extract_text(settings) is None:
+            return "Filetype is not PDF or TXT.", None
+        cc_to_file = settings.cc_file_radio_checked if self.cc_to_file is None else self.cc_to_file
+        # only a text file that is written reserves its name
+        state.name = construct_filename(state.name, "cc_ps", settings=settings, allocate=keep and cc_to_file)
+        if not keep:
+            return "", None
+        if cc_to_file:
+            state.outputs.extend(tts_word_count(state.text, state.name, settings.enable_cc_split_txt, settings))
+            return "", None
+        tts_word_count(state.text)
+        logger.info(f"PDF contents copied to clipboard.")
+        return "", state.text
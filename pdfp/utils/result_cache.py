@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger("pdfp")
+
+# Default cache directory, next to the logs and config directories
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+# Bytes read at a time when hashing inputs
+HASH_BLOCK_SIZE = 1 << 20
+# Subdirectory of the cache location holding the entries. The location can be any folder the user picks,
+# so only this subdirectory, which pdfp creates, is ever evicted from or cleared
+RESULTS_SUBDIR = "results"
+# Name of an entry: the hex digest of its key, and the extension of the output
+ENTRY_NAME = re.compile(r"[0-9a-f]{64}(\.[A-Za-z0-9]+)?")
+# Name of a partly written entry
+TEMP_NAME = re.compile(r"pdfp-\w+\.tmp")
+
+class ResultCache:
+    """
+    Persistent cache of operation outputs, keyed on the input's content hash, the operation, and the settings that affect the output.
+    Each entry is a single file named after its key. An entry's modification time is its last use, and the
+    least recently used entries are deleted once the directory grows past max_bytes.
+    Only files named like entries are evicted or cleared, so nothing else in the directory is ever deleted.
+    Entries are written to a temp file and renamed into place, so several threads or batch processes can share a directory.
+    Attributes:
+        directory (str): Directory holding the entries, RESULTS_SUBDIR of the cache location.
+        max_bytes (int): Size cap of the directory.
+        hardlink (bool): Hard link entries to outputs instead of copying. Saves disk space, but editing an output in place also changes its entry.
+        hits (int): Lookups answered from the cache this session.
+        misses (int): Lookups that were not.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+    # (path, size, mtime_ns) -> content hash, so unchanged inputs are hashed once per session
+    _digests = {}
+
+    def __init__(self, directory, max_bytes, hardlink=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hardlink = hardlink
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_settings(cls, settings):
+        """
+        Return the cache configured in settings, or None if caching is disabled.
+        One instance is kept per directory so hit and miss counts add up across operations.
+        Args:
+            settings (OperationSettings): Settings to use.
+        """
+        if not settings.enable_result_cache:
+            return None
+        directory = os.path.join(settings.result_cache_location or DEFAULT_CACHE_DIR, RESULTS_SUBDIR)
+        with cls._instances_lock:
+            cache = cls._instances.get(directory)
+            if cache is None:
+                cache = cls._instances[directory] = cls(directory, 0)
+        cache.max_bytes = settings.result_cache_max_mb * 1024 * 1024
+        cache.hardlink = settings.result_cache_hardlink
+        return cache
+
+    @classmethod
+    def file_digest(cls, file_path):
+        """
+        Return the SHA-256 hex digest of a file's contents.
+        Args:
+            file_path (str): The file to hash.
+        """
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        digest = cls._digests.get(memo_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                while block := f.read(HASH_BLOCK_SIZE):
+                    sha.update(block)
+            digest = cls._digests[memo_key] = sha.hexdigest()
+        return digest
+
+    def key(self, input_file, operation, params, extra_files=()):
+        """
+        Build the cache key for one run of an operation.
+        Args:
+            input_file (str): The operation's input file.
+            operation (str): Operation name, e.g. "ocr".
+            params (dict): Settings that affect the output. Must be JSON-serializable.
+            extra_files (iterable of str): Optional. Other files whose contents affect the output, e.g. a cover image.
+        Returns:
+            str: Hex digest identifying the output.
+        """
+        material = {
+            "operation": operation,
+            "input": self.file_digest(input_file),
+            "params": params,
+            "extra": [self.file_digest(path) for path in extra_files],
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def entry_path(self, key, output_file):
+        _, extension = os.path.splitext(output_file)
+        return os.path.join(self.directory, f"{key}{extension}")
+
+    def fetch(self, key, output_file):
+        """
+        Place the cached output for key at output_file, if there is one.
+        Args:
+            key (str): Key from key().
+            output_file (str): Where the operation would have written its output.
+        Returns:
+            bool: True on a hit.
+        """
+        entry = self.entry_path(key, output_file)
+        try:
+            self.place(entry, output_file)
+            os.utime(entry)
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            logger.debug(f"Result cache miss for {os.path.basename(output_file)} ({self.hits} hits, {self.misses} misses)")
+            return False
+        with self.lock:
+            self.hits += 1
+        logger.info(f"Result cache hit. Output: {output_file} ({self.hits} hits, {self.misses} misses)")
+        return True
+
+    def store(self, key, output_file):
+        """
+        Add an operation's output to the cache, then evict least recently used entries over the size cap.
+        Failures are logged and otherwise ignored, since the output itself was written successfully.
+        Args:
+            key (str): Key from key().
+            output_file (str): The output the operation wrote.
+        """
+        entry = self.entry_path(key, output_file)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix="pdfp-", suffix=".tmp")
+            os.close(fd)
+            try:
+                shutil.copyfile(output_file, temp_path)
+                os.replace(temp_path, entry)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            logger.debug(f"Result cache stored {os.path.basename(output_file)}")
+            self.evict()
+        except OSError as e:
+            logger.warning(f"Could not add {output_file} to the result cache: {e}")
+
+    def place(self, entry, output_file):
+        """Hard link or copy a cache entry to output_file. Raises FileNotFoundError if the entry does not exist."""
+        if not os.path.exists(entry):
+            raise FileNotFoundError(entry)
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        if self.hardlink:
+            try:
+                os.link(entry, output_file)
+                return
+            except OSError:
+                # different filesystem, or links not supported
+                pass
+        shutil.copyfile(entry, output_file)
+
+    def evict(self):
+        """Delete least recently used entries until the cache is within max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for dir_entry in it:
+                if not dir_entry.is_file() or not ENTRY_NAME.fullmatch(dir_entry.name):
+                    continue
+                stat = dir_entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.debug(f"Result cache evicted {os.path.basename(path)}")
+            except FileNotFoundError:
+                total -= size
+
+    def clear(self):
+        """Delete every entry, and partly written entries left by an interrupted store. Other files are left alone."""
+        if os.path.isdir(self.directory):
+            with os.scandir(self.directory) as it:
+                for dir_entry in it:
+                    if dir_entry.is_file() and (ENTRY_NAME.fullmatch(dir_entry.name) or TEMP_NAME.fullmatch(dir_entry.name)):
+                        try:
+                            os.remove(dir_entry.path)
+                        except FileNotFoundError:
+                            pass
+            try:
+                os.rmdir(self.directory)
+            except OSError:
+                # other files were put in it
+                pass
+        logger.info(f"Result cache cleared: {self.directory}")
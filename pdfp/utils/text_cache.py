@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from pdfp.utils.result_cache import ResultCache, DEFAULT_CACHE_DIR
+
+logger = logging.getLogger("pdfp")
+
+# Characters of cached text kept before least recently used documents are evicted
+TEXT_CACHE_MAX_CHARS = 256 * 1024 * 1024
+# Pages extracted between commits, so a long extraction never holds the write lock for long
+COMMIT_PAGES = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    key TEXT PRIMARY KEY,
+    path TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    chars INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (key, page)
+);
+"""
+
+class TextCache:
+    """
+    Persistent cache of the cleaned text of each page of a PDF, stored in SQLite.
+    Documents are keyed on the PDF's content hash and the extraction options, so a changed file misses and is extracted again.
+    A document is only served from the cache once all of its pages were stored; an interrupted extraction is redone.
+    Each call opens its own connection, so the cache can be used from several job engine threads and batch processes at once.
+    Attributes:
+        db_path (str): Path of the SQLite database.
+        max_chars (int): Characters of text kept before least recently used documents are evicted.
+    """
+    def __init__(self, db_path, max_chars=TEXT_CACHE_MAX_CHARS):
+        self.db_path = db_path
+        self.max_chars = max_chars
+
+    @classmethod
+    def for_settings(cls, settings):
+        """
+        Return the text cache in the result cache directory, or None if the result cache is disabled.
+        The database lives in a subdirectory so result cache eviction leaves it alone, while Clear Cache deletes it.
+        Args:
+            settings (OperationSettings): Settings to use.
+        """
+        if not settings.enable_result_cache:
+            return None
+        directory = settings.result_cache_location or DEFAULT_CACHE_DIR
+        return cls(os.path.join(directory, "text", "pages.sqlite3"))
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def key(self, pdf, options):
+        """
+        Args:
+            pdf (str): Path of the PDF.
+            options (dict): Extraction options that change the text. Must be JSON-serializable.
+        Returns:
+            str: Hex digest identifying the document's text.
+        """
+        material = {"input": ResultCache.file_digest(pdf), "options": options}
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def iter_pages(self, pdf, pages, options):
+        """
+        Yield the cleaned text of each page of pdf, from the cache if the document is stored, otherwise from pages.
+        On a miss, pages are stored as they are yielded and the document is marked complete once pages is exhausted.
+        Args:
+            pdf (str): Path of the PDF.
+            pages (iterable of str): Cleaned text of each page, consumed only on a miss.
+            options (dict): Extraction options that change the text.
+        Yields:
+            str: Cleaned text of each page, in order.
+        """
+        key = self.key(pdf, options)
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT complete FROM documents WHERE key = ?", (key,)).fetchone()
+            if row and row[0]:
+                with conn:
+                    conn.execute("UPDATE documents SET last_used = ? WHERE key = ?", (time.time(), key))
+                logger.info(f"Text cache hit for {os.path.basename(pdf)}")
+                for (text,) in conn.execute("SELECT text FROM pages WHERE key = ? ORDER BY page", (key,)):
+                    yield text
+                return
+
+            logger.debug(f"Text cache miss for {os.path.basename(pdf)}")
+            with conn:
+                conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                conn.execute("INSERT OR REPLACE INTO documents (key, path, complete, chars, last_used) VALUES (?, ?, 0, 0, ?)", (key, pdf, time.time()))
+            chars = 0
+            batch = []
+            for number, text in enumerate(pages):
+                batch.append((key, number, text))
+                chars += len(text)
+                if len(batch) >= COMMIT_PAGES:
+                    with conn:
+                        conn.executemany("INSERT OR REPLACE INTO pages (key, page, text) VALUES (?, ?, ?)", batch)
+                    batch = []
+                yield text
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO pages (key, page, text) VALUES (?, ?, ?)", batch)
+                conn.execute("UPDATE documents SET complete = 1, chars = ? WHERE key = ?", (chars, key))
+            self.evict(conn)
+        finally:
+            conn.close()
+
+    def evict(self, conn):
+        """
+        Delete least recently used documents until the cached text is within max_chars.
+        Extractions interrupted more than a day ago are deleted too.
+        """
+        stale = [key for (key,) in conn.execute("SELECT key FROM documents WHERE complete = 0 AND last_used < ?", (time.time() - 86400,))]
+        with conn:
+            for key in stale:
+                conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                conn.execute("DELETE FROM documents WHERE key = ?", (key,))
+        total = conn.execute("SELECT COALESCE(SUM(chars), 0) FROM documents").fetchone()[0]
+        if total <= self.max_chars:
+            return
+        rows = conn.execute("SELECT key, chars FROM documents ORDER BY last_used").fetchall()
+        with conn:
+            for key, chars in rows:
+                if total <= self.max_chars:
+                    break
+                conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                conn.execute("DELETE FROM documents WHERE key = ?", (key,))
+                total -= chars
+                logger.debug(f"Text cache evicted {key}")
+
+    def clear(self):
+        """Delete the database, then its directory if nothing else is in it."""
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.db_path + suffix)
+            except FileNotFoundError:
+                pass
+        try:
+            os.rmdir(os.path.dirname(self.db_path))
+        except OSError:
+            pass
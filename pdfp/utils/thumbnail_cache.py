@@ -0,0 +1,284 @@
+import os
+import re
+import logging
+import tempfile
+import threading
+from collections import OrderedDict, deque
+import pymupdf
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage
+from pdfp.utils.result_cache import ResultCache, DEFAULT_CACHE_DIR
+
+logger = logging.getLogger("pdfp")
+
+# Width in pixels thumbnails are rendered at
+THUMBNAIL_WIDTH = 160
+# Threads rendering thumbnails. One keeps the open document to itself, so pages of the same file are not opened twice
+THUMBNAIL_THREADS = 1
+# Requests kept waiting. Older requests are dropped; their pages ask again if they are still visible
+THUMBNAIL_QUEUE_LIMIT = 128
+# Size cap of the thumbnails on disk
+THUMBNAIL_DISK_MAX_MB = 256
+# Name of a thumbnail on disk: content hash, page and width
+THUMBNAIL_NAME = re.compile(r"[0-9a-f]{64}-\d+-\d+\.png")
+# Thumbnails written to disk between evictions
+EVICT_EVERY = 256
+
+def render_thumbnail(doc, page_number, width=THUMBNAIL_WIDTH):
+    """
+    Render a page at low resolution.
+    Args:
+        doc (pymupdf.Document): The open document.
+        page_number (int): Page to render, starting at 0.
+        width (int): Optional. Width of the thumbnail in pixels.
+    Returns:
+        tuple: (QImage, PNG bytes) of the thumbnail.
+    """
+    page = doc.load_page(page_number)
+    scale = width / max(1, page.rect.width)
+    pix = page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False)
+    # copy, since the QImage would otherwise point into the pixmap's buffer
+    image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888).copy()
+    return image, pix.tobytes("png")
+
+class ThumbnailCache:
+    """
+    Page thumbnails kept in memory, backed by PNG files on disk.
+    The in-memory cache holds the most recently used thumbnails up to max_bytes.
+    On disk, thumbnails are keyed by the file's content hash and page, so a renamed or copied file reuses them
+    and a changed file does not. The disk cache lives in the result cache directory and is only used while the result cache is enabled.
+    Attributes:
+        max_bytes (int): Memory the in-memory thumbnails may take.
+        directory (str): Directory of the thumbnails on disk, or None to keep them in memory only.
+    """
+    def __init__(self, max_bytes, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.lock = threading.Lock()
+        # (path, size, mtime_ns, page) -> QImage, least recently used first
+        self.images = OrderedDict()
+        self.bytes = 0
+        self.stored = 0
+
+    def configure(self, settings):
+        """
+        Apply the thumbnail memory and result cache settings.
+        Args:
+            settings (OperationSettings): Settings to use.
+        """
+        with self.lock:
+            self.max_bytes = settings.thumbnail_memory_mb * 1024 * 1024
+            self.trim()
+        if settings.enable_result_cache:
+            self.directory = os.path.join(settings.result_cache_location or DEFAULT_CACHE_DIR, "thumbnails")
+        else:
+            self.directory = None
+
+    def get(self, key):
+        """Return the thumbnail for key from memory, or None."""
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        """Keep a thumbnail in memory, evicting the least recently used thumbnails over max_bytes."""
+        with self.lock:
+            old = self.images.pop(key, None)
+            if old is not None:
+                self.bytes -= old.sizeInBytes()
+            self.images[key] = image
+            self.bytes += image.sizeInBytes()
+            self.trim()
+
+    def trim(self):
+        """Evict least recently used thumbnails until the memory cache is within max_bytes. Call with lock held."""
+        while self.bytes > self.max_bytes and self.images:
+            _, image = self.images.popitem(last=False)
+            self.bytes -= image.sizeInBytes()
+
+    def disk_path(self, digest, page_number):
+        return os.path.join(self.directory, digest[:2], f"{digest}-{page_number}-{THUMBNAIL_WIDTH}.png")
+
+    def load(self, digest, page_number):
+        """Return the thumbnail of a page from disk, or None."""
+        if self.directory is None:
+            return None
+        path = self.disk_path(digest, page_number)
+        image = QImage(path)
+        if image.isNull():
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return image
+
+    def save(self, digest, page_number, png):
+        """
+        Write the PNG of a thumbnail to disk. Failures are logged and otherwise ignored.
+        Written to a temp file and renamed into place, so concurrent writers never leave a partial file.
+        """
+        if self.directory is None:
+            return
+        path = self.disk_path(digest, page_number)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not store thumbnail {path}: {e}")
+            return
+        self.stored += 1
+        if self.stored % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        """Delete the least recently used thumbnails on disk until they are within THUMBNAIL_DISK_MAX_MB."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not THUMBNAIL_NAME.fullmatch(name):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        max_bytes = THUMBNAIL_DISK_MAX_MB * 1024 * 1024
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear_disk(self):
+        """Delete the thumbnails on disk, then their directories once nothing else is in them."""
+        if self.directory is None or not os.path.isdir(self.directory):
+            return
+        for root, _, files in os.walk(self.directory, topdown=False):
+            for name in files:
+                if THUMBNAIL_NAME.fullmatch(name):
+                    try:
+                        os.remove(os.path.join(root, name))
+                    except OSError:
+                        pass
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+
+class ThumbnailRunner(QRunnable):
+    """Renders queued thumbnails on a pool thread until the loader's queue is empty, keeping the last document open."""
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+        self.doc = None
+        self.doc_path = None
+
+    def run(self):
+        try:
+            while (key := self.loader.next_request()) is not None:
+                self.loader.load(self, key)
+        finally:
+            if self.doc is not None:
+                self.doc.close()
+
+    def document(self, path):
+        """Return the open document at path, closing the previous one if it was a different file."""
+        if self.doc_path != path:
+            if self.doc is not None:
+                self.doc.close()
+            self.doc = None
+            self.doc_path = path
+            self.doc = pymupdf.open(path)
+        return self.doc
+
+class ThumbnailLoader(QObject):
+    """
+    Renders page thumbnails in the background for the pages the preview shows.
+    Requests are served newest first, so the pages currently on screen are rendered before pages scrolled past.
+    Thumbnails come from memory, then disk, and are only rendered when neither has them.
+    Signals:
+        loaded: Emits the memory key of a thumbnail and its QImage. Connects to preview_widget.
+    """
+    loaded = Signal(object, object)
+
+    def __init__(self, cache, threads=THUMBNAIL_THREADS):
+        super().__init__()
+        self.cache = cache
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(threads)
+        self.threads = threads
+        self.lock = threading.Lock()
+        self.requests = deque(maxlen=THUMBNAIL_QUEUE_LIMIT)
+        self.requested = set()
+        self.runners = 0
+
+    def request(self, key):
+        """
+        Queue a thumbnail to be loaded. Safe to call repeatedly; queued thumbnails are not queued twice.
+        Args:
+            key (tuple): (path, size, mtime_ns, page) of the thumbnail.
+        """
+        with self.lock:
+            if key in self.requested:
+                return
+            if len(self.requests) == self.requests.maxlen:
+                self.requested.discard(self.requests[0])
+            self.requests.append(key)
+            self.requested.add(key)
+            if self.runners >= self.threads:
+                return
+            self.runners += 1
+        self.pool.start(ThumbnailRunner(self))
+
+    def next_request(self):
+        """Return the newest queued key, or None once the queue is empty. Called by ThumbnailRunner."""
+        with self.lock:
+            if not self.requests:
+                self.runners -= 1
+                return None
+            # stays in requested while it is loaded, so repaints do not queue it again
+            return self.requests.pop()
+
+    def cancel(self):
+        """Drop queued requests, e.g. when another file is previewed."""
+        with self.lock:
+            self.requests.clear()
+            self.requested.clear()
+
+    def load(self, runner, key):
+        """Load one thumbnail from disk or render it, and emit it. Runs on a pool thread."""
+        path, _, _, page_number = key
+        image = None
+        try:
+            digest = ResultCache.file_digest(path) if self.cache.directory else None
+            if digest:
+                image = self.cache.load(digest, page_number)
+            if image is None:
+                image, png = render_thumbnail(runner.document(path), page_number)
+                if digest:
+                    self.cache.save(digest, page_number, png)
+            self.cache.put(key, image)
+        except Exception as e:
+            logger.debug(f"Could not render page {page_number + 1} of {path}: {e}")
+        with self.lock:
+            self.requested.discard(key)
+        if image is not None:
+            self.loaded.emit(key, image)
+
+    def shutdown(self):
+        """Drop queued requests and wait for thumbnails being rendered."""
+        self.cancel()
+        self.pool.waitForDone()
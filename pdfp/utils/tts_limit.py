@@ -1,13 +1,12 @@
-from pdfp.settings_window import SettingsWindow
-from pdfp.file_tree_widget import FileTreeWidget
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Signal, QObject
+from pdfp.utils.operation_settings import OperationSettings
 import os
-import math
 import logging
 
 logger = logging.getLogger("pdfp")
 
+# Words per TTS chunk when the setting is left blank
+DEFAULT_SPLIT_VALUE = 100000
+
 def write_to_file(text, output_txt_path):
     """
     Writes the provided text to a file.
@@ -18,65 +17,137 @@ def write_to_file(text, output_txt_path):
     with open(output_txt_path, 'w', encoding='utf-8') as output_txt_file:
         output_txt_file.write(text)
     logger.info(f"Conversion complete. Output: {output_txt_path}")
-    QApplication.processEvents()
 
-def tts_word_count(full_text, output_txt_path="", enable_split=False):
+def write_pieces_to_file(pieces, output_txt_path):
+    """
+    Writes text to a file piece by piece, counting words as it goes.
+    Args:
+        pieces (iterable of str): Text to be written, with no word split between two pieces.
+        output_txt_path (str): Path to the output text file.
+    Returns:
+        int: Number of words written.
+    """
+    wordcount = 0
+    with open(output_txt_path, 'w', encoding='utf-8') as output_txt_file:
+        for piece in pieces:
+            output_txt_file.write(piece)
+            wordcount += len(piece.split())
+    logger.info(f"Conversion complete. Output: {output_txt_path}")
+    return wordcount
+
+def split_value(settings):
+    """
+    Read the TTS word count split value from settings.
+    Args:
+        settings (OperationSettings): Settings to use.
+    Returns:
+        int: Words per chunk, or None if the setting is not a positive integer.
+    """
+    splitvalue = settings.wordcount_split
+    if splitvalue == "":
+        return DEFAULT_SPLIT_VALUE
+    try:
+        splitvalue = int(splitvalue)
+    except ValueError:
+        splitvalue = 0
+    if splitvalue < 1:
+        logger.error(f"Error: Word count split value configured in settings is not a positive integer. Continuing without splitting...")
+        return None
+    return splitvalue
+
+class WordChunker:
+    """
+    Splits a stream of text into chunks of at most splitvalue words in a single pass.
+    Only the current and next chunk are held in memory. The next chunk is read ahead so each chunk
+    can be marked as the last one, which lets a consumer name a lone chunk differently.
+    Iterate to get (number, chunk, last) tuples, numbered from 1. Chunk words are joined by single spaces.
+    Attributes:
+        wordcount (int): Words read so far. The total once iteration is finished.
+    """
+    def __init__(self, pieces, splitvalue=None):
+        """
+        Args:
+            pieces (str or iterable of str): Text, or a stream of pieces with no word split between two pieces.
+            splitvalue (int): Optional. Maximum words per chunk. None yields all the text as one chunk.
+        """
+        self.pieces = [pieces] if isinstance(pieces, str) else pieces
+        self.splitvalue = splitvalue
+        self.wordcount = 0
+
+    def chunks(self):
+        """Yield chunks of at most splitvalue words, with every word in exactly one chunk."""
+        words = []
+        for piece in self.pieces:
+            piece_words = piece.split()
+            self.wordcount += len(piece_words)
+            words.extend(piece_words)
+            if self.splitvalue is None:
+                continue
+            start = 0
+            while len(words) - start >= self.splitvalue:
+                yield " ".join(words[start:start + self.splitvalue])
+                start += self.splitvalue
+            del words[:start]
+        if words:
+            yield " ".join(words)
+
+    def __iter__(self):
+        number = 0
+        previous = None
+        for chunk in self.chunks():
+            if previous is not None:
+                number += 1
+                yield number, previous, False
+            previous = chunk
+        if previous is not None:
+            yield number + 1, previous, True
+
+def tts_word_count(full_text, output_txt_path="", enable_split=False, settings=None):
     """
     Count the words in full_text. If output_txt_path is specified, handle text splitting if enabled and write to file(s).
+    Text is read in one pass and written chunk by chunk, so a stream of pieces is never held in memory at once.
     Args:
-        full_text (str): Text to count and, if enabled, write to file.
+        full_text (str or iterable of str): Text to count and, if enabled, write to file. May be a stream of pieces from iter_clean_text.
         output_txt_path (str): Optional. Fullpath to txt output location.
         enable_split (bool): Optional. Whether to split text into TTS-friendly pieces.
+        settings (OperationSettings): Optional. Settings to use. Defaults to the saved settings.
+    Returns:
+        int: The word count if output_txt_path is not specified.
+        list of str: Otherwise, the paths of the files written.
     """
-
-    full_text_split = full_text.split()
-    wordcount = len(full_text_split)
-    logger.info(f"Word count: {wordcount}")
-    QApplication.processEvents()
+    pieces = [full_text] if isinstance(full_text, str) else full_text
 
     if output_txt_path == "":
+        wordcount = sum(len(piece.split()) for piece in pieces)
+        logger.info(f"Word count: {wordcount}")
         return wordcount
 
-    settings = SettingsWindow.instance()
-    tts_limit = False
-    if enable_split:
-        try:
-            splitvalue = settings.wordcount_split_display.text()
-            if splitvalue == "":
-                splitvalue = 100000
-            else:
-                splitvalue = int(splitvalue)
-            if wordcount > splitvalue:
-                logger.info(f"Word count greater than split value: {splitvalue}.")
-                QApplication.processEvents()
-                tts_limit = True
-        except ValueError:
-            logger.error(f"Error: Word count split value configured in settings is not an integer. Continuing without splitting...")
-            QApplication.processEvents()
+    settings = settings or OperationSettings.current()
+    splitvalue = split_value(settings) if enable_split else None
+    if splitvalue is None:
+        wordcount = write_pieces_to_file(pieces, output_txt_path)
+        logger.info(f"Word count: {wordcount}")
+        return [output_txt_path]
 
-    file_tree = FileTreeWidget.instance()
-    if tts_limit:
-        output_txt_fn, _ = os.path.splitext(output_txt_path)
-        txtcount = int(math.ceil(wordcount / splitvalue))
+    output_txt_fn, _ = os.path.splitext(output_txt_path)
+    if settings.enable_filler_char:
+        filler = settings.filler_char
+    else:
+        filler = "-"
 
-        if settings.filler_char_checkbox.isChecked():
-            filler = settings.filler_char_input.text()
+    chunker = WordChunker(pieces, splitvalue)
+    output_paths = []
+    for number, chunk, last in chunker:
+        if number == 1 and last:
+            chunk_path = output_txt_path
         else:
-            filler = "-"
-
-        output_paths = []
-        for i in range(1, txtcount + 1):
-            startpoint = ((i - 1) * splitvalue) + 1
-            if i == 1:
-                text = " ".join(full_text_split[:splitvalue])
-            elif i == txtcount:
-                text = " ".join(full_text_split[startpoint:wordcount])
-            else:
-                text = " ".join(full_text_split[startpoint:(i * splitvalue)])
-            output_txt_path = f"{output_txt_fn}{filler}{i}.txt"
-            output_paths.append(output_txt_path)
-            write_to_file(text, output_txt_path)
-    else:
-        write_to_file(full_text, output_txt_path)
-        return [output_txt_path]
-    return output_paths
\ No newline at end of file
+            chunk_path = f"{output_txt_fn}{filler}{number}.txt"
+        write_to_file(chunk, chunk_path)
+        output_paths.append(chunk_path)
+    logger.info(f"Word count: {chunker.wordcount}")
+    if len(output_paths) > 1:
+        logger.info(f"Word count greater than split value: {splitvalue}. Split into {len(output_paths)} files.")
+    if not output_paths:
+        write_to_file("", output_txt_path)
+        output_paths.append(output_txt_path)
+    return output_paths
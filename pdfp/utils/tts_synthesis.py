@@ -0,0 +1,153 @@
+import io
+import re
+import time
+import logging
+import string
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from gtts import gTTS
+from gtts.tokenizer import Tokenizer, pre_processors, tokenizer_cases
+from gtts.tokenizer.symbols import ALL_PUNC
+
+logger = logging.getLogger("pdfp")
+
+# Characters gTTS sends in one request
+PART_MAX_CHARS = gTTS.GOOGLE_TTS_MAX_CHARS
+# Parts with nothing to say, which gTTS drops
+PUNCTUATION_OR_SPACE = re.compile(f"^[{re.escape(ALL_PUNC + string.whitespace)}]*$")
+# gTTS's default pre-processors and tokenizer, from its public tokenizer module
+PRE_PROCESSORS = (pre_processors.tone_marks, pre_processors.end_of_line, pre_processors.abbreviations, pre_processors.word_sub)
+TOKENIZER = Tokenizer([tokenizer_cases.tone_marks, tokenizer_cases.period_comma, tokenizer_cases.colon, tokenizer_cases.other_punctuation])
+
+def clean_parts(parts):
+    """Strip parts and drop the ones that are only punctuation and whitespace."""
+    return [part.strip() for part in parts if not PUNCTUATION_OR_SPACE.match(part)]
+
+def shorten(part, max_chars=PART_MAX_CHARS):
+    """
+    Split a part longer than max_chars at the last space that fits, or at max_chars if it has none.
+    Returns:
+        list of str: Pieces of at most max_chars characters.
+    """
+    pieces = []
+    while True:
+        part = part.removeprefix(" ")
+        if len(part) <= max_chars:
+            pieces.append(part)
+            return pieces
+        cut = part.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(part[:cut])
+        part = part[cut:]
+
+class GTTSBackend:
+    """
+    Synthesizes speech through Google Translate's TTS endpoint using gTTS.
+    Text is tokenized once into parts of at most 100 characters, and each part is one HTTP request.
+    """
+    def __init__(self, lang="en", tld="us"):
+        self.lang = lang
+        self.tld = tld
+
+    def tokenize(self, text):
+        """
+        Split text into the parts gTTS would request one at a time, the way gTTS does it, but through its public tokenizer module.
+        Args:
+            text (str): Text to speak.
+        Returns:
+            list of str: Parts in reading order.
+        """
+        text = text.strip()
+        for pre_processor in PRE_PROCESSORS:
+            text = pre_processor(text)
+        if len(text) <= PART_MAX_CHARS:
+            return clean_parts([text])
+        parts = [piece for part in clean_parts(TOKENIZER.run(text)) for piece in shorten(part)]
+        return [part for part in parts if part]
+
+    def synthesize(self, part):
+        """
+        Request the audio of one part.
+        Args:
+            part (str): One part from tokenize.
+        Returns:
+            bytes: MP3 audio of the part.
+        """
+        # parts are already pre-processed and short enough for one request
+        tts = gTTS(part, lang=self.lang, tld=self.tld, lang_check=False, pre_processor_funcs=[])
+        audio = io.BytesIO()
+        tts.write_to_fp(audio)
+        return audio.getvalue()
+
+class HTTPBackend(GTTSBackend):
+    """
+    Synthesizes speech through a plain HTTP server, e.g. a local stand-in for benchmarking.
+    Each part is POSTed to url as UTF-8 text, and the response body is taken as its MP3 audio.
+    Parts are the same as with GTTSBackend, so request counts and sizes match the real service.
+    """
+    def __init__(self, url, lang="en", tld="us", timeout=30):
+        super().__init__(lang, tld)
+        self.url = url
+        self.timeout = timeout
+
+    def synthesize(self, part):
+        request = urllib.request.Request(self.url, data=part.encode("utf-8"), headers={"Content-Type": "text/plain; charset=utf-8"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+def backend_for(settings):
+    """
+    Return the TTS backend selected in settings.
+    Args:
+        settings (OperationSettings): Settings to use. tts_server selects HTTPBackend when not empty.
+    Returns:
+        GTTSBackend or HTTPBackend: The backend to synthesize with.
+    """
+    if settings.tts_server:
+        return HTTPBackend(settings.tts_server)
+    return GTTSBackend()
+
+def synthesize_parallel(text, output_file, backend, workers, progress=None):
+    """
+    Tokenize text once and synthesize its parts over a bounded pool of concurrent requests.
+    Segments are appended to output_file in reading order as soon as every earlier part has arrived.
+    At most workers * 2 parts are in flight or waiting to be written, so memory stays bounded for long texts.
+    Args:
+        text (str): Text to speak.
+        output_file (str): Path of the MP3 to write.
+        backend (GTTSBackend): Backend used to tokenize and synthesize.
+        workers (int): Maximum concurrent requests.
+        progress (callable): Optional. Called as progress(parts written, total parts, parts per second) after each part is written.
+    Returns:
+        int: Number of parts synthesized.
+    """
+    parts = backend.tokenize(text)
+    total = len(parts)
+    window = max(1, workers) * 2
+    logger.debug(f"TTS text_parts: {total}, requests in flight: {workers}")
+    start = time.perf_counter()
+    written = 0
+    pending = deque()
+    with open(output_file, "wb") as output, ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pdfp-tts") as executor:
+        try:
+            for part in parts:
+                pending.append(executor.submit(backend.synthesize, part))
+                while len(pending) >= window or (pending and pending[0].done()):
+                    output.write(pending.popleft().result())
+                    written += 1
+                    if progress:
+                        progress(written, total, written / (time.perf_counter() - start))
+            while pending:
+                output.write(pending.popleft().result())
+                written += 1
+                if progress:
+                    progress(written, total, written / (time.perf_counter() - start))
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    elapsed = time.perf_counter() - start
+    logger.debug(f"TTS synthesized {total} parts in {elapsed:.2f}s ({total / elapsed if elapsed > 0 else 0:.2f} parts/s)")
+    return total